@@ -11,6 +11,13 @@ MQTT_PORT = 1883
 MQTT_USER = None  # set to ("user", "pass") if needed
 MQTT_CLIENT_ID = "booknook_village"
 MQTT_TOPIC_PREFIX = "booknook/village"
+# Incoming messages are handled every MQTT_POLL_MS. A lost broker is reconnected after MQTT_BACKOFF_MIN_MS,
+# doubling up to MQTT_BACKOFF_MAX_MS between failed attempts; one attempt blocks for at most MQTT_CONNECT_TIMEOUT_S
+# (LEDs keep animating from a timer meanwhile).
+MQTT_POLL_MS = 5
+MQTT_BACKOFF_MIN_MS = 1000
+MQTT_BACKOFF_MAX_MS = 30_000
+MQTT_CONNECT_TIMEOUT_S = 5
 
 # ----- LCD controllers (I2C) -----
 # List of I2C slave addresses for each RP2350-Zero, in index order.
@@ -21,9 +28,20 @@ LCD_I2C_ADDRESSES = [0x20, 0x21, 0x22]
 I2C_SDA_PIN = 4
 I2C_SCL_PIN = 5
 I2C_FREQ = 100_000
+# Send "all LCDs" commands as one I2C general call (address 0) that every RP2350-Zero accepts, so the displays
+# switch together. Set False if your I2C master refuses address 0: such commands then go to each LCD in turn.
+I2C_BROADCAST = True
+# Synced scene changes (lcd/all/scene, lcd/scenes): the new scenes are staged on every LCD, then committed with one
+# broadcast this many ms later. Must exceed the slowest LCD's frame draw (a full 240x320 frame takes about 62 ms
+# at 20 MHz SPI) so every board is idle and polling when the commit arrives.
+LCD_SYNC_LEAD_MS = 100
+# Read every LCD's status registers this often (ms) and publish them to lcd/<index>/stats. 0 = off.
+# An LCD answers within its I2C_RX_SERVICE_MS (5 ms); one that fails three reads in a row is reported offline.
+LCD_STATS_INTERVAL_MS = 10_000
 
 # ----- SK6812 RGBW LEDs -----
 LED_DATA_PIN = 0
 LED_COUNT = 10  # number of SK6812 LEDs in the strip
 # Color order for your strip (common: "GRBW" or "RGBW")
 LED_ORDER = "GRBW"
+LED_FRAME_MS = 60  # lamp/fireplace flicker frame period
@@ -1,5 +1,8 @@
 # Village – Pico W I2C master: send scene/brightness to LCD controllers (RP2350-Zero).
 # Uses config.LCD_I2C_ADDRESSES; index 0 = first address, etc.
+# One writeto() = one transaction: [reg, value, …] writes consecutive registers (auto-increment), and frames sent to
+# the general call address reach every LCD at once (see docs/i2c_protocol.md). Reads write the register number,
+# then read from there on (repeated start).
 
 from machine import I2C, Pin
 import config
@@ -7,6 +10,20 @@ import config
 # Registers on the RP2350-Zero (see docs/i2c_protocol.md)
 REG_SCENE = 0x00
 REG_BRIGHTNESS = 0x01
+REG_STAGE_SCENE = 0x02  # scene to switch to on the next commit
+REG_COMMIT = 0x03  # switch to the staged scene and restart its timeline
+REG_STATUS = 0x10  # read-only status block, STATUS_LEN bytes (registers.STATUS_* on the RP2350-Zero)
+STATUS_LEN = 15
+
+# Broadcast: general call address and command bytes (registers.CMD_* on the RP2350-Zero)
+BROADCAST_ADDR = 0x00
+CMD_BROADCAST = 0xA5  # [CMD_BROADCAST, reg, value, ...]: every LCD writes the values from reg on
+CMD_BROADCAST_EACH = 0xA6  # [CMD_BROADCAST_EACH, reg, addr, value, ...]: each LCD takes the value for its address
+
+try:
+    from config import I2C_BROADCAST
+except ImportError:
+    I2C_BROADCAST = True
 
 _i2c = None
 
@@ -29,29 +46,150 @@ def _addr_for_index(index):
     return addrs[index]
 
 
-def set_scene(index, scene_id):
-    """Set animation scene for LCD at index. scene_id: 0=off, 1=idle, 2=figure_walk, etc."""
+def write_registers(index, reg, values):
+    """Burst write to the LCD at index: values[0] to reg, values[1] to reg + 1, … in one transaction."""
     addr = _addr_for_index(index)
     if addr is None:
         return False
     try:
-        _i2c.writeto(addr, bytes([REG_SCENE, scene_id & 0xFF]))
+        _i2c.writeto(addr, bytes([reg]) + bytes(v & 0xFF for v in values))
         return True
     except OSError:
         return False
 
 
+def set_scene(index, scene_id):
+    """Set animation scene for LCD at index. scene_id: 0=off, 1=idle, 2=figure_walk, etc."""
+    return write_registers(index, REG_SCENE, (scene_id,))
+
+
 def set_brightness(index, value):
     """Set brightness for LCD at index. value: 0–255."""
-    addr = _addr_for_index(index)
-    if addr is None:
+    return write_registers(index, REG_BRIGHTNESS, (value,))
+
+
+def set_lcd(index, scene_id, brightness):
+    """Set scene and brightness of the LCD at index in one transaction."""
+    return write_registers(index, REG_SCENE, (scene_id, brightness))
+
+
+def _broadcast(frame):
+    if not I2C_BROADCAST:
         return False
     try:
-        _i2c.writeto(addr, bytes([REG_BRIGHTNESS, value & 0xFF]))
+        _i2c.writeto(BROADCAST_ADDR, frame)
         return True
     except OSError:
         return False
 
 
+def broadcast(reg, values):
+    """Write values from reg on every LCD: one general call, or one burst per LCD if broadcasting fails."""
+    values = bytes(v & 0xFF for v in values)
+    if _broadcast(bytes([CMD_BROADCAST, reg]) + values):
+        return True
+    ok = True
+    for i in range(lcd_count()):
+        ok = write_registers(i, reg, values) and ok
+    return ok
+
+
+def set_each(reg, values):
+    """
+    Write one register with a different value per LCD in one transaction. values: {index: value} or a list in
+    index order (None = leave that LCD alone). Falls back to one write per LCD if broadcasting fails.
+    """
+    if not isinstance(values, dict):
+        values = {i: v for i, v in enumerate(values) if v is not None}
+    frame = bytearray((CMD_BROADCAST_EACH, reg))
+    for i, v in values.items():
+        addr = _addr_for_index(i)
+        if addr is not None:
+            frame.append(addr)
+            frame.append(v & 0xFF)
+    if len(frame) == 2:
+        return False
+    if _broadcast(frame):
+        return True
+    ok = True
+    for i, v in values.items():
+        ok = write_registers(i, reg, (v,)) and ok
+    return ok
+
+
+def set_scene_all(scene_id):
+    """Set the same scene on every LCD at once."""
+    return broadcast(REG_SCENE, (scene_id,))
+
+
+def set_brightness_all(value):
+    """Set the same brightness on every LCD at once."""
+    return broadcast(REG_BRIGHTNESS, (value,))
+
+
+def set_scenes(scenes):
+    """Set a scene per LCD ({index: scene_id} or a list in index order) in one transaction."""
+    return set_each(REG_SCENE, scenes)
+
+
+def stage_scene_all(scene_id):
+    """Stage the same scene on every LCD; nothing changes on screen until commit()."""
+    return broadcast(REG_STAGE_SCENE, (scene_id,))
+
+
+def stage_scenes(scenes):
+    """Stage a scene per LCD ({index: scene_id} or a list in index order); nothing changes until commit()."""
+    return set_each(REG_STAGE_SCENE, scenes)
+
+
+def commit():
+    """Every LCD with a staged scene switches to it and restarts its timeline, all in the same instant."""
+    return broadcast(REG_COMMIT, (0,))
+
+
+def read_registers(index, reg, n):
+    """Burst read n registers from reg on the LCD at index in one transaction. None if it does not answer."""
+    addr = _addr_for_index(index)
+    if addr is None:
+        return None
+    try:
+        return _i2c.readfrom_mem(addr, reg, n)
+    except OSError:
+        return None
+
+
+def _u(data, i, n):
+    v = 0
+    for b in data[i:i + n]:
+        v = (v << 8) | b
+    return v
+
+
+def read_status(index):
+    """
+    Status of the LCD at index: scene (None = black), frame, fps, dropped and frames (counters wrap at 65536),
+    draw_ms (average), mem_free, i2c_overruns, i2c_malformed. None if it does not answer.
+    """
+    data = read_registers(index, REG_STATUS, STATUS_LEN)
+    if data is None or len(data) < STATUS_LEN:
+        return None
+    return {
+        "scene": None if data[0] == 0xFF else data[0],
+        "frame": data[1],
+        "fps": data[2],
+        "dropped": _u(data, 3, 2),
+        "frames": _u(data, 5, 2),
+        "draw_ms": data[7],
+        "mem_free": _u(data, 8, 3),
+        "i2c_overruns": _u(data, 11, 2),
+        "i2c_malformed": _u(data, 13, 2),
+    }
+
+
+def read_status_all():
+    """Status of every LCD, one burst read each, in index order (None for an LCD that does not answer)."""
+    return [read_status(i) for i in range(lcd_count())]
+
+
 def lcd_count():
     return len(config.LCD_I2C_ADDRESSES)
@@ -0,0 +1,135 @@
+# Village – Pico W outbound LCD command queue.
+# Commands are queued per LCD (last write wins) and sent by flush() in one batched pass: values an LCD already has
+# are skipped, several LCDs share one general call transaction, and scene + brightness for one LCD go in one burst.
+# Staged scenes (synced changes) are coalesced but never skipped: committing the current scene again re-aligns
+# the timelines (see docs/i2c_protocol.md).
+
+import lcd_bus
+
+_scenes = {}  # index -> scene to set (immediate)
+_brightnesses = {}  # index -> brightness to set
+_staged = {}  # index -> scene to stage
+_commit = False  # broadcast a commit after staging
+
+# What each LCD was last sent successfully; a value that matches is not sent again
+_sent_scenes = {}
+_sent_brightnesses = {}
+_sent_staged = {}  # staged on the LCD, becomes its scene at the next commit
+
+# Counters (never reset): commands queued, commands dropped because a later one replaced them before the flush,
+# commands dropped because the LCD already had the value, and I2C transactions sent.
+commands = 0
+coalesced = 0
+unchanged = 0
+transactions = 0
+
+
+def _put(pending, index, value, other=None):
+    global commands, coalesced
+    if index < 0 or index >= lcd_bus.lcd_count():
+        return
+    commands += 1
+    if index in pending:
+        coalesced += 1
+    if other is not None and other.pop(index, None) is not None:
+        coalesced += 1  # an immediate scene replaces a staged one for the same LCD, and the other way round
+    pending[index] = value & 0xFF
+
+
+def set_scene(index, scene_id):
+    _put(_scenes, index, scene_id, _staged)
+    if _sent_staged.pop(index, None) is not None:
+        # The LCD has a scene staged and only the scene write clears it: send it even if the scene is unchanged
+        _sent_scenes.pop(index, None)
+
+
+def set_brightness(index, value):
+    _put(_brightnesses, index, value)
+
+
+def stage_scene(index, scene_id):
+    """Stage scene_id on the LCD at index; it switches at the next commit()."""
+    _put(_staged, index, scene_id, _scenes)
+
+
+def commit():
+    """Commit the staged scenes (one broadcast, sent after the staging in the same flush)."""
+    global _commit, commands
+    commands += 1
+    _commit = True
+
+
+def pending():
+    return bool(_scenes or _brightnesses or _staged or _commit)
+
+
+def forget(index):
+    """The LCD at index may have lost its state (no answer, reboot): send the next values even if they match."""
+    _sent_scenes.pop(index, None)
+    _sent_brightnesses.pop(index, None)
+    _sent_staged.pop(index, None)
+
+
+def writes_saved():
+    """Commands that did not need their own I2C transaction."""
+    return max(0, commands - transactions)
+
+
+def _changed(pending, sent):
+    global unchanged
+    values = {}
+    for i, v in pending.items():
+        if sent.get(i) == v:
+            unchanged += 1
+        else:
+            values[i] = v
+    pending.clear()
+    return values
+
+
+def _write(reg, values, sent):
+    """Send one register to the LCDs in values: a burst for one LCD, else one general call."""
+    global transactions
+    if not values:
+        return
+    if len(values) == 1:
+        for i, v in values.items():
+            ok = lcd_bus.write_registers(i, reg, (v,))
+    elif len(values) == lcd_bus.lcd_count() and len(set(values.values())) == 1:
+        ok = lcd_bus.broadcast(reg, (next(iter(values.values())),))
+    else:
+        ok = lcd_bus.set_each(reg, values)
+    transactions += 1
+    for i, v in values.items():
+        if ok:
+            sent[i] = v
+        else:
+            sent.pop(i, None)  # unknown state: do not skip the next write
+
+
+def flush():
+    """Send everything queued, in as few transactions as possible. Call once per gateway loop tick."""
+    global _commit, transactions
+    scenes = _changed(_scenes, _sent_scenes)
+    brightnesses = _changed(_brightnesses, _sent_brightnesses)
+    i = next(iter(scenes)) if len(scenes) == 1 and len(brightnesses) == 1 else None
+    if i is not None and i in brightnesses:
+        ok = lcd_bus.set_lcd(i, scenes[i], brightnesses[i])  # both registers in one burst
+        transactions += 1
+        if ok:
+            _sent_scenes[i] = scenes[i]
+            _sent_brightnesses[i] = brightnesses[i]
+        else:
+            forget(i)
+    else:
+        _write(lcd_bus.REG_SCENE, scenes, _sent_scenes)
+        _write(lcd_bus.REG_BRIGHTNESS, brightnesses, _sent_brightnesses)
+    if _staged:
+        _write(lcd_bus.REG_STAGE_SCENE, dict(_staged), _sent_staged)
+        _staged.clear()
+    if _commit:
+        _commit = False
+        lcd_bus.commit()
+        transactions += 1
+        _sent_scenes.update(_sent_staged)
+        _sent_staged.clear()
@@ -15,6 +15,11 @@ except ImportError:
     Neopixel = None
     _driver = None
 
+try:
+    from config import LED_FRAME_MS as FRAME_MS
+except ImportError:
+    FRAME_MS = 60  # flicker frame period
+
 _strip = None
 _mode = "off"
 _brightness = 255  # 0-255
@@ -80,14 +85,20 @@ def _fireplace_color():
 
 
 def update():
-    """Call periodically (e.g. every 50–100 ms) to animate lamp/fireplace."""
-    global _last_update, _flicker_phase
-    if _strip is None or _mode == "off":
-        return
+    """Call periodically (e.g. every 50–100 ms) to animate lamp/fireplace; renders at most every FRAME_MS."""
+    global _last_update
     now = time.ticks_ms()
-    if time.ticks_diff(now, _last_update) < 60:
+    if time.ticks_diff(now, _last_update) < FRAME_MS:
         return
     _last_update = now
+    render()
+
+
+def render():
+    """Draw the next lamp/fireplace flicker frame now (the gateway's LED task calls this every FRAME_MS)."""
+    global _flicker_phase
+    if _strip is None or _mode == "off":
+        return
     _flicker_phase += 1
     scale = _brightness / 255.0
     if _mode == "lamp":
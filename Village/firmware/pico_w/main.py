@@ -1,12 +1,26 @@
 # Village – Pico W main: WiFi, MQTT, LEDs, I2C to LCD controllers.
-# Copy config.py (and edit), lcd_bus.py, leds.py, main.py to the board.
-# Requires: umqtt.simple (or umqtt.robust), neopixel driver for SK6812 RGBW.
+# Copy config.py (and edit), lcd_bus.py, lcd_queue.py, leds.py, main.py to the board.
+# Requires: umqtt.simple (or umqtt.robust), neopixel driver for SK6812 RGBW, asyncio (uasyncio on older builds).
+# Runs as independent asyncio tasks: MQTT receive, LED rendering, I2C dispatch, status polling, and the connection
+# task (WiFi + MQTT, reconnect with backoff). The MQTT callback only queues LCD commands (lcd_queue); after each
+# batch of messages the dispatch task flushes the queue in one pass.
 
 import config
+import json
 import time
 import lcd_bus
+import lcd_queue
 import leds
 
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+try:
+    from machine import Timer
+except ImportError:
+    Timer = None
+
 # MQTT
 try:
     from umqtt.simple import MQTTClient
@@ -17,15 +31,91 @@ MQTT_TOPIC_LEDS_MODE = config.MQTT_TOPIC_PREFIX + "/leds/mode"
 MQTT_TOPIC_LEDS_BRIGHTNESS = config.MQTT_TOPIC_PREFIX + "/leds/brightness"
 MQTT_TOPIC_LCD_SCENE = config.MQTT_TOPIC_PREFIX + "/lcd/{}/scene"
 MQTT_TOPIC_LCD_BRIGHTNESS = config.MQTT_TOPIC_PREFIX + "/lcd/{}/brightness"
+MQTT_TOPIC_LCD_ALL_SCENE = config.MQTT_TOPIC_PREFIX + "/lcd/all/scene"
+MQTT_TOPIC_LCD_ALL_BRIGHTNESS = config.MQTT_TOPIC_PREFIX + "/lcd/all/brightness"
+MQTT_TOPIC_LCD_SCENES = config.MQTT_TOPIC_PREFIX + "/lcd/scenes"
+MQTT_TOPIC_LCD_STATS = config.MQTT_TOPIC_PREFIX + "/lcd/{}/stats"
 
 client = None
 led_mode = "off"
 led_brightness = 255
 lcd_scenes = {}   # index -> scene_id
 lcd_brightnesses = {}  # index -> 0-255
+_commit_at = None  # ticks_ms when staged scenes are committed (None = nothing staged)
+_i2c_wake = asyncio.Event()  # set when lcd_queue has commands to flush
+_received = 0  # MQTT messages handled (mqtt_task drains the socket until this stops growing)
+_mqtt_lost = asyncio.Event()  # set when the broker connection failed; the connection task reconnects
+
+try:
+    from config import LCD_SYNC_LEAD_MS
+except ImportError:
+    LCD_SYNC_LEAD_MS = 100
+try:
+    from config import LCD_STATS_INTERVAL_MS
+except ImportError:
+    LCD_STATS_INTERVAL_MS = 10_000
+try:
+    from config import MQTT_POLL_MS
+except ImportError:
+    MQTT_POLL_MS = 5
+try:
+    from config import MQTT_BACKOFF_MIN_MS, MQTT_BACKOFF_MAX_MS
+except ImportError:
+    MQTT_BACKOFF_MIN_MS, MQTT_BACKOFF_MAX_MS = 1000, 30_000
+try:
+    from config import MQTT_CONNECT_TIMEOUT_S
+except ImportError:
+    MQTT_CONNECT_TIMEOUT_S = 5
+MQTT_BATCH = 32  # most messages handled per MQTT_POLL_MS tick before the queue is flushed
+LCD_STATS_RETRIES = 2  # status reads tried again (LCD_STATS_RETRY_MS apart) before an LCD is reported offline
+LCD_STATS_RETRY_MS = 20
+
 
+def _commit_later():
+    """Commit the staged scenes LCD_SYNC_LEAD_MS from now (staging again before then pushes the commit back)."""
+    global _commit_at
+    idle = _commit_at is None
+    _commit_at = time.ticks_add(time.ticks_ms(), LCD_SYNC_LEAD_MS)
+    if idle:
+        asyncio.create_task(_commit_task())
 
-def wifi_connect():
+
+async def _commit_task():
+    global _commit_at
+    while True:
+        wait = time.ticks_diff(_commit_at, time.ticks_ms())
+        if wait <= 0:
+            break
+        await asyncio.sleep_ms(wait)
+    _commit_at = None
+    lcd_queue.commit()  # all staged LCDs start their new scene together
+    _i2c_wake.set()
+
+
+async def publish_stats():
+    """Read every LCD's status registers and publish them as JSON; an LCD that does not answer is {"online": false}."""
+    for i in range(lcd_bus.lcd_count()):
+        stats = lcd_bus.read_status(i)
+        for _ in range(LCD_STATS_RETRIES):
+            if stats is not None:
+                break
+            await asyncio.sleep_ms(LCD_STATS_RETRY_MS)  # a busy or briefly unresponsive LCD: let the other tasks run
+            stats = lcd_bus.read_status(i)
+        if stats is None:
+            lcd_queue.forget(i)  # may come back rebooted: resend its scene and brightness next time
+            stats = {"online": False}
+        else:
+            stats["online"] = True
+            stats["scene_set"] = lcd_scenes.get(i)
+        try:
+            client.publish(MQTT_TOPIC_LCD_STATS.format(i), json.dumps(stats))
+        except Exception:
+            _mqtt_lost.set()
+            return
+        await asyncio.sleep_ms(0)  # a read can stretch for a whole LCD frame: let the other tasks run in between
+
+
+async def wifi_connect():
     import network
     wlan = network.WLAN(network.STA_IF)
     wlan.active(True)
@@ -34,14 +124,15 @@ def wifi_connect():
         for _ in range(30):
             if wlan.isconnected():
                 break
-            time.sleep(0.5)
+            await asyncio.sleep_ms(500)
     if not wlan.isconnected():
         raise RuntimeError("WiFi failed")
     return wlan
 
 
 def mqtt_callback(topic, msg):
-    global led_mode, led_brightness
+    global led_mode, led_brightness, _received
+    _received += 1
     t = topic.decode() if isinstance(topic, bytes) else topic
     m = msg.decode() if isinstance(msg, bytes) else msg
     if t == MQTT_TOPIC_LEDS_MODE:
@@ -55,12 +146,42 @@ def mqtt_callback(topic, msg):
             leds.set_brightness(led_brightness)
         except ValueError:
             pass
+    elif t == MQTT_TOPIC_LCD_ALL_SCENE:
+        try:
+            scene_id = max(0, min(254, int(m)))
+            for i in range(lcd_bus.lcd_count()):
+                lcd_scenes[i] = scene_id
+                lcd_queue.stage_scene(i, scene_id)
+            _commit_later()
+        except ValueError:
+            pass
+    elif t == MQTT_TOPIC_LCD_ALL_BRIGHTNESS:
+        try:
+            b = max(0, min(255, int(m)))
+            for i in range(lcd_bus.lcd_count()):
+                lcd_brightnesses[i] = b
+                lcd_queue.set_brightness(i, b)
+        except ValueError:
+            pass
+    elif t == MQTT_TOPIC_LCD_SCENES:
+        # "3,5,,7": scene per LCD index, staged in one I2C transaction; empty entries leave that LCD unchanged
+        try:
+            scenes = {}
+            for i, v in enumerate(m.split(",")):
+                if v.strip():
+                    scenes[i] = max(0, min(254, int(v)))
+            lcd_scenes.update(scenes)
+            for i, scene_id in scenes.items():
+                lcd_queue.stage_scene(i, scene_id)
+            _commit_later()
+        except ValueError:
+            pass
     elif t.startswith(config.MQTT_TOPIC_PREFIX + "/lcd/") and t.endswith("/scene"):
         try:
             idx = int(t.split("/")[-2])
             scene_id = max(0, min(254, int(m)))
             lcd_scenes[idx] = scene_id
-            lcd_bus.set_scene(idx, scene_id)
+            lcd_queue.set_scene(idx, scene_id)
         except (ValueError, IndexError):
             pass
     elif t.startswith(config.MQTT_TOPIC_PREFIX + "/lcd/") and t.endswith("/brightness"):
@@ -68,7 +189,7 @@ def mqtt_callback(topic, msg):
             idx = int(t.split("/")[-2])
             b = max(0, min(255, int(m)))
             lcd_brightnesses[idx] = b
-            lcd_bus.set_brightness(idx, b)
+            lcd_queue.set_brightness(idx, b)
         except (ValueError, IndexError):
             pass
 
@@ -83,33 +204,107 @@ def mqtt_connect():
         password=config.MQTT_USER[1] if config.MQTT_USER else None,
     )
     client.set_callback(mqtt_callback)
-    client.connect()
+    try:
+        client.connect(timeout=MQTT_CONNECT_TIMEOUT_S)
+    except TypeError:  # umqtt.simple without a connect timeout
+        client.connect()
     client.subscribe(MQTT_TOPIC_LEDS_MODE)
     client.subscribe(MQTT_TOPIC_LEDS_BRIGHTNESS)
+    client.subscribe(MQTT_TOPIC_LCD_ALL_SCENE)
+    client.subscribe(MQTT_TOPIC_LCD_ALL_BRIGHTNESS)
+    client.subscribe(MQTT_TOPIC_LCD_SCENES)
     for i in range(lcd_bus.lcd_count()):
         client.subscribe(MQTT_TOPIC_LCD_SCENE.format(i))
         client.subscribe(MQTT_TOPIC_LCD_BRIGHTNESS.format(i))
     return client
 
 
-def main():
-    wifi_connect()
-    lcd_bus.init()
-    leds.init()
-    leds.set_mode(led_mode)
-    leds.set_brightness(led_brightness)
-    mqtt_connect()
-    last_reconnect = time.ticks_ms()
+def _blocking(fn):
+    """Run fn(), which holds the event loop (umqtt connects synchronously), while a soft timer keeps the LEDs going."""
+    timer = None
+    if Timer is not None:
+        try:
+            timer = Timer(period=leds.FRAME_MS, mode=Timer.PERIODIC, callback=lambda t: leds.render())
+        except Exception:
+            timer = None
+    try:
+        return fn()
+    finally:
+        if timer is not None:
+            timer.deinit()
+
+
+async def connection_task():
+    """Bring WiFi and MQTT up, then wait for a failure and reconnect, backing off from 1 s to 30 s between attempts."""
+    backoff = MQTT_BACKOFF_MIN_MS
     while True:
         try:
-            client.check_msg()
-        except OSError:
+            await wifi_connect()
+            _blocking(mqtt_connect)
+        except Exception:
+            await asyncio.sleep_ms(backoff)
+            backoff = min(backoff * 2, MQTT_BACKOFF_MAX_MS)
+            continue
+        backoff = MQTT_BACKOFF_MIN_MS
+        _mqtt_lost.clear()
+        await _mqtt_lost.wait()
+
+
+async def mqtt_task():
+    """
+    Every MQTT_POLL_MS while connected, handle the messages waiting on the socket (check_msg does not block and
+    handles one at a time), then wake the dispatch task once for the whole batch.
+    """
+    while True:
+        if client is not None and not _mqtt_lost.is_set():
             try:
-                client.connect()
+                for _ in range(MQTT_BATCH):
+                    before = _received
+                    client.check_msg()
+                    if _received == before:
+                        break
             except Exception:
-                pass
-        leds.update()
-        time.sleep_ms(50)
+                _mqtt_lost.set()
+            if lcd_queue.pending():
+                _i2c_wake.set()
+        await asyncio.sleep_ms(MQTT_POLL_MS)
+
+
+async def led_task():
+    while True:
+        leds.render()
+        await asyncio.sleep_ms(leds.FRAME_MS)
+
+
+async def i2c_task():
+    """Flush the LCD command queue whenever a batch of commands (or a commit) is ready."""
+    while True:
+        await _i2c_wake.wait()
+        _i2c_wake.clear()
+        lcd_queue.flush()
+
+
+async def stats_task():
+    while LCD_STATS_INTERVAL_MS > 0:
+        await asyncio.sleep_ms(LCD_STATS_INTERVAL_MS)
+        if client is not None and not _mqtt_lost.is_set():
+            await publish_stats()
+
+
+async def run():
+    lcd_bus.init()
+    leds.init()
+    leds.set_mode(led_mode)
+    leds.set_brightness(led_brightness)
+    asyncio.create_task(led_task())
+    asyncio.create_task(i2c_task())
+    asyncio.create_task(mqtt_task())
+    asyncio.create_task(stats_task())
+    await connection_task()
+
+
+def main():
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
@@ -1,110 +1,1310 @@
 # Village – RP2350-Zero bitmap-only animations.
 # Scenes 0–254: bitmap data from bitmap_anim.bin (generated by tools/image_sequence_to_bitmap.py).
-# All scenes play at 24 fps and loop until another scene is triggered over I2C.
+# Reads BANM v1 (raw RGB565) and BANM v2 (per-frame raw or row-RLE, decoded while streaming from flash;
+# optional frame index table so identical frames are stored once; optional dirty rects so a frame that
+# follows the one on screen only sends the region that changed; optional per-scene palettes with 4/8-bit
+# index frames, expanded through a lookup table; optional per-scene storage scale, upscaled while reading;
+# optional per-scene frame rate and per-frame hold times).
+# Optional dual-core pipeline (config.BITMAP_PIPELINE): core 1 reads frames from flash while core 0 blits.
+# Scenes play at 24 fps unless the asset sets their timing, and loop until another scene is triggered over I2C.
 
 import struct
+from array import array
 
 try:
-    from display_driver import pixel as set_pixel
+    from time import ticks_diff
 except ImportError:
-    def set_pixel(disp, x, y, c):
-        if disp and hasattr(disp, "pixel"):
-            disp.pixel(x, y, c)
-        elif disp and hasattr(disp, "fill_rect"):
-            disp.fill_rect(x, y, 1, 1, c)
+    def ticks_diff(a, b):
+        return a - b
 
-# Header: BANM (4) + width (2) + height (2) + frame_count[255] (510) = 518 bytes
+try:
+    from time import sleep_ms, sleep_us
+except ImportError:
+    from time import sleep
+
+    def sleep_ms(ms):
+        sleep(ms / 1000)
+
+    def sleep_us(us):
+        sleep(us / 1000000)
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+try:
+    import micropython
+except ImportError:
+    micropython = None
+
+# v1 header: BANM (4) + width (2) + height (2) + frame_count[255] (510) = 518 bytes, then raw RGB565 frames.
 HEADER_SIZE = 4 + 2 + 2 + 255 * 2
+# v2 header: BAN2 (4) + width (2) + height (2) + flags (2) + slot_count (2) + frame_count[255] (510) = 522 bytes,
+# then the optional tables enabled by flags, the slot table (offset u32, length u32 per slot) and the
+# payloads (codec byte + data). See tools/README.md.
+V2_HEADER_SIZE = 4 + 2 + 2 + 2 + 2 + 255 * 2
+V2_SLOT_SIZE = 8
+V2_FLAG_FRAME_INDEX = 0x0001  # u32 slot table offset + u16 slot per (scene, frame) follow the header (dedup)
+V2_FLAG_DIRTY_RECTS = 0x0002  # (x, y, w, h) u16 per (scene, frame): region changed since the previous frame
+V2_FLAG_PALETTES = 0x0004  # u32 palette offset per scene (0 = none); palette = count u16 + count RGB565 words
+V2_FLAG_SCALES = 0x0008  # u8 per scene: frames stored at 1/1, 1/2 or 1/4 of width and height
+V2_FLAG_TIMING = 0x0010  # u16 rate (ticks/s) per scene, then u32 offset of u16 per-frame hold ticks per scene (0 = 1 each)
+DEFAULT_FPS = 24
+CODEC_RAW = 0
+CODEC_RLE = 1
+CODEC_PAL4 = 2  # rows of 4-bit palette indices, high nibble first, rows padded to a whole byte
+CODEC_PAL8 = 3  # rows of 8-bit palette indices
 BITMAP_FILENAME = "bitmap_anim.bin"
 NUM_SCENES = 255
+_IDX_BYTES = 2048  # palette index bytes read per readinto (BitmapAsset.idx)
 
-# Cached header: (width, height, frame_counts list of 255)
-_bitmap_cache = None
+# Rows per band for banded drawing (0 = whole frame in one buffer). See config.BITMAP_BAND_ROWS.
+try:
+    from config import BITMAP_BAND_ROWS
+except ImportError:
+    BITMAP_BAND_ROWS = 0
 
+# RAM budget for cached frame payloads (FrameCache; 0 = off). See config.BITMAP_CACHE_BYTES.
+try:
+    from config import BITMAP_CACHE_BYTES
+except ImportError:
+    BITMAP_CACHE_BYTES = 0
 
-def _read_bitmap_header(f):
-    """Read header (518 bytes for 255 scenes). Returns (width, height, frame_counts) or None."""
-    buf = f.read(HEADER_SIZE)
-    if len(buf) < HEADER_SIZE or buf[:4] != b"BANM":
-        return None
-    width, height = struct.unpack("<HH", buf[4:8])
-    frame_counts = list(struct.unpack("<" + "H" * NUM_SCENES, buf[8:HEADER_SIZE]))
-    return (width, height, frame_counts)
+# Read frames on core 1 (FramePipeline) instead of inline. See config.BITMAP_PIPELINE.
+try:
+    from config import BITMAP_PIPELINE
+except ImportError:
+    BITMAP_PIPELINE = False
+
+# Open asset (BitmapAsset), created on first draw and kept for the life of the program.
+_asset = None
+# Core 1 reader (FramePipeline) when BITMAP_PIPELINE is on, started on first draw.
+_pipeline = None
+
+# What is on the glass: (scene, frame index) last drawn, or _SHOWN_BLACK / _SHOWN_NOTHING.
+_SHOWN_NOTHING = -1
+_SHOWN_BLACK = -2
+_shown_scene = _SHOWN_NOTHING
+_shown_frame = 0
+_shown_seq = 0  # frames the scene's timeline had shown since it started, at the frame on screen (BitmapAsset.seq)
+
+# Playback counters (read by the frame scheduler): frames sent to the display, and frames of the
+# timeline that were never shown because the loop fell behind.
+frames_drawn = 0
+frames_dropped = 0
+
+
+def _u16(b, i):
+    return b[i] | (b[i + 1] << 8)
+
+
+def _u32(b, i):
+    return b[i] | (b[i + 1] << 8) | (b[i + 2] << 16) | (b[i + 3] << 24)
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+# Lengths _head keeps per buffer before it starts over (a looping scene asks for a few per frame).
+_VIEW_CACHE = 64
+
+
+def _head(views, mv, n):
+    """mv[0:n], made once per length and kept in views (a dict), so partial reads and blits stop allocating after one loop."""
+    if n == len(mv):
+        return mv
+    v = views.get(n)
+    if v is None:
+        if len(views) >= _VIEW_CACHE:
+            views.clear()
+        v = views[n] = mv[0:n]
+    return v
+
+
+# Byte copy by offsets, without making slices: dst[a[0]:a[0] + a[2]] = src[a[1]:a[1] + a[2]] (a: array("i")
+# of three, so viper's four-argument limit is not in the way).
+if micropython is not None:
+    @micropython.viper
+    def _copy(dst: ptr8, src: ptr8, a: ptr32):
+        di = int(a[0])
+        si = int(a[1])
+        end = si + int(a[2])
+        while si < end:
+            dst[di] = src[si]
+            di += 1
+            si += 1
+else:
+    def _copy(dst, src, a):
+        di, si, n = a
+        dst[di:di + n] = src[si:si + n]
+
+
+# Row-RLE run decoder. ring is the _ChunkReader ring (payload byte k at ring[k & 511]) and st its state:
+# [output position, output end, bytes consumed, bytes loaded]. Decodes whole runs into dst while they are
+# loaded and fit, stores the new positions in st, and returns the output position (-1: a run overflows dst).
+if micropython is not None:
+    @micropython.viper
+    def _rle_runs(dst: ptr8, ring: ptr8, st: ptr32) -> int:
+        out = int(st[0])
+        end = int(st[1])
+        rd = int(st[2])
+        avail = int(st[3])
+        while out < end and rd < avail:
+            c = int(ring[rd & 511])
+            if c < 128:
+                n = (c + 1) << 1
+                if rd + 1 + n > avail:
+                    break
+                if out + n > end:
+                    return -1
+                i = rd + 1
+                rd = i + n
+                while i < rd:
+                    dst[out] = ring[i & 511]
+                    out += 1
+                    i += 1
+            else:
+                n = (c - 126) << 1
+                if rd + 3 > avail:
+                    break
+                if out + n > end:
+                    return -1
+                lo = ring[(rd + 1) & 511]
+                hi = ring[(rd + 2) & 511]
+                rd += 3
+                n += out
+                while out < n:
+                    dst[out] = lo
+                    dst[out + 1] = hi
+                    out += 2
+        st[0] = out
+        st[2] = rd
+        return out
+else:
+    def _rle_runs(dst, ring, st):
+        out, end, rd, avail = st
+        while out < end and rd < avail:
+            c = ring[rd & 511]
+            if c < 128:
+                n = (c + 1) * 2
+                if rd + 1 + n > avail:
+                    break
+                if out + n > end:
+                    return -1
+                i = (rd + 1) & 511
+                k = min(n, 512 - i)
+                dst[out:out + k] = ring[i:i + k]
+                dst[out + k:out + n] = ring[0:n - k]
+                rd += 1 + n
+            else:
+                n = (c - 126) * 2
+                if rd + 3 > avail:
+                    break
+                if out + n > end:
+                    return -1
+                dst[out:out + n] = bytes((ring[(rd + 1) & 511], ring[(rd + 2) & 511])) * (n // 2)
+                rd += 3
+            out += n
+        st[0] = out
+        st[2] = rd
+        return out
+
+
+class _ChunkReader:
+    """
+    Streaming input for RLE decode. The payload is read in 256-byte halves into a 512-byte ring through two
+    fixed views, and _rle_runs decodes runs straight out of the ring by offset, so decoding allocates nothing.
+    A refill happens once no more than a half is unread, which keeps the longest run (1 + 256 bytes) loaded.
+    """
+
+    def __init__(self):
+        self.buf = bytearray(512)
+        mv = memoryview(self.buf)
+        self.halves = (mv[0:256], mv[256:512])
+        self.st = array("i", (0, 0, 0, 0))
+        self.f = None
+        self.length = 0
+
+    def start(self, f, length):
+        self.f = f
+        self.length = length
+        self.st[2] = 0
+        self.st[3] = 0
+
+    def fill(self):
+        """Load halves until more than one half is unread or the whole payload is loaded."""
+        st = self.st
+        while st[3] - st[2] <= 256 and st[3] < self.length:
+            loaded = st[3]
+            want = self.length - loaded
+            if want > 256:
+                want = 256
+            # A whole half is read even at the end of the payload; bytes past it are never decoded
+            if self.f.readinto(self.halves[(loaded >> 8) & 1]) < want:
+                raise ValueError("truncated payload")
+            st[3] = loaded + want
+
+
+_rle_reader = _ChunkReader()
+
+
+class _MemReader:
+    """File-like (seek/readinto) view of one cached payload; positions are file offsets, so decoders need no changes."""
 
+    def __init__(self):
+        self.mv = None
+        self.base = 0
+        self.pos = 0
+        self.args = array("i", (0, 0, 0))
 
-def _scene_byte_offset(frame_size, frame_counts, scene_id, frame_index):
-    """Byte offset in file for scene scene_id, frame frame_index (after the header)."""
-    offset = 0
-    for s in range(scene_id):
-        offset += frame_counts[s] * frame_size
-    offset += frame_index * frame_size
-    return offset
+    def load(self, mv, base):
+        self.mv = mv
+        self.base = base
+        self.pos = 0
+
+    def seek(self, pos):
+        self.pos = pos - self.base
+
+    def readinto(self, dst):
+        n = len(self.mv) - self.pos
+        if n > len(dst):
+            n = len(dst)
+        if n <= 0:
+            return 0
+        a = self.args
+        a[1] = self.pos
+        a[2] = n
+        _copy(dst, self.mv, a)
+        self.pos += n
+        return n
+
+
+class FrameCache:
+    """
+    LRU cache of frame payloads in RAM, keyed by storage slot (the frame's global number in v1 files), so
+    frames deduplicated to one slot are cached once. Payloads are kept as stored in the file (RLE, palette or
+    raw), so a small looping scene costs only its compressed size and plays without flash reads. Payloads above max_bytes // 4 are never cached, so one
+    big frame cannot flush the whole cache. Counters: hits, misses (frames read from flash, including those
+    too big to cache), evictions, bytes in use.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.max_item = max_bytes // 4
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}  # key -> [payload, file offset, last use]
+        self._clock = 0
+
+    def get(self, key):
+        """Return the [payload, offset, last use] entry for key (marking it used), or None."""
+        e = self._entries.get(key)
+        if e is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._clock += 1
+        e[2] = self._clock
+        return e
+
+    def put(self, key, data, offset):
+        """Insert a payload, evicting least recently used entries to stay within max_bytes."""
+        n = len(data)
+        if n > self.max_item:
+            return None
+        entries = self._entries
+        while entries and self.bytes + n > self.max_bytes:
+            oldest = None
+            for k in entries:
+                if oldest is None or entries[k][2] < entries[oldest][2]:
+                    oldest = k
+            self.bytes -= len(entries.pop(oldest)[0])
+            self.evictions += 1
+        self._clock += 1
+        e = entries[key] = [data, offset, self._clock]
+        self.bytes += n
+        return e
+
+    def clear(self):
+        self._entries = {}
+        self.bytes = 0
+
+
+def rle_decode(f, length, mv):
+    """
+    Stream-decode a row-RLE payload of `length` bytes from f into mv (memoryview of width * height * 2 bytes).
+    Control c < 128: c + 1 literal words follow. c >= 128: one word follows, repeated c - 126 times.
+    """
+    _rle_reader.start(f, length)
+    rle_decode_rows(mv)
+
+
+def rle_decode_rows(mv):
+    """
+    Continue the payload started by rle_decode/_rle_reader.start, filling exactly len(mv) bytes. Rows are
+    coded independently, so mv may hold any whole number of rows (a band) and the next call resumes at
+    the following row.
+    """
+    r = _rle_reader
+    st = r.st
+    st[0] = 0
+    st[1] = len(mv)
+    while st[0] < st[1]:
+        r.fill()
+        rd = st[2]
+        if _rle_runs(mv, r.buf, st) < 0:
+            raise ValueError("bad RLE payload")
+        if st[2] == rd:
+            raise ValueError("truncated payload")
+
+
+# Palette expansion: dst[a[0]:] = lut[index] words for the a[2] indices at src[a[1]:].
+if micropython is not None:
+    @micropython.viper
+    def _lut_expand8(dst: ptr8, src: ptr8, lut: ptr8, a: ptr32):
+        di = int(a[0])
+        si = int(a[1])
+        end = si + int(a[2])
+        while si < end:
+            v = src[si] << 1
+            dst[di] = lut[v]
+            dst[di + 1] = lut[v + 1]
+            di += 2
+            si += 1
+
+    @micropython.viper
+    def _lut_expand4(dst: ptr8, src: ptr8, lut: ptr8, a: ptr32):
+        di = int(a[0])
+        si = int(a[1])
+        n = int(a[2])
+        i = 0
+        while i < n:
+            b = src[si + (i >> 1)]
+            if i & 1:
+                v = (b & 15) << 1
+            else:
+                v = (b >> 4) << 1
+            dst[di] = lut[v]
+            dst[di + 1] = lut[v + 1]
+            di += 2
+            i += 1
+else:
+    def _lut_expand8(dst, src, lut, a):
+        di, si, n = a
+        for i in range(si, si + n):
+            v = src[i] << 1
+            dst[di] = lut[v]
+            dst[di + 1] = lut[v + 1]
+            di += 2
+
+    def _lut_expand4(dst, src, lut, a):
+        di, si, n = a
+        for i in range(n):
+            b = src[si + (i >> 1)]
+            v = ((b & 15) if i & 1 else (b >> 4)) << 1
+            dst[di + (i << 1)] = lut[v]
+            dst[di + (i << 1) + 1] = lut[v + 1]
+
+
+# Nearest-neighbour row upscale: dst[0:n * s] = each of the n RGB565 words in src repeated s times.
+if micropython is not None:
+    @micropython.viper
+    def _upscale_row(dst: ptr16, src: ptr16, n: int, s: int):
+        j = 0
+        for i in range(n):
+            v = src[i]
+            for k in range(s):
+                dst[j] = v
+                j += 1
+else:
+    def _upscale_row(dst, src, n, s):
+        j = 0
+        for i in range(0, n * 2, 2):
+            lo = src[i]
+            hi = src[i + 1]
+            for _ in range(s):
+                dst[j] = lo
+                dst[j + 1] = hi
+                j += 2
+
+
+class BitmapAsset:
+    """
+    Open bitmap_anim.bin once and keep it open. Frame lookup is O(1): a prefix-sum table of each scene's
+    first frame is built from the header, so (scene, frame) maps straight to a file offset (v1) or a slot
+    (v2). Frames are read with readinto() into one preallocated buffer and decoded by offset (_rle_runs,
+    _copy, _lut_expand*); shorter reads and blits use views kept per length (_head), so steady-state playback
+    allocates nothing.
+
+    band_rows > 0 sizes that buffer to band_rows rows instead of the whole frame: begin_frame() then
+    read_rows() streams the frame top to bottom one band at a time, so RAM scales with the band, not the screen.
+    skip_rows()/read_region() read just a sub-rectangle (for dirty rects).
+    Palette frames (CODEC_PAL4/PAL8) are read a few index rows at a time into self.idx and expanded into the
+    destination through the scene's 256-entry lookup table (loaded once per scene).
+    Scenes stored at 1/2 or 1/4 size (V2_FLAG_SCALES) keep the same interface: rows, columns and dirty rects are
+    in display pixels, and each stored row is widened into up_mv and repeated `scale` times on the way out.
+    cache_bytes > 0 keeps recently played payloads in a FrameCache (self.cache); frame data is then read from
+    self.src, which is the file or a _MemReader over the cached payload. Only scenes whose distinct payloads fit
+    in the cache together are cached: a longer loop would evict each frame before it comes round again, so its
+    frames are read from flash as usual (just the dirty rect, no payload copy).
+    """
+
+    def __init__(self, filename=BITMAP_FILENAME, band_rows=0, cache_bytes=0):
+        self.f = open(filename, "rb")
+        self.src = self.f
+        self.cache = FrameCache(cache_bytes) if cache_bytes > 0 else None
+        self._mem = _MemReader()
+        self._slots = {}  # scene -> storage slot per frame, or None if the scene is not cached (_cache_slots)
+        try:
+            self._read_header()
+        except Exception:
+            self.f.close()
+            raise ValueError("not a BANM file")
+        self.frame_size = self.width * self.height * 2
+        if band_rows <= 0 or band_rows > self.height:
+            band_rows = self.height
+        self.band_rows = band_rows
+        self.buf = bytearray(band_rows * self.width * 2)
+        self.mv = memoryview(self.buf)
+        self.views = {}  # _head views of mv (last band, dirty rects)
+        # One decoded row, for skipping/cropping rows of RLE frames; views of it per storage scale
+        self.row_mv = memoryview(bytearray(self.width * 2))
+        self._row_views = {1: self.row_mv, 2: self.row_mv[0:self.width // 2 * 2], 4: self.row_mv[0:self.width // 4 * 2]}
+        self._srow = self.row_mv
+        self._scale = 1
+        self._w = self.width
+        self._sub = 0
+        if self.scales is not None:
+            # One upscaled display row, and one stored row segment to widen into it
+            self.up_mv = memoryview(bytearray(self.width * 2))
+            self.seg_mv = memoryview(bytearray(self.width // 2 * 2))
+            self._segs = {}
+        self._crops = {}  # _head views of row_mv for cropped raw rows
+        if self.palette_table is not None:
+            # Index rows waiting to be expanded (at least one full-width PAL8 row)
+            self.idx = bytearray(max(_IDX_BYTES, self.width))
+            self.idx_mv = memoryview(self.idx)
+            self._idx_views = {}
+        self._args = array("i", (0, 0, 0))  # offsets and count for _copy/_lut_expand*
+        self._codec = CODEC_RAW
+        self._data = 0
+        self._row = 0
+        self._scratch = bytearray(V2_SLOT_SIZE)
+        self._mv1 = memoryview(self._scratch)[0:1]
+        self._mv2 = memoryview(self._scratch)[0:2]
+        self._mv4 = memoryview(self._scratch)[0:4]
+        self.lut = bytearray(512)
+        self._lut_scene = -1
+        self._stride = 0
+        self.rect_x = self.rect_y = self.rect_w = self.rect_h = 0
+        self.seq = 0
+        self.next_ms = 0
+        self._t_scene = -1
+        self._t_rate = DEFAULT_FPS
+        self._t_ends = None
+        self._t_period = 0
+
+    def _read_header(self):
+        """Parse a v1 or v2 header into width/height/frame_counts/scene_first and the table offsets."""
+        f = self.f
+        buf = f.read(8)
+        self.width, self.height = struct.unpack("<HH", buf[4:8])
+        self.index_table = None
+        self.rect_table = None
+        self.palette_table = None
+        self.scales = None
+        self.rates = None
+        self.holds = None
+        if buf[:4] == b"BANM":
+            self.version = 1
+            self.slot_table = None
+            counts = f.read(NUM_SCENES * 2)
+        elif buf[:4] == b"BAN2":
+            self.version = 2
+            flags = struct.unpack("<H", f.read(4)[0:2])[0]
+            counts = f.read(NUM_SCENES * 2)
+        else:
+            raise ValueError("bad magic")
+        self.frame_counts = list(struct.unpack("<" + "H" * NUM_SCENES, counts))
+        # scene_first[s] = number of frames stored before scene s (scene-major)
+        first = [0] * (NUM_SCENES + 1)
+        for s in range(NUM_SCENES):
+            first[s + 1] = first[s] + self.frame_counts[s]
+        self.scene_first = first
+        if self.version == 1:
+            return
+        total = first[NUM_SCENES]
+        pos = V2_HEADER_SIZE
+        if flags & V2_FLAG_FRAME_INDEX:
+            self.slot_table = struct.unpack("<I", f.read(4))[0]
+            self.index_table = pos + 4
+            pos += 4 + total * 2
+        if flags & V2_FLAG_DIRTY_RECTS:
+            self.rect_table = pos
+            pos += total * 8
+        if flags & V2_FLAG_PALETTES:
+            self.palette_table = pos
+            pos += NUM_SCENES * 4
+        if flags & V2_FLAG_SCALES:
+            f.seek(pos)
+            self.scales = f.read(NUM_SCENES)
+            pos += NUM_SCENES
+        if flags & V2_FLAG_TIMING:
+            # Loaded whole (scenes with hold times only), so the timeline never touches the file while playing
+            f.seek(pos)
+            self.rates = struct.unpack("<" + "H" * NUM_SCENES, f.read(NUM_SCENES * 2))
+            offsets = struct.unpack("<" + "I" * NUM_SCENES, f.read(NUM_SCENES * 4))
+            pos += NUM_SCENES * 6
+            self.holds = {}
+            for s in range(NUM_SCENES):
+                if offsets[s] and self.frame_counts[s]:
+                    f.seek(offsets[s])
+                    self.holds[s] = f.read(self.frame_counts[s] * 2)
+        if not flags & V2_FLAG_FRAME_INDEX:
+            self.slot_table = pos
+
+    def num_frames(self, scene_id):
+        return self.frame_counts[scene_id]
+
+    def locate(self, scene_id, elapsed_ms):
+        """
+        Frame index of scene_id at elapsed_ms into the scene. Also sets seq (frames the timeline has gone
+        through since the scene started, for drop counting) and next_ms (elapsed ms at which it changes).
+        The scene's timeline runs at its rate (default 24 ticks/s); each frame lasts one tick or its hold time.
+        """
+        self._timing(scene_id)
+        rate = self._t_rate
+        tick = elapsed_ms * rate // 1000
+        ends = self._t_ends
+        if ends is None:
+            n = self.frame_counts[scene_id]
+            index = tick % n
+            self.seq = tick
+            next_tick = tick + 1
+        else:
+            loop = tick // ends[-1]
+            t = tick - loop * ends[-1]
+            index = 0
+            while ends[index] <= t:
+                index += 1
+            self.seq = loop * len(ends) + index
+            next_tick = tick - t + ends[index]
+        self.next_ms = (next_tick * 1000 + rate - 1) // rate
+        return index
+
+    def _timing(self, scene_id):
+        """Load scene_id's rate, frame end ticks and period into the _t_* fields (kept until the scene changes)."""
+        if scene_id == self._t_scene:
+            return
+        self._t_scene = scene_id
+        rate = self.rates[scene_id] if self.rates is not None else 0
+        rate = rate or DEFAULT_FPS
+        self._t_rate = rate
+        holds = self.holds.get(scene_id) if self.holds else None
+        ends = None
+        if holds is not None:
+            # ends[i] = tick at which frame i ends, within one loop of the scene
+            ends = []
+            t = 0
+            for i in range(0, len(holds), 2):
+                t += _u16(holds, i)
+                ends.append(t)
+        self._t_ends = ends
+        # Shortest whole number of loops that lasts a whole number of ms
+        loop = (ends[-1] if ends else self.frame_counts[scene_id]) * 1000
+        self._t_period = loop // _gcd(loop, rate)
+
+    def period_ms(self, scene_id):
+        """ms after which scene_id's timeline repeats exactly (0 for an empty scene)."""
+        self._timing(scene_id)
+        return self._t_period
+
+    def scale(self, scene_id):
+        """Storage scale of scene_id: 1, 2 or 4 (frames stored at 1/scale of the display size)."""
+        return self.scales[scene_id] if self.scales is not None else 1
+
+    def load_dirty_rect(self, scene_id, frame_index):
+        """
+        Set rect_x/y/w/h to the region that changed since the previous frame (display pixels). False if the
+        asset has no rects. Moves the file position, so call it before begin_frame().
+        """
+        if self.rect_table is None:
+            return False
+        f = self.f
+        scratch = self._scratch
+        f.seek(self.rect_table + (self.scene_first[scene_id] + frame_index) * 8)
+        if f.readinto(scratch) != 8:
+            return False
+        self.rect_x = _u16(scratch, 0)
+        self.rect_y = _u16(scratch, 2)
+        self.rect_w = _u16(scratch, 4)
+        self.rect_h = _u16(scratch, 6)
+        s = self.scale(scene_id)
+        if s > 1:
+            self.rect_x *= s
+            self.rect_y *= s
+            self.rect_w *= s
+            self.rect_h *= s
+        return True
+
+    def _cache_slots(self, scene_id):
+        """
+        Storage slot of each frame of scene_id, or None if its frames are not cached (no cache, or the scene's
+        distinct payloads do not fit in it together). Read from the file once per scene.
+        """
+        cache = self.cache
+        if cache is None:
+            return None
+        if scene_id in self._slots:
+            return self._slots[scene_id]
+        first = self.scene_first[scene_id]
+        count = self.frame_counts[scene_id]
+        slots = None
+        if self.version == 1:
+            if self.frame_size <= cache.max_item and count * self.frame_size <= cache.max_bytes:
+                slots = list(range(first, first + count))
+        else:
+            f = self.f
+            scratch = self._scratch
+            slots = []
+            seen = set()
+            total = 0
+            for n in range(first, first + count):
+                if self.index_table is not None:
+                    f.seek(self.index_table + n * 2)
+                    f.readinto(self._mv2)
+                    n = _u16(scratch, 0)
+                if n not in seen:
+                    seen.add(n)
+                    f.seek(self.slot_table + n * V2_SLOT_SIZE)
+                    if f.readinto(scratch) != V2_SLOT_SIZE:
+                        slots = None
+                        break
+                    length = _u32(scratch, 4)
+                    total += length
+                    if length > cache.max_item or total > cache.max_bytes:
+                        slots = None
+                        break
+                slots.append(n)
+        self._slots[scene_id] = slots
+        return slots
+
+    def _cached(self, key):
+        """Point self.src at the cached payload for key and return its file offset, or -1 if not cached (key < 0: not cacheable)."""
+        if self.cache is None:
+            return -1
+        if key < 0:
+            self.cache.misses += 1
+            return -1
+        e = self.cache.get(key)
+        if e is None:
+            return -1
+        self._mem.load(e[0], e[1])
+        self.src = self._mem
+        return e[1]
+
+    def _load(self, key, offset, length):
+        """Read a payload from flash, caching it when it fits (key >= 0), and point self.src at it."""
+        self.src = self.f
+        cache = self.cache
+        if cache is None or key < 0 or length > cache.max_item:
+            return
+        try:
+            data = memoryview(bytearray(length))
+        except MemoryError:
+            return
+        self.f.seek(offset)
+        if self.f.readinto(data) != length:
+            return
+        cache.put(key, data, offset)
+        self._mem.load(data, offset)
+        self.src = self._mem
+
+    def begin_frame(self, scene_id, frame_index):
+        """Seek to (scene_id, frame_index) and prepare its decoder; rows then come from read_rows(). Returns True on success."""
+        f = self.f
+        n = self.scene_first[scene_id] + frame_index
+        self._row = 0
+        self._sub = 0
+        s = self.scale(scene_id)
+        self._srow = self._row_views.get(s)
+        if self._srow is None:
+            return False
+        self._scale = s
+        self._w = self.width // s
+        slots = self._cache_slots(scene_id)
+        key = slots[frame_index] if slots is not None else -1
+        if self.version == 1:
+            self._codec = CODEC_RAW
+            self._data = HEADER_SIZE + n * self.frame_size
+            if self._cached(key) < 0:
+                self._load(key, self._data, self.frame_size)
+            return True
+        scratch = self._scratch
+        offset = self._cached(key)
+        if offset >= 0:
+            length = len(self._mem.mv)
+        else:
+            if key >= 0:
+                n = key
+            elif self.index_table is not None:
+                # Deduplicated asset: (scene, frame) -> storage slot
+                f.seek(self.index_table + n * 2)
+                f.readinto(self._mv2)
+                n = _u16(scratch, 0)
+            f.seek(self.slot_table + n * V2_SLOT_SIZE)
+            if f.readinto(scratch) != V2_SLOT_SIZE:
+                return False
+            length = _u32(scratch, 4)
+            offset = _u32(scratch, 0)
+            self._load(key, offset, length)
+        src = self.src
+        src.seek(offset)
+        src.readinto(self._mv1)
+        self._codec = scratch[0]
+        self._data = offset + 1
+        if self._codec == CODEC_RLE:
+            _rle_reader.start(src, length - 1)
+            return True
+        if self._codec == CODEC_PAL4 or self._codec == CODEC_PAL8:
+            self._stride = (self._w + 1) >> 1 if self._codec == CODEC_PAL4 else self._w
+            return self._load_palette(scene_id)
+        return self._codec == CODEC_RAW
+
+    def _load_palette(self, scene_id):
+        """Read scene_id's palette into self.lut (skipped if it is already there). Returns True on success."""
+        if self._lut_scene == scene_id:
+            return True
+        if self.palette_table is None:
+            return False
+        f = self.f
+        f.seek(self.palette_table + scene_id * 4)
+        if f.readinto(self._mv4) != 4:
+            return False
+        offset = _u32(self._scratch, 0)
+        if not offset:
+            return False
+        f.seek(offset)
+        f.readinto(self._mv2)
+        n = _u16(self._scratch, 0) * 2
+        if n > len(self.lut) or f.readinto(memoryview(self.lut)[0:n]) != n:
+            return False
+        self._lut_scene = scene_id
+        return True
+
+    def _read_indexed(self, mv, row, rows):
+        """Fill mv with `rows` palette rows starting at `row`: index rows are read into self.idx a batch at a time and expanded into mv."""
+        stride = self._stride
+        width = self._w
+        src = self.src
+        a = self._args
+        expand = _lut_expand8 if self._codec == CODEC_PAL8 else _lut_expand4
+        # Odd-width 4-bit rows end in a padding nibble, so they are expanded one at a time
+        whole = self._codec == CODEC_PAL8 or not width & 1
+        per = len(self.idx) // stride
+        src.seek(self._data + row * stride)
+        r = 0
+        while r < rows:
+            k = per if r + per <= rows else rows - r
+            n = k * stride
+            if src.readinto(_head(self._idx_views, self.idx_mv, n)) != n:
+                return False
+            if whole:
+                a[0] = r * width * 2
+                a[1] = 0
+                a[2] = k * width
+                expand(mv, self.idx, self.lut, a)
+            else:
+                for i in range(k):
+                    a[0] = (r + i) * width * 2
+                    a[1] = i * stride
+                    a[2] = width
+                    expand(mv, self.idx, self.lut, a)
+            r += k
+        return True
+
+    def read_rows(self, mv):
+        """Fill mv (a whole number of rows) with the next rows of the current frame. Returns True on success."""
+        if self._scale > 1:
+            return self._read_scaled(mv, 0, self.width, len(mv) // (self.width * 2))
+        return self._read_stored_rows(mv)
+
+    def skip_rows(self, rows):
+        """Advance past the next `rows` rows of the current frame without returning them (a multiple of the scale)."""
+        rows //= self._scale
+        if self._codec == CODEC_RLE:
+            for _ in range(rows):
+                rle_decode_rows(self._srow)
+        self._row += rows
+
+    def read_region(self, mv, x, w, rows):
+        """Fill mv with columns x..x+w of the next `rows` rows, packed w pixels per row. Returns True on success."""
+        if self._scale > 1:
+            return self._read_scaled(mv, x, w, rows)
+        return self._read_stored_region(mv, x, w, rows)
+
+    def _read_scaled(self, mv, x, w, rows):
+        """read_region for a scaled frame: x and w (display pixels) are multiples of the scale, rows need not be."""
+        s = self._scale
+        n = w * 2
+        up = self.up_mv
+        sw = w // s
+        seg = _head(self._segs, self.seg_mv, sw * 2)
+        a = self._args
+        for r in range(rows):
+            if not self._sub:
+                if not self._read_stored_region(seg, x // s, sw, 1):
+                    return False
+                _upscale_row(up, seg, sw, s)
+            a[0] = r * n
+            a[1] = 0
+            a[2] = n
+            _copy(mv, up, a)
+            self._sub += 1
+            if self._sub == s:
+                self._sub = 0
+        return True
+
+    def _read_stored_rows(self, mv):
+        rows = len(mv) // (self._w * 2)
+        if self._codec == CODEC_RLE:
+            rle_decode_rows(mv)
+            self._row += rows
+            return True
+        if self._codec != CODEC_RAW:
+            ok = self._read_indexed(mv, self._row, rows)
+            self._row += rows
+            return ok
+        self.src.seek(self._data + self._row * self._w * 2)
+        self._row += rows
+        return self.src.readinto(mv) == len(mv)
+
+    def _read_stored_region(self, mv, x, w, rows):
+        if x == 0 and w == self._w:
+            return self._read_stored_rows(mv)
+        f = self.src
+        width = self._w
+        srow = self._srow
+        n = w * 2
+        a = self._args
+        if self._codec == CODEC_RAW:
+            # Raw rows are read straight from the file into a view of the row buffer, then copied into place
+            srow = _head(self._crops, self.row_mv, n)
+        for r in range(rows):
+            if self._codec == CODEC_RLE:
+                rle_decode_rows(srow)
+                a[1] = x * 2
+            elif self._codec != CODEC_RAW:
+                if not self._read_indexed(srow, self._row + r, 1):
+                    return False
+                a[1] = x * 2
+            else:
+                f.seek(self._data + ((self._row + r) * width + x) * 2)
+                if f.readinto(srow) != n:
+                    return False
+                a[1] = 0
+            a[0] = r * n
+            a[2] = n
+            _copy(mv, srow, a)
+        self._row += rows
+        return True
+
+    def read_frame(self, scene_id, frame_index):
+        """Load a whole frame into self.buf (only when the buffer holds a full frame). Returns True on success."""
+        return self.begin_frame(scene_id, frame_index) and self.read_rows(self.mv)
+
+    def close(self):
+        try:
+            self.f.close()
+        except Exception:
+            pass
+
+
+# FramePipeline chunk slot: meta list indices and states
+_SLOT_STATE = 0
+_SLOT_GEN = 1
+_SLOT_OK = 2
+_SLOT_X = 3
+_SLOT_Y = 4
+_SLOT_W = 5
+_SLOT_ROWS = 6
+_SLOT_LAST = 7
+_SLOT_MV = 8  # the view core 1 filled (its _head views are only touched on core 1)
+_SLOT_FREE = 0
+_SLOT_FULL = 1
+
+
+class FramePipeline:
+    """
+    Double-buffered playback across both cores. A reader thread on core 1 owns the asset file: for each job
+    (scene, frame, use dirty rect) it decodes the frame, or its dirty rect, into two band buffers in turn,
+    and core 0 blits each buffer as soon as it is full. After a frame is shown, core 0 queues the next
+    frame as a prefetch, so it is usually already in RAM when it falls due and flash latency is hidden.
+    With BITMAP_BAND_ROWS = 0 each buffer holds a whole frame (two full-screen buffers); with bands,
+    core 1 reads band k + 1 while core 0 sends band k.
+
+    Handoff: each buffer has a meta list whose state goes FREE -> FULL (core 1, after filling it) -> FREE
+    (core 0, after blitting it), and both sides step through the two buffers in the same order. Every
+    job carries a generation number; a new job (scene change, dropped frame, invalidate) makes core 1
+    abandon the old one, and core 0 frees leftover buffers from old generations unread.
+    Counters: hits (frame was prefetched), misses (had to be requested on demand).
+    """
+
+    def __init__(self, asset):
+        self.asset = asset
+        size = len(asset.buf)
+        self.size = size
+        self.mvs = (asset.mv, memoryview(bytearray(size)))
+        self.views = ({}, {})  # _head views per buffer, so short chunks are sent without slicing
+        self.meta = ([_SLOT_FREE, 0, False, 0, 0, 0, 0, False, None], [_SLOT_FREE, 0, False, 0, 0, 0, 0, False, None])
+        self.job = None
+        self.hits = 0
+        self.misses = 0
+        self._gen = 0
+        self._done = 0
+        self._put = 0  # next buffer core 1 fills
+        self._take = 0  # next buffer core 0 blits
+        self.running = True
+        self.alive = True
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """Stop the core 1 reader and wait for it to exit (it owns the asset file until then)."""
+        self.running = False
+        self.job = None
+        while self.alive:
+            sleep_ms(1)
+
+    def cancel(self):
+        """Drop any queued or in-progress job (e.g. the display no longer shows what it assumed)."""
+        self.job = None
+
+    def prefetch(self, scene_id, frame_index, use_rect):
+        """Queue (scene_id, frame_index) to be read ahead; use_rect = read only its dirty rect."""
+        self._gen += 1
+        self.job = (self._gen, scene_id, frame_index, use_rect)
+
+    def draw(self, display, scene_id, frame_index, use_rect):
+        """Blit (scene_id, frame_index) as core 1 delivers it, starting the read now if it was not prefetched. Returns True on success."""
+        job = self.job
+        if job is not None and job[1] == scene_id and job[2] == frame_index and job[3] == use_rect:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.prefetch(scene_id, frame_index, use_rect)
+        gen = self._gen
+        while True:
+            i = self._take
+            meta = self.meta[i]
+            while meta[_SLOT_STATE] != _SLOT_FULL:
+                if not self.alive:
+                    return False
+                sleep_us(50)
+            self._take = i ^ 1
+            if meta[_SLOT_GEN] != gen:
+                meta[_SLOT_STATE] = _SLOT_FREE
+                continue
+            ok = meta[_SLOT_OK]
+            last = meta[_SLOT_LAST]
+            w = meta[_SLOT_W]
+            rows = meta[_SLOT_ROWS]
+            if ok and rows:
+                _blit(display, meta[_SLOT_MV], meta[_SLOT_X], meta[_SLOT_Y], w, rows)
+            meta[_SLOT_STATE] = _SLOT_FREE
+            if not ok or last:
+                if self.job is not None and self.job[0] == gen:
+                    self.job = None
+                return ok
+
+    def _run(self):
+        try:
+            while self.running:
+                job = self.job
+                if job is None or job[0] == self._done:
+                    sleep_ms(1)
+                    continue
+                self._produce(job)
+                self._done = job[0]
+        finally:
+            self.alive = False
+
+    def _wait_free(self, job):
+        """Index of the next buffer to fill once core 0 has freed it, or None if the job was replaced meanwhile."""
+        meta = self.meta[self._put]
+        while meta[_SLOT_STATE] != _SLOT_FREE:
+            if self.job is not job:
+                return None
+            sleep_us(50)
+        return self._put
+
+    def _publish(self, i, gen, ok, x, y, w, rows, last, mv=None):
+        meta = self.meta[i]
+        meta[_SLOT_MV] = mv
+        meta[_SLOT_GEN] = gen
+        meta[_SLOT_OK] = ok
+        meta[_SLOT_X] = x
+        meta[_SLOT_Y] = y
+        meta[_SLOT_W] = w
+        meta[_SLOT_ROWS] = rows
+        meta[_SLOT_LAST] = last
+        meta[_SLOT_STATE] = _SLOT_FULL  # last: core 0 reads the fields above only after seeing FULL
+        self._put = i ^ 1
+
+    def _produce(self, job):
+        gen, scene_id, frame_index, use_rect = job
+        asset = self.asset
+        x, y, w, h = 0, 0, asset.width, asset.height
+        try:
+            if use_rect and asset.load_dirty_rect(scene_id, frame_index):
+                x, y, w, h = asset.rect_x, asset.rect_y, asset.rect_w, asset.rect_h
+            ok = asset.begin_frame(scene_id, frame_index)
+            if ok and w and h:
+                asset.skip_rows(y)
+        except Exception:
+            ok = False
+        if not ok or not w or not h:
+            i = self._wait_free(job)
+            if i is not None:
+                self._publish(i, gen, ok, x, y, w, 0, True)
+            return
+        rows_per_chunk = self.size // (w * 2)
+        end = y + h
+        while y < end:
+            i = self._wait_free(job)
+            if i is None:
+                return
+            rows = rows_per_chunk if y + rows_per_chunk <= end else end - y
+            mv = _head(self.views[i], self.mvs[i], rows * w * 2)
+            try:
+                ok = asset.read_region(mv, x, w, rows)
+            except Exception:
+                ok = False
+            self._publish(i, gen, ok, x, y, w, rows, not ok or y + rows >= end, mv)
+            if not ok:
+                return
+            y += rows
+
+
+def get_asset():
+    """Return the open BitmapAsset, opening it on first use. None if the file is missing or invalid."""
+    global _asset
+    if _asset is None:
+        try:
+            _asset = BitmapAsset(BITMAP_FILENAME, BITMAP_BAND_ROWS, BITMAP_CACHE_BYTES)
+        except (OSError, ValueError):
+            _asset = None
+    return _asset
+
+
+def get_pipeline(asset):
+    """Return the running FramePipeline when BITMAP_PIPELINE is set and _thread is available, else None."""
+    global _pipeline
+    if _pipeline is not None and not _pipeline.alive:
+        _pipeline = None  # reader thread died: start a fresh one
+    if _pipeline is None and BITMAP_PIPELINE and _thread is not None:
+        try:
+            _pipeline = FramePipeline(asset)
+        except (OSError, MemoryError, RuntimeError):
+            _pipeline = None
+    return _pipeline
+
+
+def close_asset():
+    """Close the asset (e.g. before replacing bitmap_anim.bin); the next draw reopens it."""
+    global _asset, _pipeline
+    if _pipeline is not None:
+        _pipeline.stop()
+        _pipeline = None
+    if _asset is not None:
+        _asset.close()
+        _asset = None
+    invalidate()
+
+
+def invalidate():
+    """Forget what is on the display so the next run_frame redraws (e.g. after re-initialising the panel)."""
+    global _shown_scene
+    _shown_scene = _SHOWN_NOTHING
+    if _pipeline is not None:
+        _pipeline.cancel()
+
+
+def period_ms(scene_id):
+    """
+    ms after which scene_id's timeline repeats exactly (whole loops), or 0 if there is none. Moving the
+    scene's start forward by a multiple of this does not change what is shown.
+    """
+    asset = get_asset()
+    if asset is None or scene_id < 0 or scene_id >= NUM_SCENES:
+        return 0
+    if asset.frame_counts[scene_id] == 0:
+        scene_id = 0  # draw_bitmap plays scene 0 instead
+    return asset.period_ms(scene_id)
+
+
+def shown_scene():
+    """Scene on the display, or -1 when it is black or nothing has been drawn yet."""
+    return _shown_scene if _shown_scene >= 0 else -1
+
+
+def shown_frame():
+    """Frame index on the display (meaningful while shown_scene() >= 0)."""
+    return _shown_frame
+
+
+def _show_black(display):
+    global _shown_scene
+    if _shown_scene != _SHOWN_BLACK:
+        display.fill(0)
+        _shown_scene = _SHOWN_BLACK
 
 
 def draw_bitmap(display, scene_id, time_ticks_ms, scene_start_ticks):
     """
     Draw current frame for scene_id from bitmap_anim.bin.
-    Frame index = (elapsed_ms * 24 / 1000) % num_frames for 24 fps loop.
+    Frame index comes from the scene's timeline (BitmapAsset.locate): (elapsed_ms * 24 / 1000) % num_frames
+    for a plain 24 fps scene, or the scene's own rate and per-frame hold times. If that frame is already on the display, nothing is read or sent. Returns the milliseconds until the
+    frame index next changes, or None if the picture is static (single frame or black) until the scene changes.
     """
-    global _bitmap_cache
+    global _shown_scene, _shown_frame, _shown_seq, frames_drawn, frames_dropped
     if not display:
-        return
+        return None
     if scene_id < 0 or scene_id >= NUM_SCENES:
         scene_id = 0
+    asset = get_asset()
+    if asset is None:
+        _show_black(display)
+        return None
     try:
-        f = open(BITMAP_FILENAME, "rb")
-    except OSError:
-        _bitmap_cache = None
-        display.fill(0)
-        return
-    try:
-        if _bitmap_cache is None:
-            _bitmap_cache = _read_bitmap_header(f)
-        if _bitmap_cache is None:
-            display.fill(0)
-            return
-        width, height, frame_counts = _bitmap_cache
-        if frame_counts[scene_id] == 0:
+        if asset.frame_counts[scene_id] == 0:
             scene_id = 0
-        num_frames = frame_counts[scene_id]
+        num_frames = asset.frame_counts[scene_id]
         if num_frames == 0:
-            display.fill(0)
-            return
-        elapsed_ms = time_ticks_ms - scene_start_ticks
+            _show_black(display)
+            return None
+        elapsed_ms = ticks_diff(time_ticks_ms, scene_start_ticks)
         if elapsed_ms < 0:
             elapsed_ms = 0
-        frame_index = (elapsed_ms * 24 // 1000) % num_frames
-        frame_size = width * height * 2
-        offset = HEADER_SIZE + _scene_byte_offset(frame_size, frame_counts, scene_id, frame_index)
-        f.seek(offset)
-        buf = f.read(frame_size)
-        if len(buf) < frame_size:
-            display.fill(0)
-            return
-        if hasattr(display, "blit_buffer"):
-            display.blit_buffer(buf, 0, 0, width, height)
+        frame_index = asset.locate(scene_id, elapsed_ms)
+        seq = asset.seq
+        wait_ms = asset.next_ms - elapsed_ms if num_frames > 1 else None
+        if scene_id == _shown_scene and frame_index == _shown_frame:
+            return wait_ms
+        # The previous frame is on screen: only the changed region (dirty rect) needs to go out
+        use_rect = num_frames > 1 and scene_id == _shown_scene and _shown_frame == (frame_index - 1) % num_frames
+        pipe = get_pipeline(asset)
+        if pipe is not None:
+            if not pipe.draw(display, scene_id, frame_index, use_rect):
+                _shown_scene = _SHOWN_NOTHING
+                _show_black(display)
+                return wait_ms
+            if num_frames > 1:
+                pipe.prefetch(scene_id, (frame_index + 1) % num_frames, True)
         else:
-            for y in range(height):
-                for x in range(width):
-                    i = (y * width + x) * 2
-                    c = buf[i] | (buf[i + 1] << 8)
-                    set_pixel(display, x, y, c)
+            x, y, w, h = 0, 0, asset.width, asset.height
+            if use_rect and asset.load_dirty_rect(scene_id, frame_index):
+                x, y, w, h = asset.rect_x, asset.rect_y, asset.rect_w, asset.rect_h
+            if not asset.begin_frame(scene_id, frame_index):
+                _show_black(display)
+                return wait_ms
+            if w and h and not _draw_region(display, asset, x, y, w, h):
+                _shown_scene = _SHOWN_NOTHING
+                _show_black(display)
+                return wait_ms
+        if scene_id == _shown_scene and num_frames > 1 and seq > _shown_seq + 1:
+            frames_dropped += seq - _shown_seq - 1
+        frames_drawn += 1
+        _shown_scene = scene_id
+        _shown_frame = frame_index
+        _shown_seq = seq
+        return wait_ms
     except Exception:
-        display.fill(0)
-    finally:
-        try:
-            f.close()
-        except Exception:
-            pass
+        _shown_scene = _SHOWN_NOTHING
+        _show_black(display)
+        return None
+
+
+def _draw_region(display, asset, x, y0, w, h):
+    """Read rows y0..y0+h, columns x..x+w of the current frame and blit them, as many rows per blit as the buffer holds."""
+    asset.skip_rows(y0)
+    rows_per_blit = len(asset.buf) // (w * 2)
+    end = y0 + h
+    y = y0
+    while y < end:
+        rows = rows_per_blit if y + rows_per_blit <= end else end - y
+        mv = _head(asset.views, asset.mv, rows * w * 2)
+        if not asset.read_region(mv, x, w, rows):
+            return False
+        _blit(display, mv, x, y, w, rows)
+        y += rows
+    return True
+
+
+def _blit(display, buf, x0, y0, w, rows):
+    """Push a w x rows block of RGB565 (LE) from buf to the display at (x0, y0)."""
+    if hasattr(display, "blit_buffer"):
+        display.blit_buffer(buf, x0, y0, w, rows)
+    else:
+        _blit_spans(display, buf, x0, y0, w, rows)
+
+
+def _blit_spans(display, buf, x0, y0, w, rows):
+    """
+    Fallback for drivers without blit_buffer: each horizontal run of one colour becomes a single
+    fill_rect(x, y, n, 1, c), so flat areas cost one driver call per run instead of one per pixel.
+    Single pixels use pixel() when the driver has it (lighter than fill_rect). Driver methods are
+    looked up once per block, not per pixel.
+    """
+    fill_rect = getattr(display, "fill_rect", None)
+    pixel = getattr(display, "pixel", None)
+    if fill_rect is None:
+        if pixel is None:
+            return
+        for y in range(rows):
+            i = y * w * 2
+            for x in range(x0, x0 + w):
+                pixel(x, y0 + y, buf[i] | (buf[i + 1] << 8))
+                i += 2
+        return
+    if pixel is None:
+        def pixel(x, y, c):
+            fill_rect(x, y, 1, 1, c)
+    x_end = x0 + w
+    for y in range(rows):
+        yy = y0 + y
+        i = y * w * 2
+        start = x0
+        c = buf[i] | (buf[i + 1] << 8)
+        for x in range(x0 + 1, x_end):
+            i += 2
+            p = buf[i] | (buf[i + 1] << 8)
+            if p != c:
+                if x - start == 1:
+                    pixel(start, yy, c)
+                else:
+                    fill_rect(start, yy, x - start, 1, c)
+                c = p
+                start = x
+        if x_end - start == 1:
+            pixel(start, yy, c)
+        else:
+            fill_rect(start, yy, x_end - start, 1, c)
 
 
 def run_frame(display, scene_id, time_ticks_ms, scene_start_ticks):
     """
-    Draw one frame. Scenes 0–7 are bitmap; anything else shows black.
-    time_ticks_ms and scene_start_ticks are used for 24 fps playback (scene_start_ticks when scene was selected).
+    Draw one frame. Scenes 0–254 are bitmap; anything else shows black.
+    time_ticks_ms and scene_start_ticks place the scene on its timeline (scene_start_ticks when scene was selected).
+    Returns ms until the next frame is due, or None if nothing will change until the scene does.
     """
     if scene_id < 0 or scene_id >= NUM_SCENES:
         if display:
-            display.fill(0)
-        return
-    draw_bitmap(display, scene_id, time_ticks_ms, scene_start_ticks)
+            _show_black(display)
+        return None
+    return draw_bitmap(display, scene_id, time_ticks_ms, scene_start_ticks)
@@ -11,6 +11,11 @@ I2C_SCL_PIN = 5
 # Optional: if your chip uses different I2C base addresses, set them here (i2c_slave_hw uses RP2040 defaults).
 # I2C0_BASE = 0x40044000
 # I2C1_BASE = 0x40048000
+# Drain the I2C RX FIFO and answer reads from a timer IRQ every this many ms as well as from the main loop, so the
+# master waits at most this long even while a frame is drawn. With 0 that only happens between frames: a status
+# read or a transaction longer than the 16-byte FIFO then holds the master (clock stretching) until the current
+# draw finishes, longer than the Pico W's 50 ms I2C timeout on full-screen frames.
+I2C_RX_SERVICE_MS = 5
 
 # ST7789V SPI pins – adjust for your Waveshare module (see wiki).
 # Typical: one SPI bus, CS/DC/RST/backlight per display.
@@ -26,3 +31,33 @@ LCD_BL = 8    # backlight PWM
 # Display size (Waveshare ST7789V 240x320 – may be rotated in driver)
 LCD_WIDTH = 240
 LCD_HEIGHT = 320
+
+# Bitmap playback: rows per band. 0 = read and blit the whole frame at once (needs width*height*2 bytes of
+# contiguous RAM, 150 KB at 240x320). N > 0 = read and blit N rows at a time through one N*width*2 buffer
+# (e.g. 40 rows = 19 KB) – use on boards with bigger displays or little free heap.
+BITMAP_BAND_ROWS = 0
+
+# RAM budget (bytes) for the frame cache: recently played frames are kept as stored in the file (compressed),
+# so short looping scenes and scenes you switch back to play without flash reads. 0 = no cache.
+# Only scenes whose frames all fit in the budget together are cached; frames larger than a quarter of the budget
+# are always read from flash. E.g. 32 * 1024 for short compressed flicker loops.
+BITMAP_CACHE_BYTES = 0
+
+# Longest main-loop sleep (ms) between I2C polls. The loop otherwise sleeps until the next frame is due;
+# static scenes (one frame, or black) are not redrawn, so this only bounds scene-change latency.
+IDLE_POLL_MS = 50
+
+# Dual-core playback: True = a reader thread on core 1 decodes the next frame from flash into a second buffer
+# while core 0 sends the current one over SPI. Needs _thread and one more buffer the size of BITMAP_BAND_ROWS
+# rows (a second full frame, 150 KB at 240x320, when BITMAP_BAND_ROWS = 0 – use bands if heap is tight).
+BITMAP_PIPELINE = False
+
+# Synced scene changes (staged scene + commit broadcast): while a scene is staged the loop stops drawing and polls
+# I2C every SYNC_POLL_MS, so every board sees the commit within that time and the displays start together.
+# After SYNC_TIMEOUT_MS without a commit, playback of the current scene resumes (the scene stays staged).
+SYNC_POLL_MS = 2
+SYNC_TIMEOUT_MS = 1000
+
+# Status registers (scene, frame, fps, dropped frames, free heap, I2C errors) the Pico W reads back are refreshed
+# this often (ms).
+STATUS_REFRESH_MS = 250
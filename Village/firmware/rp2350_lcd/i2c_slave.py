@@ -4,12 +4,17 @@
 import config
 import registers
 
-_use_hw = False
+try:
+    from config import I2C_RX_SERVICE_MS
+except ImportError:
+    I2C_RX_SERVICE_MS = 5
+
+_hw = None  # i2c_slave_hw once it is running
 
 
 def start():
     """Start I2C slave. If hardware slave is available, init it; main loop must call poll()."""
-    global _use_hw
+    global _hw
     try:
         import i2c_slave_hw
         i2c_slave_hw.init(
@@ -17,17 +22,25 @@ def start():
             config.I2C_SDA_PIN,
             config.I2C_SCL_PIN,
             config.I2C_SLAVE_ADDR,
+            I2C_RX_SERVICE_MS,
+            registers.readback,
         )
-        _use_hw = True
+        _hw = i2c_slave_hw
     except Exception:
-        _use_hw = False
+        _hw = None
 
 
 def poll():
     """Call once per main-loop iteration to process received I2C bytes (when using hardware slave)."""
-    if _use_hw:
+    if _hw is not None:
         try:
-            import i2c_slave_hw
-            i2c_slave_hw.poll(registers)
+            _hw.poll(registers)
         except Exception:
             pass
+
+
+def rx_errors():
+    """(overruns, malformed) I2C transactions dropped so far; (0, 0) without the hardware slave."""
+    if _hw is None:
+        return 0, 0
+    return _hw.rx_overruns, _hw.rx_malformed
@@ -1,5 +1,11 @@
 # Village – Minimal hardware I2C slave for RP2040/RP2350.
-# Uses DesignWare I2C peripheral in slave-only mode. Master sends [reg, value]; we call registers.set_register(reg, value).
+# Uses DesignWare I2C peripheral in slave-only mode. Each master write transaction is one frame ([reg, value, …] or a
+# general call broadcast, see registers.apply_frame): the first byte is flagged by FIRST_DATA_BYTE, the end by STOP_DET.
+# Received bytes go into a preallocated ring (no allocation per byte or frame); complete frames wait there until
+# poll() applies them. Optionally a timer IRQ also drains the FIFO (config.I2C_RX_SERVICE_MS), so the master is not
+# held by clock stretching while the main loop is busy with a long blit.
+# Reads: a lone register number written just before a read (repeated start) sets the read pointer; on each read
+# request the TX FIFO is filled from the readback buffer (registers.readback) from there on.
 # Register layout follows RP2040. RP2350 is often compatible; if not, set I2C0_BASE/I2C1_BASE in config.
 
 from machine import mem32
@@ -16,11 +22,16 @@ I2C1_BASE = _B1
 O_IC_CON = 0x00
 O_IC_SAR = 0x08
 O_IC_DATA_CMD = 0x10
+O_IC_RAW_INTR_STAT = 0x34
 O_IC_ENABLE = 0x6C
 O_IC_STATUS = 0x70
 O_IC_CLR_START_DET = 0x64
 O_IC_CLR_STOP_DET = 0x60
 O_IC_CLR_RX_DONE = 0x58
+O_IC_CLR_RX_OVER = 0x4C
+O_IC_CLR_RD_REQ = 0x50
+O_IC_CLR_TX_ABRT = 0x54
+O_IC_ACK_GENERAL_CALL = 0x98
 
 M_IC_SAR = 0x3FF
 M_MASTER_MODE = 0x01
@@ -28,11 +39,48 @@ M_IC_SLAVE_DISABLE = 0x40
 M_RX_FIFO_FULL_HLD_CTRL = 0x200
 M_IC_ENABLE = 0x01
 M_RFNE = 0x08  # Receive FIFO Not Empty
+M_TFNF = 0x02  # Transmit FIFO Not Full
+M_SLV_ACTIVITY = 0x40  # IC_STATUS: a transaction addressed to us is in progress
 M_DAT = 0xFF
+M_FIRST_DATA_BYTE = 0x800  # IC_DATA_CMD: byte is the first of a transaction (slave receive)
+M_STOP_DET = 0x200  # IC_RAW_INTR_STAT: STOP seen; cleared by reading IC_CLR_STOP_DET
+M_RX_OVER = 0x02  # IC_RAW_INTR_STAT: RX FIFO overflowed; cleared by reading IC_CLR_RX_OVER
+M_RD_REQ = 0x20  # IC_RAW_INTR_STAT: master reads from us and waits (clock stretched) for the TX FIFO
+M_TX_ABRT = 0x40  # IC_RAW_INTR_STAT: TX FIFO flushed (e.g. bytes left over from a shorter read)
+M_ACK_GEN_CALL = 0x01
+
+MAX_FRAME = 32  # longest valid transaction; longer ones are dropped as malformed
+RX_RING_SIZE = 128  # bytes of complete and in-progress frames waiting for poll()
+RX_MAX_FRAMES = 16  # complete frames waiting for poll()
 
 _initialized = False
 _base = None
-_rx_buf = []
+_address = 0
+_timer = None
+_readback = None  # bytearray the master reads from (index = register number)
+_rd_ptr = 0  # register sent next
+
+# Ring: the receiving side (_service, main loop or timer IRQ) owns _w, _start, _cur, _drop and _fq_head; poll() owns
+# _tail and _fq_tail. Frames are contiguous in the ring, so poll() only needs their lengths (_lens).
+_ring = bytearray(RX_RING_SIZE)
+_lens = bytearray(RX_MAX_FRAMES)
+_frame = bytearray(MAX_FRAME)  # frame copied out of the ring for registers.apply_frame
+_w = 0  # next byte of the open frame goes here
+_start = 0  # first byte of the open frame
+_cur = 0  # length of the open frame (0 = none open)
+_drop = 0  # _DROP_* when the open frame will be dropped when it ends
+_fq_head = 0
+_tail = 0
+_fq_tail = 0
+_busy = False
+_DROP_OVERRUN = 1  # ring or frame queue full
+_DROP_LONG = 2  # longer than MAX_FRAME
+
+# Counters (never reset): frames applied, frames dropped because the ring was full (or the FIFO overflowed),
+# frames dropped as malformed (too long, or rejected by registers.apply_frame)
+rx_frames = 0
+rx_overruns = 0
+rx_malformed = 0
 
 
 def _clear(reg_offset, mask=1):
@@ -51,12 +99,18 @@ def _read(reg_offset):
     return mem32[_base + reg_offset]
 
 
-def init(i2c_bus_id, sda_pin, scl_pin, i2c_address):
-    """Enable I2C peripheral in slave-only mode at 7-bit address."""
-    global _initialized, _base
+def init(i2c_bus_id, sda_pin, scl_pin, i2c_address, service_ms=0, readback=None):
+    """
+    Enable I2C peripheral in slave-only mode at 7-bit address. service_ms > 0 also drains the RX FIFO (and answers
+    reads) from a timer IRQ every service_ms (hard IRQ where the port supports it); without a timer only poll()
+    does. readback = bytearray the master reads (None = reads return zeros).
+    """
+    global _initialized, _base, _address, _timer, _readback
     if _initialized:
         return True
     _base = I2C0_BASE if i2c_bus_id == 0 else I2C1_BASE
+    _address = i2c_address & 0x7F
+    _readback = readback
 
     # Disable
     _clear_reg(O_IC_ENABLE, M_IC_ENABLE)
@@ -69,6 +123,7 @@ def init(i2c_bus_id, sda_pin, scl_pin, i2c_address):
     _clear_reg(O_IC_CON, M_MASTER_MODE)
     _clear_reg(O_IC_CON, M_IC_SLAVE_DISABLE)
     mem32[_base + 0x2000 + O_IC_CON] = M_RX_FIFO_FULL_HLD_CTRL  # RX hold
+    mem32[_base + O_IC_ACK_GENERAL_CALL] = M_ACK_GEN_CALL  # also accept broadcasts to address 0
 
     # Enable
     mem32[_base + 0x2000 + O_IC_ENABLE] = M_IC_ENABLE
@@ -83,19 +138,124 @@ def init(i2c_bus_id, sda_pin, scl_pin, i2c_address):
         mem32[IO_BANK0_BASE + MEM_SET + (4 + 8 * pin)] = fn
 
     _initialized = True
+    if service_ms > 0:
+        try:
+            from machine import Timer
+            try:
+                _timer = Timer(period=service_ms, mode=Timer.PERIODIC, callback=_irq, hard=True)
+            except TypeError:
+                _timer = Timer(period=service_ms, mode=Timer.PERIODIC, callback=_irq)
+        except Exception:
+            _timer = None  # no timer: poll() alone drains the FIFO
     return True
 
 
+def _put(v):
+    global _w, _cur, _drop
+    if _drop:
+        return
+    if _cur >= MAX_FRAME:
+        _drop = _DROP_LONG
+        return
+    if (_w - _tail) % RX_RING_SIZE >= RX_RING_SIZE - 1:
+        _drop = _DROP_OVERRUN
+        return
+    _ring[_w] = v
+    _w = (_w + 1) % RX_RING_SIZE
+    _cur += 1
+
+
+def _close():
+    """End the open frame: hand it to poll(), or drop it and count why."""
+    global _w, _start, _cur, _drop, _fq_head, _rd_ptr, rx_overruns, rx_malformed
+    if _cur == 0 and not _drop:
+        return
+    nxt = (_fq_head + 1) % RX_MAX_FRAMES
+    if not _drop and nxt == _fq_tail:
+        _drop = _DROP_OVERRUN
+    if _drop:
+        if _drop == _DROP_LONG:
+            rx_malformed += 1
+        else:
+            rx_overruns += 1
+        _w = _start
+    else:
+        if _cur == 1:
+            _rd_ptr = _ring[_start]  # lone register number: where the next read starts
+        _lens[_fq_head] = _cur
+        _fq_head = nxt  # publish last: poll() may run between any two statements when a timer IRQ calls us
+        _start = _w
+    _cur = 0
+    _drop = 0
+
+
+def _service():
+    """
+    Drain the RX FIFO into the ring. Allocation-free, so it is safe in a hard IRQ. STOP_DET is sampled before the
+    drain, so it ends the frame that was open then: if a new transaction starts during the drain, its
+    FIRST_DATA_BYTE already closed that frame, and the new one is closed only once the FIFO is empty and the
+    slave is idle (its STOP may have been cleared together with the earlier one).
+    """
+    global _busy, rx_overruns
+    if _busy or not _initialized:
+        return
+    _busy = True
+    raw = _read(O_IC_RAW_INTR_STAT)
+    stop = raw & M_STOP_DET
+    if stop:
+        _read(O_IC_CLR_STOP_DET)
+    if raw & M_RX_OVER:
+        _read(O_IC_CLR_RX_OVER)
+        rx_overruns += 1
+    while _read(O_IC_STATUS) & M_RFNE:
+        v = _read(O_IC_DATA_CMD)
+        if v & M_FIRST_DATA_BYTE:
+            _close()
+            stop = 0  # the sampled STOP belonged to the frame just closed
+        _put(v & M_DAT)
+    if stop or not _read(O_IC_STATUS) & (M_RFNE | M_SLV_ACTIVITY):
+        _close()
+    if raw & M_TX_ABRT:
+        _read(O_IC_CLR_TX_ABRT)  # releases the flushed TX FIFO
+    if raw & M_RD_REQ:
+        _close()  # the register number written just before the read (repeated start, no STOP in between)
+        _transmit()
+        _read(O_IC_CLR_RD_REQ)
+    _busy = False
+
+
+def _transmit():
+    """Fill the TX FIFO from _readback at the read pointer (auto-increment); the peripheral flushes unread bytes."""
+    global _rd_ptr
+    n = len(_readback) if _readback is not None else 0
+    while _read(O_IC_STATUS) & M_TFNF:
+        mem32[_base + O_IC_DATA_CMD] = _readback[_rd_ptr] if _rd_ptr < n else 0
+        _rd_ptr = (_rd_ptr + 1) & 0xFF
+
+
+def _irq(_t):
+    _service()
+
+
 def poll(registers_module):
-    """Call each main-loop iteration: read any received bytes; on 2 bytes, set_register(b0, b1)."""
-    global _rx_buf
+    """
+    Call each main-loop iteration: drain the FIFO, then apply every complete transaction with
+    registers_module.apply_frame(frame, n, address). A transaction ends at the next FIRST_DATA_BYTE or at STOP.
+    STOP_DET is sampled before the FIFO is drained, so a STOP only completes the transaction it ended.
+    """
+    global _tail, _fq_tail, rx_frames, rx_malformed
     if not _initialized or _base is None:
         return
-    while _read(O_IC_STATUS) & M_RFNE:
-        _rx_buf.append(_read(O_IC_DATA_CMD) & M_DAT)
-    # On stop we could flush; we use "when we have 2 bytes" so partial writes don't apply
-    if len(_rx_buf) >= 2:
-        registers_module.set_register(_rx_buf[0], _rx_buf[1])
-        _rx_buf = _rx_buf[2:]  # keep any extra for next pair
-    if len(_rx_buf) > 16:
-        _rx_buf = []  # prevent runaway
+    _service()
+    while _fq_tail != _fq_head:
+        n = _lens[_fq_tail]
+        t = _tail
+        for i in range(n):
+            _frame[i] = _ring[t]
+            t = (t + 1) % RX_RING_SIZE
+        _tail = t
+        _fq_tail = (_fq_tail + 1) % RX_MAX_FRAMES
+        if registers_module.apply_frame(_frame, n, _address):
+            rx_frames += 1
+        else:
+            rx_malformed += 1
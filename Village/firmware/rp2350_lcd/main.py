@@ -1,36 +1,114 @@
 # Village – RP2350-Zero LCD controller main.
-# Scenes 0–7: bitmap animations from bitmap_anim.bin at 24 fps. Scene change over I2C.
+# Scenes 0–254: bitmap animations from bitmap_anim.bin on each scene's own timing (24 fps unless the asset sets a rate
+# or per-frame hold times). Scene change over I2C: immediate (scene register) or synced across boards (staged scene +
+# commit broadcast, see registers.py).
 
 import time
-import config
 import registers
 import display_driver
 import animations
 import i2c_slave
+from scheduler import FrameScheduler
 
-# When current_scene changes, we set scene_start_ticks so playback runs at 24 fps from that moment.
+try:
+    from config import SYNC_POLL_MS, SYNC_TIMEOUT_MS
+except ImportError:
+    SYNC_POLL_MS, SYNC_TIMEOUT_MS = 2, 1000
+try:
+    from config import STATUS_REFRESH_MS
+except ImportError:
+    STATUS_REFRESH_MS = 250
+try:
+    from config import IDLE_POLL_MS
+except ImportError:
+    IDLE_POLL_MS = 50
+try:
+    from gc import mem_free
+except ImportError:
+    def mem_free():
+        return 0
+
+# When the scene changes or restarts (registers.scene_seq), we set scene_start_ticks so the scene's timeline starts
+# from that moment.
 _last_scene = -1
+_last_seq = -1
 _scene_start_ticks = 0
+# ticks_ms when a staged scene was first seen (None = nothing staged)
+_staged_since = None
+# ticks_ms of the last status register refresh
+_status_at = 0
+
+# Frame pacing and timing counters (frames, dropped, draw_ms_*, late_ms_*, fps)
+scheduler = FrameScheduler(IDLE_POLL_MS)
+
+
+def update_status():
+    """Copy playback, heap and I2C counters into the status registers the Pico W reads."""
+    overruns, malformed = i2c_slave.rx_errors()
+    registers.update_status(
+        animations.shown_scene(),
+        animations.shown_frame(),
+        scheduler.fps,
+        scheduler.dropped,
+        scheduler.frames,
+        scheduler.draw_ms_avg,
+        mem_free(),
+        overruns,
+        malformed,
+    )
 
 
 def main():
-    global _last_scene, _scene_start_ticks
+    global _last_scene, _last_seq, _scene_start_ticks, _staged_since, _status_at
     display_driver.init()
     i2c_slave.start()
     while True:
         i2c_slave.poll()
         scene = registers.get_scene()
+        seq = registers.scene_seq
         now = time.ticks_ms()
-        if scene != _last_scene:
+        if seq != _last_seq or scene != _last_scene:
             _last_scene = scene
+            _last_seq = seq
             _scene_start_ticks = now
-        animations.run_frame(
+            scheduler.restart()
+        if registers.commit_pending():
+            if _staged_since is None:
+                _staged_since = now
+            if time.ticks_diff(now, _staged_since) < SYNC_TIMEOUT_MS:
+                # Commit is imminent: keep the current frame up and poll I2C often, so this board starts the
+                # staged scene within SYNC_POLL_MS of the broadcast, like every other board
+                time.sleep_ms(SYNC_POLL_MS)
+                continue
+        else:
+            _staged_since = None
+        # ticks_diff is only valid up to 2^29 ms (about 6 days): move the start forward by whole loops of the scene,
+        # which shows the same frames, so the elapsed time stays under one period however long the scene runs
+        period = animations.period_ms(scene)
+        if period:
+            elapsed = time.ticks_diff(now, _scene_start_ticks)
+            if elapsed >= period:
+                _scene_start_ticks = time.ticks_add(_scene_start_ticks, elapsed - elapsed % period)
+        drawn = animations.frames_drawn
+        dropped = animations.frames_dropped
+        wait_ms = animations.run_frame(
             display_driver.display,
             scene,
             now,
             _scene_start_ticks,
         )
-        time.sleep_ms(20)
+        scheduler.frame_done(
+            now,
+            wait_ms,
+            animations.frames_drawn != drawn,
+            animations.frames_dropped - dropped,
+        )
+        if time.ticks_diff(now, _status_at) >= STATUS_REFRESH_MS:
+            _status_at = now
+            update_status()
+        # Sleep until the next frame's deadline (redraws of an unchanged frame are skipped), but wake at least
+        # every IDLE_POLL_MS so I2C scene changes are picked up while a static scene is showing.
+        scheduler.sleep()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,102 @@
 # Village – RP2350-Zero register state (updated by I2C slave when master writes).
-# Protocol: register 0 = scene_id, register 1 = brightness (see docs/i2c_protocol.md).
+# Protocol: register 0 = scene_id, register 1 = brightness, 2 = staged scene, 3 = commit (see docs/i2c_protocol.md).
+# Synced scene change: the master stages a scene on every board, then broadcasts one commit; each board switches
+# to its staged scene and restarts the timeline the moment it sees the commit, so all displays start together.
+# One I2C write transaction is one frame: [reg, value, value, ...] writes consecutive registers (auto-increment).
+# Frames sent to the general call address (all boards) start with a broadcast command byte instead of a register.
+# Reads: the master writes a register number alone, then reads (repeated start) from there on (see readback).
+
+REG_SCENE = 0x00
+REG_BRIGHTNESS = 0x01
+REG_STAGE_SCENE = 0x02  # scene to switch to on the next commit (no visible effect on its own)
+REG_COMMIT = 0x03  # any value: switch to the staged scene and restart its timeline, even if it is already playing
+WRITABLE_REGS = 4  # registers 0 .. WRITABLE_REGS - 1 accept writes
+
+# Read-only status block, refreshed by main (update_status). Multi-byte values are big-endian; counters wrap.
+REG_STATUS = 0x10
+STATUS_SCENE = 0x10  # scene on the display (0xFF = none / black)
+STATUS_FRAME = 0x11  # frame index on the display
+STATUS_FPS = 0x12  # frames drawn during the last second
+STATUS_DROPPED = 0x13  # 2 bytes: frames dropped since boot
+STATUS_FRAMES = 0x15  # 2 bytes: frames drawn since boot
+STATUS_DRAW_MS = 0x17  # average draw time in ms (255 = 255 or more)
+STATUS_MEM_FREE = 0x18  # 3 bytes: free heap in bytes
+STATUS_RX_OVERRUNS = 0x1B  # 2 bytes: I2C transactions dropped because the receive ring was full
+STATUS_RX_MALFORMED = 0x1D  # 2 bytes: malformed I2C transactions dropped
+STATUS_LEN = 0x0F
+
+# Broadcast commands (first byte of a general call frame; never valid register numbers)
+CMD_BROADCAST = 0xA5  # [CMD_BROADCAST, reg, value, ...]: every board writes the values from reg on
+CMD_BROADCAST_EACH = 0xA6  # [CMD_BROADCAST_EACH, reg, addr, value, addr, value, ...]: each board takes its own pair
 
 current_scene = 0
 current_brightness = 255
+staged_scene = -1  # -1 = nothing staged
+# Bumped every time a scene (re)starts: a write of a different scene, or a commit. main restarts the timeline on change.
+scene_seq = 0
+
+# What a read returns: readback[reg]. Registers 0–2 mirror the writable state (staged scene 0xFF = none), register 3
+# reads 0, REG_STATUS on is the status block. The I2C slave reads this buffer directly (also from its timer IRQ).
+readback = bytearray(REG_STATUS + STATUS_LEN)
+readback[REG_BRIGHTNESS] = current_brightness
+readback[REG_STAGE_SCENE] = 0xFF
 
 
 def set_register(reg, value):
-    global current_scene, current_brightness
-    if reg == 0x00:
-        current_scene = value & 0xFF
-    elif reg == 0x01:
+    global current_scene, current_brightness, staged_scene, scene_seq
+    if reg == REG_SCENE:
+        staged_scene = -1  # an immediate scene replaces a pending synced change
+        if value & 0xFF != current_scene:
+            current_scene = value & 0xFF
+            scene_seq += 1
+    elif reg == REG_BRIGHTNESS:
         current_brightness = value & 0xFF
+    elif reg == REG_STAGE_SCENE:
+        staged_scene = value & 0xFF
+    elif reg == REG_COMMIT:
+        if staged_scene >= 0:
+            current_scene = staged_scene
+            staged_scene = -1
+            scene_seq += 1
+    readback[REG_SCENE] = current_scene
+    readback[REG_BRIGHTNESS] = current_brightness
+    readback[REG_STAGE_SCENE] = staged_scene & 0xFF
+
+
+def write(reg, data, start=0, end=-1):
+    """
+    Burst write: data[start], data[start + 1], … (up to end, default len(data)) go to reg, reg + 1, …
+    Returns False without writing anything if the burst runs past the last writable register.
+    """
+    if end < 0:
+        end = len(data)
+    if reg + end - start > WRITABLE_REGS:
+        return False
+    for i in range(start, end):
+        set_register(reg + i - start, data[i])
+    return True
+
+
+def apply_frame(frame, n, address):
+    """
+    Apply one received write transaction, frame[0:n]. address = this board's I2C address (for CMD_BROADCAST_EACH).
+    A lone register number only selects where the next read starts (handled by the I2C slave).
+    Returns False for a malformed frame (odd address/value pairs, unknown register), which is ignored as a whole.
+    """
+    if n < 2:
+        return n == 1
+    cmd = frame[0]
+    if cmd == CMD_BROADCAST:
+        return n > 2 and write(frame[1], frame, 2, n)
+    if cmd == CMD_BROADCAST_EACH:
+        reg = frame[1]
+        if n < 4 or n & 1 or reg >= WRITABLE_REGS:
+            return False
+        for i in range(2, n, 2):
+            if frame[i] == address:
+                set_register(reg, frame[i + 1])
+        return True
+    return write(cmd, frame, 1, n)
 
 
 def get_scene():
@@ -19,3 +105,27 @@ def get_scene():
 
 def get_brightness():
     return current_brightness
+
+
+def commit_pending():
+    """True while a staged scene waits for its commit."""
+    return staged_scene >= 0
+
+
+def _put(reg, value, n):
+    for i in range(n - 1, -1, -1):
+        readback[reg + i] = value & 0xFF
+        value >>= 8
+
+
+def update_status(scene, frame, fps, dropped, frames, draw_ms, mem_free, rx_overruns, rx_malformed):
+    """Refresh the status block the master reads. scene < 0 = nothing on the display."""
+    readback[STATUS_SCENE] = scene if scene >= 0 else 0xFF
+    readback[STATUS_FRAME] = frame & 0xFF
+    readback[STATUS_FPS] = min(fps, 255)
+    _put(STATUS_DROPPED, dropped, 2)
+    _put(STATUS_FRAMES, frames, 2)
+    readback[STATUS_DRAW_MS] = min(draw_ms, 255)
+    _put(STATUS_MEM_FREE, min(mem_free, 0xFFFFFF), 3)
+    _put(STATUS_RX_OVERRUNS, rx_overruns, 2)
+    _put(STATUS_RX_MALFORMED, rx_malformed, 2)
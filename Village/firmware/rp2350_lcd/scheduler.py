@@ -0,0 +1,80 @@
+# Village – RP2350-Zero frame scheduler: absolute frame deadlines, frame dropping, timing stats.
+# The main loop draws, then sleeps until the next frame's deadline. Deadlines come from the scene timeline
+# (animations.run_frame returns the ms until the next frame), so a slow draw never pushes later frames back:
+# the next iteration simply shows the frame that is due by then and counts the ones it skipped.
+# All tick arithmetic uses ticks_diff/ticks_add, so the ~12-day ticks_ms wraparound is harmless.
+
+import time
+
+
+class FrameScheduler:
+    """
+    Deadline pacing plus running counters:
+      frames        frames sent to the display
+      dropped       timeline frames never shown because a draw overran
+      draw_ms       last / avg / max time spent in run_frame for a drawn frame
+      late_ms       last / avg / max lateness of a drawn frame's start vs its deadline
+      fps           frames drawn during the last full one-second window
+    Averages are integer moving averages (1/8 weight per sample), cheap enough to update every frame.
+    """
+
+    def __init__(self, idle_poll_ms=50):
+        self.idle_poll_ms = idle_poll_ms
+        self.deadline = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.dropped = 0
+        self.draw_ms = 0
+        self.draw_ms_avg = 0
+        self.draw_ms_max = 0
+        self.late_ms = 0
+        self.late_ms_avg = 0
+        self.late_ms_max = 0
+        self.fps = 0
+        self._window_start = time.ticks_ms()
+        self._window_frames = 0
+
+    def restart(self):
+        """Forget the pending deadline (scene change): the next frame is due immediately."""
+        self.deadline = None
+
+    def frame_done(self, start, wait_ms, drawn, dropped=0):
+        """
+        Record one loop iteration. start = ticks_ms when it began, wait_ms = run_frame's result,
+        drawn = whether a frame was sent, dropped = timeline frames skipped by that draw.
+        """
+        end = time.ticks_ms()
+        if drawn:
+            self.frames += 1
+            self.dropped += dropped
+            self._window_frames += 1
+            d = time.ticks_diff(end, start)
+            self.draw_ms = d
+            self.draw_ms_avg += (d - self.draw_ms_avg) >> 3
+            if d > self.draw_ms_max:
+                self.draw_ms_max = d
+            late = time.ticks_diff(start, self.deadline) if self.deadline is not None else 0
+            if late < 0:
+                late = 0
+            self.late_ms = late
+            self.late_ms_avg += (late - self.late_ms_avg) >> 3
+            if late > self.late_ms_max:
+                self.late_ms_max = late
+        # Next deadline is absolute: measured from when this frame was due to start, not from when drawing ended
+        self.deadline = time.ticks_add(start, wait_ms) if wait_ms is not None else None
+        if time.ticks_diff(end, self._window_start) >= 1000:
+            self.fps = self._window_frames
+            self._window_frames = 0
+            self._window_start = end
+
+    def sleep(self):
+        """Sleep until the next deadline, at most idle_poll_ms (so I2C is still polled); no sleep if already due."""
+        wait = self.idle_poll_ms
+        if self.deadline is not None:
+            wait = time.ticks_diff(self.deadline, time.ticks_ms())
+            if wait > self.idle_poll_ms:
+                wait = self.idle_poll_ms
+        if wait > 0:
+            time.sleep_ms(wait)
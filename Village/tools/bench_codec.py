@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Village – Host benchmark for BANM v2 frame compression.
+
+Encodes frames with the tool's encoder (encode_frame_v2) and decodes them with the device decoder
+(firmware/rp2350_lcd/animations.rle_decode, run under CPython), then reports per content type: compression
+ratio, encode time and decode time per frame. Every decoded frame is checked against the source.
+Frames are synthetic (flat, shadow silhouettes, gradient, noise) unless --input points at a scene tree.
+With --palette 16/256 each content type is quantized as one scene and stored as palette indices (CODEC_PAL4/
+PAL8), decoded through the device's lookup-table expanders; decoded frames are checked against the quantized source.
+
+Usage:
+  python bench_codec.py [--input ROOT] [--frames N] [--width W] [--height H] [--palette {16,256}]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from array import array
+
+import image_sequence_to_bitmap as tool
+
+FIRMWARE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "firmware", "rp2350_lcd")
+
+
+def _load_animations():
+    sys.path.insert(0, os.path.abspath(FIRMWARE_DIR))
+    import animations
+
+    return animations
+
+
+def synthetic_frames(kind, count, width, height):
+    """Yield `count` (height, width) uint16 RGB565 frames of one content type."""
+    import numpy as np
+
+    rng = np.random.default_rng(42)
+    yy, xx = np.mgrid[0:height, 0:width]
+    for i in range(count):
+        if kind == "flat":
+            frame = np.full((height, width), tool.rgb_to_rgb565(30, 20, 10), dtype=np.uint16)
+        elif kind == "shadow":
+            # warm window glow with a dark figure and a lamp post sliding across it
+            frame = np.full((height, width), tool.rgb_to_rgb565(200, 140, 60), dtype=np.uint16)
+            cx = (i * 6) % (width + 60) - 30
+            figure = ((xx - cx) ** 2 / 400 + (yy - height * 0.6) ** 2 / 3600) < 1
+            head = ((xx - cx) ** 2 + (yy - height * 0.35) ** 2) < 200
+            frame[figure | head] = tool.rgb_to_rgb565(20, 12, 8)
+            frame[:, width // 5 : width // 5 + 6] = tool.rgb_to_rgb565(40, 30, 20)
+        elif kind == "gradient":
+            rgb = np.stack([(xx + i) & 0xFF, (yy // 2) & 0xFF, np.full_like(xx, 80)], axis=-1).astype(np.uint16)
+            frame = ((rgb[..., 0] >> 3) << 11) | ((rgb[..., 1] >> 2) << 5) | (rgb[..., 2] >> 3)
+        else:  # noise
+            frame = rng.integers(0, 0x10000, size=(height, width), dtype=np.uint16)
+        yield frame.astype(np.uint16)
+
+
+def input_frames(root, count, width, height):
+    """Yield up to `count` converted frames from a real scene tree."""
+    paths = [p for scene in tool.discover_scenes(root) for p in scene][:count]
+    for p in paths:
+        yield tool.load_and_convert_frame(p, width, height)
+
+
+def decode_indexed(animations, payload, lut, width, height):
+    """Expand a CODEC_PAL4/PAL8 payload the way BitmapAsset does: index rows expanded through the lookup table by offset."""
+    data = payload[1:]
+    dst = bytearray(width * height * 2)
+    if payload[0] == tool.CODEC_PAL8:
+        animations._lut_expand8(dst, data, lut, array("i", (0, 0, width * height)))
+    elif not width & 1:
+        animations._lut_expand4(dst, data, lut, array("i", (0, 0, width * height)))
+    else:
+        stride = (width + 1) // 2
+        for r in range(height):
+            animations._lut_expand4(dst, data, lut, array("i", (r * width * 2, r * stride, width)))
+    return bytes(dst)
+
+
+def bench(label, frames, animations, palette=0):
+    raw_total = stored_total = 0
+    enc_time = dec_time = 0.0
+    n = 0
+    decoded = 0
+    rle_frames = 0
+    pal_frames = 0
+    if palette:
+        frames = list(frames)
+        t0 = time.perf_counter()
+        pal, indices = tool.quantize_scene(frames, palette)
+        enc_time += time.perf_counter() - t0
+        bits = 4 if len(pal) <= 16 else 8
+        lut = bytearray(512)
+        lut[: len(pal) * 2] = tool.frame_to_bytes(pal)
+        stored_total += 2 + len(pal) * 2
+        jobs = [(pal[idx], idx) for idx in indices]
+    else:
+        jobs = [(frame, None) for frame in frames]
+    for frame, idx in jobs:
+        raw = tool.frame_to_bytes(frame)
+        height, width = frame.shape
+        t0 = time.perf_counter()
+        payload = tool.encode_frame_v2(frame) if idx is None else tool.encode_frame_v2(frame, idx, bits)
+        enc_time += time.perf_counter() - t0
+        raw_total += len(raw)
+        stored_total += len(payload)
+        n += 1
+        if payload[0] == tool.CODEC_RLE:
+            rle_frames += 1
+            dst = bytearray(len(raw))
+            src = io.BytesIO(payload[1:])
+            t0 = time.perf_counter()
+            animations.rle_decode(src, len(payload) - 1, memoryview(dst))
+            dec_time += time.perf_counter() - t0
+            decoded += 1
+            out = bytes(dst)
+        elif payload[0] != tool.CODEC_RAW:
+            pal_frames += 1
+            t0 = time.perf_counter()
+            out = decode_indexed(animations, payload, lut, width, height)
+            dec_time += time.perf_counter() - t0
+            decoded += 1
+        else:
+            out = payload[1:]
+        if out != raw:
+            sys.exit(f"{label}: decoded frame {n - 1} does not match the source")
+    if not n:
+        return
+    ratio = raw_total / stored_total
+    dec_ms = dec_time * 1000 / decoded if decoded else 0.0
+    print(
+        f"  {label:<9} {n:4d} frames  ratio {ratio:7.2f}:1  rle {rle_frames:4d}/{n:<4d}  palette {pal_frames:4d}/{n:<4d}"
+        f"  encode {enc_time * 1000 / n:7.2f} ms/frame  decode {dec_ms:7.2f} ms/frame"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BANM v2 compression ratio and decode time.")
+    parser.add_argument("--input", default=None, help="Scene tree (folders 0..254) to benchmark instead of synthetic frames")
+    parser.add_argument("--frames", type=int, default=24, help="Frames per content type (default: 24)")
+    parser.add_argument("--width", "-W", type=int, default=240, help="Frame width (default: 240)")
+    parser.add_argument("--height", "-H", type=int, default=320, help="Frame height (default: 320)")
+    parser.add_argument("--palette", type=int, choices=(16, 256), default=0, help="Quantize to a palette (default: off)")
+    args = parser.parse_args()
+
+    animations = _load_animations()
+    mode = f"{args.palette}-colour palette" if args.palette else "RGB565"
+    print(f"{args.width}x{args.height} {mode}, decode = animations decoders on host CPython:")
+    if args.input:
+        frames = input_frames(os.path.abspath(args.input), args.frames, args.width, args.height)
+        bench("input", frames, animations, args.palette)
+        return
+    for kind in ("flat", "shadow", "gradient", "noise"):
+        bench(kind, synthetic_frames(kind, args.frames, args.width, args.height), animations, args.palette)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Village – Benchmark suite for image_sequence_to_bitmap.py.
+
+Generates a synthetic scene tree (folders 0..N-1 of numbered PNG or JPEG images; content cycles through
+flat, shadow, photographic and noise scenes), then converts it the way the tool does and times each stage
+separately, frame by frame:
+  discovery   discover_scenes() over the tree
+  decode      Image.open + convert("RGB")
+  resize      LANCZOS resize to the target size
+  rgb565      image_to_rgb565
+  bin_write   BinSink.write_frame + close (BANM v2 encode, dedup, dirty rects, or raw v1 with --format 1)
+  c_write     CSink.write_frame + close
+and, as a check on the sum, one end-to-end stream_scenes() run with both sinks (--jobs workers).
+Per stage: seconds, frames/sec, and peak memory above the level at stage start as resident set size
+(Linux: peak reset through /proc/self/clear_refs; includes Pillow image buffers) and, with --traced, as
+traced by tracemalloc (Python objects and NumPy arrays; slows allocation-heavy stages, so times from a
+--traced run are not comparable with plain ones). Results can be written as JSON (--json) and compared
+with an earlier run (--compare) to spot regressions.
+
+Usage:
+  python bench_convert.py [--scenes N] [--frames N] [--source-size WxH] [--source-format {png,jpg}]
+                          [--width W] [--height H] [--format {1,2}] [--jobs N] [--tree DIR]
+                          [--traced] [--json OUT] [--compare BASELINE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import image_sequence_to_bitmap as tool
+
+CONTENT = ("flat", "shadow", "photo", "noise")
+STAGES = ("discovery", "decode", "resize", "rgb565", "bin_write", "c_write")
+RESULTS_VERSION = 1  # bump when the JSON layout or the meaning of a figure changes
+
+
+def _rss_kb(field):
+    """VmRSS / VmHWM of this process in KB, or None where /proc is not available."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_rss_peak():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class Stage:
+    """Accumulates time and peak memory over every entry into one stage (use as a context manager)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.frames = 0
+        self.peak_traced = None
+        self.peak_rss_kb = None
+
+    def __enter__(self):
+        self._traced = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._traced = tracemalloc.get_traced_memory()[0]
+        self._rss = _rss_kb("VmRSS:") if _reset_rss_peak() else None
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._t0
+        if self._traced is not None:
+            self.peak_traced = max(self.peak_traced or 0, tracemalloc.get_traced_memory()[1] - self._traced)
+        if self._rss is not None:
+            hwm = _rss_kb("VmHWM:")
+            if hwm is not None:
+                self.peak_rss_kb = max(self.peak_rss_kb or 0, hwm - self._rss)
+        return False
+
+    def result(self):
+        return {
+            "seconds": round(self.seconds, 4),
+            "frames": self.frames,
+            "fps": round(self.frames / self.seconds, 2) if self.frames and self.seconds else None,
+            "peak_traced_kb": round(self.peak_traced / 1024) if self.peak_traced is not None else None,
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+
+def synthetic_image(kind, i, width, height, rng):
+    """One (height, width, 3) uint8 source image of a content type; i animates it."""
+    import numpy as np
+
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    if kind == "flat":
+        img = np.empty((height, width, 3), np.float32)
+        img[:] = (40, 28, 18)
+    elif kind == "shadow":
+        img = np.empty((height, width, 3), np.float32)
+        img[:] = (200, 140, 60)
+        cx = (i * 12) % (width + 120) - 60
+        figure = ((xx - cx) ** 2 / (width * 3.3) + (yy - height * 0.6) ** 2 / (height * 11)) < 1
+        img[figure] = (20, 12, 8)
+    elif kind == "photo":
+        # smooth lighting, soft blobs and fine grain: gradients everywhere, few exact repeats (like a render)
+        phase = i * 0.15
+        base = 0.5 + 0.25 * np.sin(xx / width * 3 + phase) * np.cos(yy / height * 2 - phase)
+        blobs = 0.2 * np.sin(xx / 23 + yy / 31 + phase * 2) * np.sin(yy / 17 - phase)
+        light = np.clip(base + blobs, 0, 1)
+        grain = rng.normal(0, 6, size=(height, width, 1))
+        img = light[..., None] * np.array((235, 170, 110), np.float32) + grain
+    else:  # noise
+        img = rng.integers(0, 256, size=(height, width, 3)).astype(np.float32)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def generate_tree(root, scenes, frames, width, height, fmt):
+    """Write scenes 0..scenes-1 of `frames` images each under root (skipped when the tree is already there)."""
+    import numpy as np
+    from PIL import Image
+
+    marker = os.path.join(root, f".bench_{scenes}x{frames}_{width}x{height}.{fmt}")
+    if os.path.exists(marker):
+        return
+    rng = np.random.default_rng(7)
+    for s in range(scenes):
+        folder = os.path.join(root, str(s))
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder)
+        kind = CONTENT[s % len(CONTENT)]
+        for i in range(frames):
+            img = Image.fromarray(synthetic_image(kind, i, width, height, rng))
+            img.save(os.path.join(folder, f"{i:03d}.{fmt}"), **({"quality": 90} if fmt == "jpg" else {}))
+    open(marker, "w").close()
+
+
+def run_stages(root, out_dir, width, height, version):
+    """Convert the tree frame by frame, timing each stage on its own. Returns {stage: Stage}."""
+    from PIL import Image
+
+    stages = {name: Stage(name) for name in STAGES}
+    with stages["discovery"] as st:
+        scenes_paths = tool.discover_scenes(root)
+    st.frames = sum(len(p) for p in scenes_paths)
+    counts = [len(p) for p in scenes_paths]
+    with stages["bin_write"]:
+        bin_sink = tool.BinSink("bench", out_dir, width, height, counts, version=version)
+    with stages["c_write"]:
+        c_sink = tool.CSink("bench", out_dir, width, height, counts)
+    resample = getattr(Image.Resampling, tool.RESAMPLE)
+    for path in (p for scene in scenes_paths for p in scene):
+        with stages["decode"]:
+            img = Image.open(path).convert("RGB")
+        with stages["resize"]:
+            img = img.resize((width, height), resample)
+        with stages["rgb565"]:
+            frame = tool.image_to_rgb565(img)
+        with stages["bin_write"]:
+            bin_sink.write_frame(frame)
+        with stages["c_write"]:
+            c_sink.write_frame(frame)
+        for name in STAGES[1:]:
+            stages[name].frames += 1
+        del img, frame
+    with stages["bin_write"]:
+        bin_sink.close()
+    with stages["c_write"]:
+        c_sink.close()
+    return stages
+
+
+def run_end_to_end(root, out_dir, width, height, version, jobs):
+    scenes_paths = tool.discover_scenes(root)
+    counts = [len(p) for p in scenes_paths]
+    total = Stage("end_to_end")
+    with total:
+        sinks = [
+            tool.BinSink("e2e", out_dir, width, height, counts, version=version),
+            tool.CSink("e2e", out_dir, width, height, counts),
+        ]
+        total.frames = tool.stream_scenes(scenes_paths, width, height, sinks, jobs)
+    return total, os.path.getsize(sinks[0].path)
+
+
+def compare(result, baseline_path):
+    """Print each stage's frames/sec and peak memory against a baseline JSON from an earlier run."""
+    with open(baseline_path) as f:
+        base = json.load(f)
+    print(f"vs {baseline_path}:")
+    for name, cur in result["stages"].items():
+        old = base.get("stages", {}).get(name)
+        if not old:
+            continue
+        parts = []
+        if cur["fps"] and old.get("fps"):
+            parts.append(f"fps {cur['fps'] / old['fps']:6.2f}x")
+        elif old.get("seconds"):
+            parts.append(f"time {cur['seconds'] / old['seconds']:6.2f}x")
+        for key in ("peak_traced_kb", "peak_rss_kb"):
+            if cur.get(key) is not None and old.get(key) is not None:
+                parts.append(f"{key} {old[key]:>7} -> {cur[key]:<7}")
+        print(f"  {name:<11} " + "  ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image_sequence_to_bitmap.py stage by stage.")
+    parser.add_argument("--scenes", type=int, default=8, help="Scenes in the synthetic tree (default: 8)")
+    parser.add_argument("--frames", type=int, default=24, help="Frames per scene (default: 24)")
+    parser.add_argument("--source-size", default="480x640", help="Source image size WxH (default: 480x640)")
+    parser.add_argument("--source-format", choices=("png", "jpg"), default="png", help="Source image format")
+    parser.add_argument("--width", "-W", type=int, default=240, help="Output width (default: 240)")
+    parser.add_argument("--height", "-H", type=int, default=320, help="Output height (default: 320)")
+    parser.add_argument("--format", type=int, choices=(1, 2), default=2, help="BANM version for bin_write")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Workers for the end-to-end run (0 = per core)")
+    parser.add_argument("--tree", default=None, help="Keep the generated tree here and reuse it on later runs")
+    parser.add_argument("--traced", action="store_true", help="Also measure tracemalloc peaks (slower timings)")
+    parser.add_argument("--json", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    try:
+        src_w, src_h = (int(v) for v in args.source_size.lower().split("x"))
+    except ValueError:
+        sys.exit(f"--source-size: expected WxH (got {args.source_size!r}).")
+    if not 1 <= args.frames <= tool.MAX_FRAMES or not 1 <= args.scenes <= tool.NUM_SCENES:
+        sys.exit(f"--frames must be 1..{tool.MAX_FRAMES} and --scenes 1..{tool.NUM_SCENES}.")
+    jobs = args.jobs or os.cpu_count() or 1
+
+    work = tempfile.mkdtemp(prefix="village_bench_")
+    try:
+        root = os.path.abspath(args.tree) if args.tree else os.path.join(work, "tree")
+        os.makedirs(root, exist_ok=True)
+        t0 = time.perf_counter()
+        generate_tree(root, args.scenes, args.frames, src_w, src_h, args.source_format)
+        gen_s = time.perf_counter() - t0
+
+        if args.traced:
+            tracemalloc.start()
+        stages = run_stages(root, work, args.width, args.height, args.format)
+        total, bin_bytes = run_end_to_end(root, work, args.width, args.height, args.format, jobs)
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    import numpy as np
+    import PIL
+
+    frames = args.scenes * args.frames
+    result = {
+        "version": RESULTS_VERSION,
+        "config": {
+            "scenes": args.scenes,
+            "frames_per_scene": args.frames,
+            "content": [CONTENT[s % len(CONTENT)] for s in range(args.scenes)],
+            "source": f"{src_w}x{src_h} {args.source_format}",
+            "output": f"{args.width}x{args.height}",
+            "format": args.format,
+            "jobs": jobs,
+            "traced": args.traced,
+        },
+        "host": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": {name: st.result() for name, st in stages.items()},
+        "end_to_end": dict(total.result(), bin_bytes=bin_bytes),
+    }
+    result["stages"]["sum"] = {
+        "seconds": round(sum(st.seconds for st in stages.values()), 4),
+        "frames": frames,
+        "fps": round(frames / sum(st.seconds for st in stages.values()), 2),
+    }
+
+    print(
+        f"{frames} frames ({args.scenes} scenes x {args.frames}, {src_w}x{src_h} {args.source_format})"
+        f" -> {args.width}x{args.height} BANM v{args.format} + C; tree generated in {gen_s:.1f} s"
+    )
+    print(f"  {'stage':<11} {'seconds':>9} {'frames/s':>10} {'traced KB':>10} {'RSS KB':>8}")
+    rows = list(result["stages"].items()) + [("end_to_end", result["end_to_end"])]
+    for name, r in rows:
+        fps = f"{r['fps']:10.1f}" if r.get("fps") else f"{'-':>10}"
+        traced = r.get("peak_traced_kb")
+        rss = r.get("peak_rss_kb")
+        print(
+            f"  {name:<11} {r['seconds']:9.3f} {fps} {'-' if traced is None else traced:>10}"
+            f" {'-' if rss is None else rss:>8}"
+        )
+    if args.compare:
+        compare(result, args.compare)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
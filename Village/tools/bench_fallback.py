@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Village – Host benchmark for the RP2350 fallback renderer (drivers without blit_buffer).
+
+Times the original per-pixel loop (display_driver.pixel-style helper with a hasattr check, one call per
+pixel) against animations._blit_spans (one fill_rect per horizontal run of equal colour, driver method
+bound once), on the synthetic frames of bench_codec.py. The fake display stores pixels, so every result
+is checked against the source frame; driver call counts are reported alongside the time.
+
+Usage:
+  python bench_fallback.py [--frames N] [--width W] [--height H]
+"""
+
+import argparse
+import sys
+import time
+
+import image_sequence_to_bitmap as tool
+from bench_codec import _load_animations, synthetic_frames
+
+
+class FakeDisplay:
+    """Minimal driver with pixel() and fill_rect() only (no blit_buffer), recording into a pixel list."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.pixels = [0] * (width * height)
+        self.calls = 0
+
+    def pixel(self, x, y, c):
+        self.calls += 1
+        self.pixels[y * self.width + x] = c
+
+    def fill_rect(self, x, y, w, h, c):
+        self.calls += 1
+        for yy in range(y, y + h):
+            i = yy * self.width + x
+            self.pixels[i:i + w] = [c] * w
+
+
+def _legacy_pixel(disp, x, y, color):
+    if hasattr(disp, "pixel"):
+        disp.pixel(x, y, color)
+    else:
+        disp.fill_rect(x, y, 1, 1, color)
+
+
+def legacy_blit(display, buf, x0, y0, w, rows):
+    """The original fallback: nested loop, one helper call per pixel."""
+    for y in range(rows):
+        for x in range(w):
+            i = (y * w + x) * 2
+            c = buf[i] | (buf[i + 1] << 8)
+            _legacy_pixel(display, x0 + x, y0 + y, c)
+
+
+def bench(label, frames, blit, width, height):
+    elapsed = 0.0
+    calls = n = 0
+    for frame in frames:
+        buf = tool.frame_to_bytes(frame)
+        disp = FakeDisplay(width, height)
+        t0 = time.perf_counter()
+        blit(disp, buf, 0, 0, width, height)
+        elapsed += time.perf_counter() - t0
+        if disp.pixels != frame.ravel().tolist():
+            sys.exit(f"{label}: frame {n} drawn incorrectly")
+        calls += disp.calls
+        n += 1
+    return elapsed * 1000 / n, calls // n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the no-blit_buffer fallback: per-pixel vs run-length spans.")
+    parser.add_argument("--frames", type=int, default=4, help="Frames per content type (default: 4)")
+    parser.add_argument("--width", "-W", type=int, default=240, help="Frame width (default: 240)")
+    parser.add_argument("--height", "-H", type=int, default=320, help="Frame height (default: 320)")
+    args = parser.parse_args()
+
+    animations = _load_animations()
+    w, h = args.width, args.height
+    print(f"{w}x{h} RGB565, fake driver without blit_buffer:")
+    for kind in ("flat", "shadow", "gradient", "noise"):
+        old_ms, old_calls = bench(kind, synthetic_frames(kind, args.frames, w, h), legacy_blit, w, h)
+        new_ms, new_calls = bench(kind, synthetic_frames(kind, args.frames, w, h), animations._blit_spans, w, h)
+        print(
+            f"  {kind:<9} per-pixel {old_ms:8.1f} ms/frame {old_calls:6d} calls"
+            f"   spans {new_ms:8.1f} ms/frame {new_calls:6d} calls   speedup {old_ms / new_ms:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
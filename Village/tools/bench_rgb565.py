@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Village – Benchmark the RGB565 conversion + .bin write path of image_sequence_to_bitmap.py.
+
+Compares the original per-pixel path (list(img.getdata()), rgb_to_rgb565 per pixel, struct.pack + f.write
+per word) against the NumPy path (one uint16 array per frame, one buffer write per frame). Frames are
+synthetic PNGs written to a temporary folder, so decode and LANCZOS resize are included in both timings.
+
+Usage:
+  python bench_rgb565.py [--frames N] [--width W] [--height H]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import warnings
+
+import image_sequence_to_bitmap as tool
+
+
+def legacy_load_and_convert_frame(path, width, height):
+    """The pre-NumPy conversion: Python list of RGB565 ints, one call per pixel."""
+    from PIL import Image
+
+    img = Image.open(path)
+    img = img.convert("RGB")
+    img = img.resize((width, height), Image.Resampling.LANCZOS)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)  # getdata() is deprecated in newer Pillow
+        pixels = list(img.getdata())
+    return [tool.rgb_to_rgb565(r, g, b) for r, g, b in pixels]
+
+
+def legacy_write_frame(f, frame):
+    for word in frame:
+        f.write(struct.pack("<H", word))
+
+
+def make_frames(folder, count, width, height):
+    """Write `count` synthetic PNGs (gradient + noise, source at 2x target size) and return their paths."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(1234)
+    yy, xx = np.mgrid[0 : height * 2, 0 : width * 2]
+    paths = []
+    for i in range(count):
+        rgb = np.empty((height * 2, width * 2, 3), dtype=np.uint8)
+        rgb[..., 0] = (xx + i * 7) & 0xFF
+        rgb[..., 1] = (yy + i * 3) & 0xFF
+        rgb[..., 2] = rng.integers(0, 256, size=xx.shape, dtype=np.uint8)
+        path = os.path.join(folder, f"{i:03d}.png")
+        Image.fromarray(rgb, "RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def run(label, paths, out_path, convert, write):
+    start = time.perf_counter()
+    with open(out_path, "wb") as f:
+        for p in paths:
+            write(f, convert(p))
+    elapsed = time.perf_counter() - start
+    fps = len(paths) / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<8} {elapsed:8.3f} s  {fps:8.2f} frames/s")
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RGB565 conversion: per-pixel vs NumPy.")
+    parser.add_argument("--frames", type=int, default=8, help="Number of frames (default: 8)")
+    parser.add_argument("--width", "-W", type=int, default=240, help="Output width (default: 240)")
+    parser.add_argument("--height", "-H", type=int, default=320, help="Output height (default: 320)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_frames(tmp, args.frames, args.width, args.height)
+        legacy_out = os.path.join(tmp, "legacy.bin")
+        numpy_out = os.path.join(tmp, "numpy.bin")
+        print(f"{args.frames} frames, {args.width}x{args.height} RGB565:")
+        before = run(
+            "legacy", paths, legacy_out,
+            lambda p: legacy_load_and_convert_frame(p, args.width, args.height),
+            legacy_write_frame,
+        )
+        after = run(
+            "numpy", paths, numpy_out,
+            lambda p: tool.load_and_convert_frame(p, args.width, args.height),
+            lambda f, frame: f.write(tool.frame_to_bytes(frame)),
+        )
+        with open(legacy_out, "rb") as a, open(numpy_out, "rb") as b:
+            identical = a.read() == b.read()
+    print(f"Speedup: {after / before:.1f}x  (output identical: {'yes' if identical else 'NO'})")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
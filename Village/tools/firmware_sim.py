@@ -0,0 +1,1148 @@
+#!/usr/bin/env python3
+"""
+Village – Host simulator and playback benchmark for the MicroPython firmware.
+
+Runs the real firmware/pico_w and firmware/rp2350_lcd main loops under CPython with stand-ins for the
+board-only modules:
+  machine     Pin, SPI, I2C (master, wired to the simulated LCD boards) and mem32 (a DesignWare I2C slave
+              whose RX FIFO is filled by the Pico W's writeto(); its address is whatever i2c_slave_hw
+              programs into IC_SAR)
+  st7789py    recording ST7789: counts calls and bytes and charges SPI time at the driver's baud rate
+  neopixel    Neopixel that counts show() calls (plus urandom, network and umqtt.simple)
+  MQTT        a local broker that replays scripted publications to the Pico W's client
+Each board keeps its own virtual clock (time.ticks_ms / sleep_ms). Time advances only by sleeping and by
+the modelled costs: SPI bytes, flash reads (--flash-mbps), I2C bytes at the bus frequency, and optionally
+host CPU time (--cpu-scale), so results are repeatable. The board whose clock is furthest behind runs next;
+I2C bytes carry the sender's timestamp and the LCD only sees them once its own clock has caught up.
+
+Reports per LCD: frames/sec, dropped frames, SPI bytes and flash bytes per frame, peak transient heap per
+drawn frame (CPython tracemalloc peak during run_frame), and for every scene change published over MQTT the
+latency to the I2C write, to the LCD receiving it and to the first draw of the new scene.
+Without --asset it builds a synthetic bitmap_anim.bin (scenes 1–4: shadow, flat, gradient, noise).
+
+Usage:
+  python firmware_sim.py [--asset BIN] [--seconds S] [--lcds N] [--band-rows N] [--cache-kb N]
+                         [--publish MS:TOPIC=PAYLOAD ...] [--stats-ms MS] [--broker-outage MS:MS] [--json OUT]
+"""
+
+import argparse
+import errno
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+
+import image_sequence_to_bitmap as tool
+from bench_codec import synthetic_frames
+
+FIRMWARE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "firmware")
+
+# DesignWare I2C register offsets used by i2c_slave_hw (RP2040 default bases)
+I2C_BASES = (0x40044000, 0x40048000)
+IC_SAR = 0x08
+IC_DATA_CMD = 0x10
+IC_DATA_CMD_FIRST_DATA_BYTE = 0x800
+IC_RAW_INTR_STAT = 0x34
+IC_RAW_INTR_STOP_DET = 0x200
+IC_RAW_INTR_RD_REQ = 0x20
+IC_RAW_INTR_TX_ABRT = 0x40
+IC_CLR_RD_REQ = 0x50
+IC_CLR_TX_ABRT = 0x54
+IC_CLR_STOP_DET = 0x60
+IC_ENABLE = 0x6C
+IC_STATUS = 0x70
+IC_STATUS_RFNE = 0x08
+IC_STATUS_SLV_ACTIVITY = 0x40
+IC_STATUS_TFNF = 0x02
+IC_TX_FIFO_DEPTH = 16
+IC_ACK_GENERAL_CALL = 0x98
+GENERAL_CALL = 0x00
+CMD_BROADCAST = 0xA5
+CMD_BROADCAST_EACH = 0xA6
+
+SYNTHETIC_SCENES = ((1, "shadow", 24), (2, "flat", 4), (3, "gradient", 24), (4, "noise", 6))
+BOOT_SPREAD_MS = 200  # LCD boards start their main loop at a random time in the first BOOT_SPREAD_MS
+SPI_CMD_BYTES = 11  # CASET + RASET + RAMWR (with arguments) before each window of pixel data
+
+
+class SimDone(BaseException):
+    """Raised inside a board's thread when its clock reaches the end (BaseException: firmware catches Exception)."""
+
+
+class Probe:
+    """One scene change published over MQTT, followed to the display."""
+
+    def __init__(self, t_pub, lcd, scene):
+        self.t_pub = t_pub
+        self.lcd = lcd
+        self.scene = scene
+        self.t_i2c = None
+        self.t_rx = None
+        self.t_shown = None
+        self.t_start = None  # the LCD's _scene_start_ticks for the new scene
+
+
+# ----- Board stand-ins -----
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+
+    def __init__(self, pin_id, mode=None, *args, **kwargs):
+        self.id = pin_id
+        self._value = 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+
+class SPI:
+    def __init__(self, spi_id, baudrate=1_000_000, **kwargs):
+        self.baudrate = baudrate
+
+
+class Mem32:
+    """
+    machine.mem32 with a DesignWare I2C slave behind the I2C0/I2C1 blocks (SET/CLR/XOR aliases included):
+    RX FIFO with FIRST_DATA_BYTE, STOP_DET (cleared by reading IC_CLR_STOP_DET), SLV_ACTIVITY and general call
+    ACK, and for reads RD_REQ while the master waits for bytes, a 16-byte TX FIFO, and TX_ABRT when unread bytes
+    were flushed.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.regs = {}
+        self.rx = []  # (IC_DATA_CMD value, t_ms, probe) in arrival order
+        self.rx_max = 0
+        self.stops = []  # times of STOP conditions not yet cleared
+        self.tx = []  # bytes the firmware queued for the master
+        self.rd_need = 0  # bytes the master is waiting for (clock stretched), from rd_t on
+        self.rd_t = 0.0
+        self.tx_abrt = False
+
+    def _split(self, addr):
+        for base in I2C_BASES:
+            if base <= addr < base + 0x4000:
+                return base, (addr - base) & 0x3000, (addr - base) & 0xFFF
+        return None, 0, addr
+
+    def __getitem__(self, addr):
+        base, _, reg = self._split(addr)
+        if base is not None:
+            if reg == IC_STATUS:
+                ready = self.rx and self.rx[0][1] <= self.board.now
+                room = len(self.tx) < IC_TX_FIFO_DEPTH and not self.tx_abrt
+                busy = self.rd_need or (self.rx and self.rx[-1][1] > self.board.now)
+                return ((IC_STATUS_RFNE if ready else 0) | (IC_STATUS_TFNF if room else 0)
+                        | (IC_STATUS_SLV_ACTIVITY if busy else 0))
+            if reg == IC_DATA_CMD:
+                if not self.rx or self.rx[0][1] > self.board.now:
+                    return 0
+                value, _, probe = self.rx.pop(0)
+                if probe is not None and probe.t_rx is None:
+                    probe.t_rx = self.board.now
+                    self.board.pending.append(probe)
+                return value
+            if reg == IC_RAW_INTR_STAT:
+                stop = self.stops and self.stops[0] <= self.board.now
+                rd_req = self.rd_need > len(self.tx) and self.rd_t <= self.board.now
+                return ((IC_RAW_INTR_STOP_DET if stop else 0) | (IC_RAW_INTR_RD_REQ if rd_req else 0)
+                        | (IC_RAW_INTR_TX_ABRT if self.tx_abrt else 0))
+            if reg == IC_CLR_STOP_DET:
+                self.stops = [t for t in self.stops if t > self.board.now]
+                return 0
+            if reg == IC_CLR_TX_ABRT:
+                self.tx_abrt = False
+                return 0
+            return self.regs.get((base, reg), 1 if reg == IC_ACK_GENERAL_CALL else 0)  # ACK_GEN_CALL resets to 1
+        return self.regs.get(addr, 0)
+
+    def __setitem__(self, addr, value):
+        base, alias, reg = self._split(addr)
+        if base is not None and alias == 0 and reg == IC_DATA_CMD:
+            if len(self.tx) < IC_TX_FIFO_DEPTH and not self.tx_abrt:
+                self.tx.append(value & 0xFF)
+            return
+        key = (base, reg) if base is not None else addr
+        old = self.regs.get(key, 0)
+        if alias == 0x1000:
+            value ^= old
+        elif alias == 0x2000:
+            value |= old
+        elif alias == 0x3000:
+            value = old & ~value
+        self.regs[key] = value & 0xFFFFFFFF
+
+    def receive(self, data, t, probe, stop=True):
+        """One write transaction from the master, complete at t (followed by STOP, or by a repeated start)."""
+        for i, b in enumerate(data):
+            self.rx.append((b | (IC_DATA_CMD_FIRST_DATA_BYTE if i == 0 else 0), t, probe))
+        self.rx_max = max(self.rx_max, len(self.rx))
+        if stop:
+            self.stops.append(t)
+
+    def request_read(self, n, t):
+        """The master starts reading n bytes at t and stretches the clock until the TX FIFO has them."""
+        self.rd_need = n
+        self.rd_t = t
+
+    def finish_read(self, t):
+        """The master NACKs the last byte and sends STOP: hand over the bytes it read; leftovers are flushed."""
+        data, self.tx = self.tx[:self.rd_need], self.tx[self.rd_need:]
+        self.rd_need = 0
+        if self.tx:
+            self.tx = []
+            self.tx_abrt = True
+        self.stops.append(t)
+        return bytes(data)
+
+    def general_call(self):
+        """Whether an enabled slave ACKs the general call address."""
+        for base in I2C_BASES:
+            if self.regs.get((base, IC_ENABLE), 0) & 1:
+                return self.regs.get((base, IC_ACK_GENERAL_CALL), 1) & 1
+        return False
+
+    def slave_address(self):
+        """7-bit address the firmware enabled a slave at, or None."""
+        for base in I2C_BASES:
+            if self.regs.get((base, IC_ENABLE), 0) & 1:
+                return self.regs.get((base, IC_SAR), 0) & 0x7F
+        return None
+
+
+def _writes_scene(frame):
+    """Whether a write transaction sets the scene or staged scene register (see registers.apply_frame)."""
+    if len(frame) < 2:
+        return False
+    if frame[0] == CMD_BROADCAST_EACH:
+        regs = (frame[1],)
+    elif frame[0] == CMD_BROADCAST:
+        regs = range(frame[1], frame[1] + len(frame) - 2)
+    else:
+        regs = range(frame[0], frame[0] + len(frame) - 1)
+    return 0 in regs or 2 in regs
+
+
+class I2C:
+    """machine.I2C master: writeto() charges bus time and delivers into the addressed LCD board's RX FIFO."""
+
+    def __init__(self, bus_id, sda=None, scl=None, freq=400_000, timeout=50_000, board=None):
+        self.freq = freq
+        self.timeout_ms = timeout / 1000
+        self.board = board
+
+    def writeto(self, addr, buf, stop=True):
+        board = self.board
+        sim = board.sim
+        board.spend((len(buf) + 1) * 9 * 1000 / self.freq)  # address + data bytes, 9 clocks each
+        targets = sim.i2c_targets(addr)
+        if not targets:
+            sim.i2c_errors += 1
+            raise OSError(errno.ENODEV)
+        for target in targets:
+            probe = sim.probe_for_lcd(target.board.index) if _writes_scene(buf) else None
+            if probe is not None and probe.t_i2c is None:
+                probe.t_i2c = board.now
+            target.receive(buf, board.now, probe)
+        sim.i2c_writes += 1
+        sim.i2c_bytes += len(buf)
+        return len(buf)
+
+    def readfrom(self, addr, n, stop=True):
+        raise OSError(errno.EIO)
+
+    def readfrom_mem(self, addr, memaddr, n):
+        """Write memaddr, repeated start, read n bytes: waits (clock stretching) until the slave queues them."""
+        board = self.board
+        sim = board.sim
+        targets = sim.i2c_targets(addr) if addr != GENERAL_CALL else []
+        if not targets:
+            sim.i2c_errors += 1
+            raise OSError(errno.ENODEV)
+        target = targets[0]
+        board.spend(3 * 9 * 1000 / self.freq)  # address + register, address again after the repeated start
+        target.receive(bytes([memaddr]), board.now, None, stop=False)
+        target.request_read(n, board.now)
+        start = board.now
+        while len(target.tx) < n:
+            if board.now - start >= self.timeout_ms:
+                target.finish_read(board.now)
+                sim.i2c_errors += 1
+                raise OSError(errno.ETIMEDOUT)
+            board.sleep_ms(0.5)
+        board.spend(n * 9 * 1000 / self.freq)
+        sim.i2c_reads += 1
+        sim.i2c_read_wait_ms.append(board.now - start)
+        return target.finish_read(board.now)
+
+    def scan(self):
+        return [lcd.mem32.slave_address() for lcd in self.board.sim.lcds]
+
+
+class FallbackST7789:
+    """st7789py.ST7789 stand-in without blit_buffer (animations falls back to _blit_spans). Counts calls and
+    pixel bytes and charges SPI time; no pixels are kept."""
+
+    def __init__(self, spi, width, height, board=None, **kwargs):
+        self.width = width
+        self.height = height
+        self.board = board
+        self._ms_per_byte = 8 * 1000 / spi.baudrate
+        self.calls = 0
+        self.bytes = 0
+
+    def init(self):
+        pass
+
+    def _send(self, n):
+        self.calls += 1
+        n += SPI_CMD_BYTES
+        self.bytes += n
+        self.board.spend(n * self._ms_per_byte)
+        self.board.drew()
+
+    def fill(self, color):
+        self._send(self.width * self.height * 2)
+
+    def fill_rect(self, x, y, w, h, color):
+        self._send(w * h * 2)
+
+    def pixel(self, x, y, color):
+        self._send(2)
+
+
+class RecordingST7789(FallbackST7789):
+    """Recording st7789py.ST7789 with blit_buffer."""
+
+    def blit_buffer(self, buffer, x, y, width, height):
+        self._send(width * height * 2)
+
+
+class FlashFile:
+    """Binary file whose reads charge flash time on the LCD board's clock."""
+
+    def __init__(self, path, board):
+        self._f = open(path, "rb")
+        self.board = board
+
+    def _charge(self, n):
+        self.board.flash_bytes += n
+        self.board.flash_reads += 1
+        if self.board.sim.flash_ms_per_byte:
+            self.board.spend(n * self.board.sim.flash_ms_per_byte)
+
+    def read(self, n=-1):
+        data = self._f.read(n)
+        self._charge(len(data))
+        return data
+
+    def readinto(self, buf):
+        n = self._f.readinto(buf)
+        self._charge(n)
+        return n
+
+    def seek(self, pos, whence=0):
+        return self._f.seek(pos, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+
+class Neopixel:
+    def __init__(self, num_leds, state_machine, pin, mode="RGB", board=None):
+        self.num_leds = num_leds
+        self.bits = 8 * len(mode)
+        self.board = board
+        self.shows = 0
+
+    def fill(self, rgbw, how_bright=None):
+        pass
+
+    def set_pixel(self, pixel_num, rgbw, how_bright=None):
+        pass
+
+    def brightness(self, value=None):
+        pass
+
+    def show(self):
+        board = self.board
+        board.led_frame()
+        self.shows += 1
+        board.spend(self.num_leds * self.bits * 1.25 / 1000)  # 800 kHz WS281x/SK6812 bit time
+
+
+class MQTTClient:
+    """umqtt.simple.MQTTClient backed by the simulator's scripted publications."""
+
+    def __init__(self, client_id, server, port=0, user=None, password=None, board=None, **kwargs):
+        self.board = board
+        self.cb = None
+        self.topics = set()
+
+    def set_callback(self, f):
+        self.cb = f
+
+    def connect(self, clean_session=True, timeout=None):
+        sim = self.board.sim
+        if sim.broker_down(self.board.now):
+            self.board.block((timeout or 30) * 1000)  # TCP connect to a dead broker runs into its timeout
+            sim.mqtt_connect_failures += 1
+            raise OSError(errno.ETIMEDOUT)
+        sim.mqtt_connects += 1
+        return False
+
+    def subscribe(self, topic, qos=0):
+        self.topics.add(topic.decode() if isinstance(topic, bytes) else topic)
+
+    def publish(self, topic, msg, retain=False, qos=0):
+        self.board.sim.published.append((self.board.now, topic, msg))
+
+    def check_msg(self):
+        sim = self.board.sim
+        if sim.broker_down(self.board.now):
+            raise OSError(errno.ECONNRESET)
+        while sim.script and sim.script[0][0] <= self.board.now:
+            t_pub, topic, payload = sim.script.pop(0)
+            if topic not in self.topics:
+                continue
+            sim.unsent += sim.probes_for(t_pub, topic, payload)
+            self.cb(topic.encode(), payload.encode())
+
+    def wait_msg(self):
+        self.check_msg()
+
+    def disconnect(self):
+        pass
+
+
+class Timer:
+    """machine.Timer (periodic): soft callbacks only run while the board is blocked in Board.block(), like
+    MicroPython's scheduled callbacks during a blocking socket call; the event loop itself is modelled by AsyncLoop.
+    Hard callbacks (hard=True) are interrupts: they also run while the board is busy in Board.spend()."""
+
+    PERIODIC = 1
+    ONE_SHOT = 0
+    board = None  # set by each board's subclass
+
+    def __init__(self, id=-1, mode=PERIODIC, period=1000, callback=None, hard=False):
+        board = self.board
+        self.period = period
+        self.callback = callback
+        self.hard = hard
+        self.due = board.now + period
+        board.timers.append(self)
+
+    def deinit(self):
+        if self in self.board.timers:
+            self.board.timers.remove(self)
+
+
+class _Wait:
+    def __init__(self, request):
+        self.request = request
+
+    def __await__(self):
+        yield self.request
+
+
+class AsyncLoop:
+    """The MicroPython asyncio subset the gateway uses (run, create_task, sleep_ms, sleep, Event) on a board's
+    virtual clock. Tasks run one at a time in wake-up order; when none is due the board sleeps until one is."""
+
+    def __init__(self, board):
+        self.board = board
+        self.tasks = []  # [wake_ms or None while waiting for an Event, order, coroutine]
+        self.order = 0
+
+    def module(self):
+        loop = self
+
+        class Event:
+            def __init__(self):
+                self.state = False
+                self.waiting = []
+
+            def is_set(self):
+                return self.state
+
+            def set(self):
+                self.state = True
+                for task in self.waiting:
+                    loop._wake(task, loop.board.now)
+                self.waiting = []
+
+            def clear(self):
+                self.state = False
+
+            async def wait(self):
+                if not self.state:
+                    await _Wait(self)
+
+        return _module(
+            "asyncio",
+            run=self.run,
+            create_task=self.create_task,
+            sleep_ms=lambda ms: _Wait(max(0, ms)),
+            sleep=lambda s: _Wait(max(0, s * 1000)),
+            Event=Event,
+        )
+
+    def _wake(self, task, t):
+        task[0] = t
+        task[1] = self.order  # round robin among tasks due at the same time
+        self.order += 1
+
+    def create_task(self, coro):
+        task = [None, 0, coro]
+        self._wake(task, self.board.now)
+        self.tasks.append(task)
+        return task
+
+    def run(self, coro):
+        main = self.create_task(coro)
+        board = self.board
+        while main in self.tasks:
+            due = [t for t in self.tasks if t[0] is not None]
+            if not due:
+                raise RuntimeError("asyncio: every task waits for an Event")
+            task = min(due, key=lambda t: (t[0], t[1]))
+            if task[0] > board.now:
+                board.sleep_ms(task[0] - board.now)
+                continue
+            try:
+                request = task[2].send(None)
+            except StopIteration:
+                self.tasks.remove(task)
+                continue
+            if isinstance(request, (int, float)):
+                self._wake(task, board.now + request)
+            else:
+                task[0] = None
+                request.waiting.append(task)
+
+
+def _module(name, **attrs):
+    m = types.ModuleType(name)
+    m.__dict__.update(attrs)
+    return m
+
+
+# ----- Boards and the scheduler -----
+
+
+class Board:
+    """One microcontroller: its own firmware module set, fakes and virtual clock, run on its own thread."""
+
+    def __init__(self, sim, name, folder, overrides):
+        self.sim = sim
+        self.name = name
+        self.now = 0.0
+        self.done = False
+        self.error = None
+        self.atomic = False
+        self.pending = []  # probes received over I2C, waiting for the first draw of their scene
+        self.mem32 = Mem32(self)
+        self.flash_bytes = 0
+        self.flash_reads = 0
+        self.heap = []
+        self.timers = []
+        self.heap_frame = None  # [base, peak] while a frame's heap use is measured across board switches
+        self._heap = [0, 0]
+        self.led_shows = 0
+        self.led_last_show = None  # while an LED effect animates
+        self.led_gap_max = 0.0
+        self._cpu_mark = 0.0
+        self.fakes = self._fakes()
+        self.modules = self._load(folder, overrides)
+        self.main = self.modules["main"]
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _fakes(self):
+        board = self
+        rng = random.Random(self.name)
+        clock = _module(
+            "time",
+            ticks_ms=self.ticks_ms,
+            ticks_us=lambda: int(self.ticks_ms() * 1000),
+            ticks_diff=lambda a, b: a - b,
+            ticks_add=lambda a, b: a + b,
+            sleep_ms=self.sleep_ms,
+            sleep_us=lambda us: self.sleep_ms(us / 1000),
+            sleep=lambda s: self.sleep_ms(s * 1000),
+            time=lambda: self.now / 1000,
+        )
+        machine = _module(
+            "machine",
+            Pin=Pin,
+            SPI=SPI,
+            I2C=lambda *a, **k: I2C(*a, board=board, **k),
+            Timer=type("Timer", (Timer,), {"board": board}),
+            mem32=self.mem32,
+        )
+        driver = RecordingST7789 if self.sim.blit else FallbackST7789
+        umqtt = _module("umqtt")
+        umqtt.simple = _module("umqtt.simple", MQTTClient=lambda *a, **k: MQTTClient(*a, board=board, **k))
+        wlan = _module("WLAN", active=lambda *a: True, isconnected=lambda: True, connect=lambda *a: None)
+        return {
+            "time": clock,
+            "machine": machine,
+            "st7789py": _module("st7789py", ST7789=lambda *a, **k: driver(*a, board=board, **k)),
+            "neopixel": _module("neopixel", Neopixel=lambda *a, **k: Neopixel(*a, board=board, **k)),
+            "urandom": _module("urandom", getrandbits=rng.getrandbits),
+            "asyncio": AsyncLoop(self).module(),
+            "network": _module("network", STA_IF=0, WLAN=lambda *a: wlan),
+            "umqtt": umqtt,
+            "umqtt.simple": umqtt.simple,
+        }
+
+    def _load(self, folder, overrides):
+        """Import every module of a firmware folder against this board's fakes, config first (with overrides)."""
+        folder = os.path.abspath(folder)
+        names = sorted(f[:-3] for f in os.listdir(folder) if f.endswith(".py"))
+        names.sort(key=lambda n: (n != "config", n == "main"))
+        saved = {n: sys.modules.pop(n) for n in names + list(self.fakes) if n in sys.modules}
+        sys.modules.update(self.fakes)
+        sys.path.insert(0, folder)
+        modules = dict(self.fakes)
+        try:
+            for n in names:
+                modules[n] = __import__(n)
+                if n == "config":
+                    modules[n].__dict__.update(overrides)
+        finally:
+            sys.path.remove(folder)
+            for n in modules:
+                sys.modules.pop(n, None)
+            sys.modules.update(saved)
+        del modules["time"]  # bound at import; keep the host's time module for everything else
+        return modules
+
+    # time module
+
+    def _charge_cpu(self):
+        if self.sim.cpu_scale:
+            t = time.perf_counter()
+            self.now += (t - self._cpu_mark) * self.sim.cpu_scale * 1000
+            self._cpu_mark = t
+
+    def ticks_ms(self):
+        self._charge_cpu()
+        if self.now >= self.sim.end_ms + 1000:
+            raise SimDone  # a loop that never sleeps
+        if not self.atomic and self.sim.behind(self) > 1:
+            self._yield()
+        return int(self.now)
+
+    def sleep_ms(self, ms):
+        self._charge_cpu()
+        self._interrupts(self.now + max(ms, 0))
+        if self.now >= self.sim.end_ms:
+            raise SimDone
+        self._yield()
+
+    def spend(self, ms):
+        """Charge modelled hardware time (SPI, flash, I2C, LEDs) to this board's clock."""
+        self._interrupts(self.now + ms)
+
+    def _interrupts(self, end):
+        """
+        Advance the clock to end, running hard timer IRQs due meanwhile at their time, after the other boards have
+        caught up to it (so the IRQ sees e.g. a read the master has started).
+        """
+        while self.timers:
+            timer = None
+            for t in self.timers:  # no allocation here: this runs inside frames whose heap use is measured
+                if t.hard and t.due <= end and (timer is None or t.due < timer.due):
+                    timer = t
+            if timer is None:
+                break
+            self.now = max(self.now, timer.due)
+            timer.due += timer.period
+            if self.sim.behind(self) > 0:
+                self._yield()
+            timer.callback(timer)
+        self.now = end
+
+    def led_frame(self):
+        """Track the longest gap between LED strip updates while an effect (lamp, fireplace) is animating."""
+        self.led_shows += 1
+        if self.led_last_show is not None:
+            self.led_gap_max = max(self.led_gap_max, self.now - self.led_last_show)
+        leds = self.modules.get("leds") if hasattr(self, "modules") else None
+        animating = leds is not None and leds._mode != "off"
+        self.led_last_show = self.now if animating else None
+
+    def block(self, ms):
+        """A blocking call that lasts ms: only machine.Timer callbacks run meanwhile."""
+        end = self.now + ms
+        while True:
+            due = [t for t in self.timers if t.due <= end]
+            if not due:
+                break
+            timer = min(due, key=lambda t: t.due)
+            self.now = max(self.now, timer.due)
+            timer.due += timer.period
+            timer.callback(timer)
+        self.now = end
+
+    def drew(self):
+        if self.pending:
+            scene = self.main._last_scene
+            for probe in [p for p in self.pending if p.scene == scene]:
+                probe.t_shown = self.now
+                probe.t_start = self.main._scene_start_ticks
+                self.pending.remove(probe)
+
+    # scheduling
+
+    def _resume(self):
+        sys.modules.update(self.modules)  # firmware imports inside functions find this board's modules
+        self._cpu_mark = time.perf_counter()
+
+    def _yield(self):
+        sim = self.sim
+        heap = self.heap_frame
+        if heap is not None:
+            # Keep other boards' allocations out of this frame's figure: close the measurement here and resume
+            # it from the same level once this board runs again
+            current, peak = tracemalloc.get_traced_memory()
+            heap[1] = max(heap[1], peak - heap[0])
+            held = current - heap[0]
+        with sim.cond:
+            sim.turn = None
+            sim.cond.notify_all()
+            while sim.turn is not self:
+                sim.cond.wait()
+        if sim.aborted:
+            raise SimDone
+        self._resume()
+        if heap is not None:
+            tracemalloc.reset_peak()
+            heap[0] = tracemalloc.get_traced_memory()[0] - held
+
+    def _run(self):
+        sim = self.sim
+        with sim.cond:
+            while sim.turn is not self:
+                sim.cond.wait()
+        try:
+            if not sim.aborted:
+                self._resume()
+                self.main.main()
+        except SimDone:
+            pass
+        except BaseException as e:  # report firmware crashes with the board name
+            self.error = f"{type(e).__name__}: {e}"
+            sim.aborted = True
+        with sim.cond:
+            self.done = True
+            sim.turn = None
+            sim.cond.notify_all()
+
+
+class LcdBoard(Board):
+    def __init__(self, sim, index, address, asset, overrides):
+        super().__init__(sim, f"lcd{index}", os.path.join(FIRMWARE_DIR, "rp2350_lcd"), overrides)
+        self.index = index
+        self.address = address
+        # Boards power up at slightly different times, so their loops are out of phase like real ones
+        self.now = random.Random(index).uniform(0, BOOT_SPREAD_MS)
+        anim = self.modules["animations"]
+        anim.BITMAP_FILENAME = asset
+        anim.open = lambda path, mode="rb": FlashFile(path, self)
+        run_frame = anim.run_frame
+
+        def measured_run_frame(*args):
+            # One frame's transient heap use. Board switches only happen for hard timer IRQs (Board.spend), and
+            # _yield leaves other boards' allocations out of the figure
+            drawn = anim.frames_drawn
+            self.atomic = True
+            if tracemalloc.is_tracing():
+                self.heap_frame = heap = self._heap
+                heap[1] = 0
+                tracemalloc.reset_peak()
+                heap[0] = tracemalloc.get_traced_memory()[0]
+            try:
+                return run_frame(*args)
+            finally:
+                self.atomic = False
+                heap = self.heap_frame
+                self.heap_frame = None
+                if heap is not None and anim.frames_drawn != drawn:
+                    self.heap.append(max(heap[1], tracemalloc.get_traced_memory()[1] - heap[0]))
+
+        anim.run_frame = measured_run_frame
+
+    def report(self, seconds):
+        anim = self.modules["animations"]
+        sched = self.main.scheduler
+        display = self.modules["display_driver"].display
+        frames = anim.frames_drawn
+        per = frames or 1
+        heap = sorted(self.heap)
+        asset = anim._asset
+        cache = asset.cache if asset is not None else None
+        return {
+            "lcd": self.index,
+            "address": self.address,
+            "scene": self.modules["registers"].current_scene,
+            "brightness": self.modules["registers"].current_brightness,
+            "frames": frames,
+            "fps": round(frames / seconds, 2),
+            "dropped": anim.frames_dropped,
+            "draw_ms_avg": sched.draw_ms_avg,
+            "draw_ms_max": sched.draw_ms_max,
+            "late_ms_max": sched.late_ms_max,
+            "spi_bytes_per_frame": round(display.bytes / per),
+            "display_calls_per_frame": round(display.calls / per, 1),
+            "flash_bytes_per_frame": round(self.flash_bytes / per),
+            "flash_reads_per_frame": round(self.flash_reads / per, 1),
+            "heap_peak_bytes_per_frame_median": heap[len(heap) // 2] if heap else None,
+            "heap_peak_bytes_per_frame_max": heap[-1] if heap else None,
+            "cache_hits": cache.hits if cache else None,
+            "cache_misses": cache.misses if cache else None,
+            "i2c_rx_fifo_max": self.mem32.rx_max,
+            "i2c_rx_frames": self.modules["i2c_slave_hw"].rx_frames,
+            "i2c_rx_overruns": self.modules["i2c_slave_hw"].rx_overruns,
+            "i2c_rx_malformed": self.modules["i2c_slave_hw"].rx_malformed,
+        }
+
+
+class Simulator:
+    def __init__(self, seconds, cpu_scale=0.0, flash_mbps=4.0, blit=True):
+        self.end_ms = seconds * 1000
+        self.cpu_scale = cpu_scale
+        self.flash_ms_per_byte = 1000 / (flash_mbps * 1_000_000) if flash_mbps else 0
+        self.blit = blit
+        self.cond = threading.Condition()
+        self.turn = None
+        self.aborted = False
+        self.boards = []
+        self.lcds = []
+        self.script = []
+        self.published = []
+        self.probes = []
+        self.unsent = []  # probes of handled MQTT messages whose I2C write has not happened yet
+        self.outages = []  # (start_ms, end_ms) while the MQTT broker does not answer
+        self.mqtt_connects = 0
+        self.mqtt_connect_failures = 0
+        self.i2c_writes = 0
+        self.i2c_bytes = 0
+        self.i2c_errors = 0
+        self.i2c_reads = 0
+        self.i2c_read_wait_ms = []  # per read: time from the request to the last byte (clock stretching included)
+
+    def add(self, board):
+        self.boards.append(board)
+        if isinstance(board, LcdBoard):
+            self.lcds.append(board)
+        return board
+
+    def i2c_targets(self, addr):
+        """RX FIFOs that ACK addr: the LCD with that slave address, or every LCD for the general call."""
+        if addr == GENERAL_CALL:
+            return [lcd.mem32 for lcd in self.lcds if lcd.mem32.general_call()]
+        return [lcd.mem32 for lcd in self.lcds if lcd.mem32.slave_address() == addr]
+
+    def probe_for_lcd(self, index):
+        """Newest unsent probe for the LCD; older ones were superseded in the gateway's queue and are dropped."""
+        mine = [p for p in self.unsent if p.lcd == index]
+        for probe in mine:
+            self.unsent.remove(probe)
+        return mine[-1] if mine else None
+
+    def broker_down(self, t):
+        return any(start <= t < end for start, end in self.outages)
+
+    def behind(self, board):
+        """How far (ms) the slowest other live board's clock is behind this one."""
+        others = [b.now for b in self.boards if b is not board and not b.done]
+        return board.now - min(others) if others else 0
+
+    def probes_for(self, t_pub, topic, payload):
+        """Probes for the scene changes in one MQTT message: lcd/<index>/scene, lcd/all/scene or lcd/scenes."""
+        parts = topic.split("/")
+        try:
+            if parts[-2:] == ["all", "scene"]:
+                scenes = {lcd.index: int(payload) for lcd in self.lcds}
+            elif parts[-2:] == ["lcd", "scenes"]:
+                scenes = {i: int(v) for i, v in enumerate(payload.split(",")) if v.strip()}
+            elif len(parts) >= 3 and parts[-1] == "scene" and parts[-3] == "lcd":
+                scenes = {int(parts[-2]): int(payload)}
+            else:
+                return []
+        except ValueError:
+            return []
+        probes = [Probe(t_pub, i, max(0, min(254, s))) for i, s in scenes.items()]
+        self.probes += probes
+        return probes
+
+    def run(self):
+        for b in self.boards:
+            b.thread.start()
+        with self.cond:
+            while True:
+                live = [b for b in self.boards if not b.done]
+                if not live:
+                    break
+                board = min(live, key=lambda b: b.now)
+                self.turn = board
+                self.cond.notify_all()
+                while self.turn is board:
+                    self.cond.wait()
+        errors = [f"{b.name}: {b.error}" for b in self.boards if b.error]
+        if errors:
+            sys.exit("firmware crashed:\n  " + "\n  ".join(errors))
+
+
+# ----- Scenario -----
+
+
+def build_synthetic_asset(out_dir, width, height):
+    counts = [0] * tool.NUM_SCENES
+    for scene, _, n in SYNTHETIC_SCENES:
+        counts[scene] = n
+    sink = tool.BinSink("bitmap_anim", out_dir, width, height, counts)
+    try:
+        for _, kind, n in SYNTHETIC_SCENES:
+            for frame in synthetic_frames(kind, n, width, height):
+                sink.write_frame(frame)
+    finally:
+        sink.close()
+    return sink.path
+
+
+def scenes_in(asset):
+    with open(asset, "rb") as f:
+        f.seek(12 if f.read(4) == tool.BANM_V2_MAGIC else 8)
+        counts = f.read(tool.NUM_SCENES * 2)
+    return [s for s in range(tool.NUM_SCENES) if counts[2 * s] | counts[2 * s + 1]]
+
+
+def default_script(prefix, lcds, scenes, seconds, every_ms):
+    """
+    Cycle every LCD through the asset's scenes (then scene 0, black), starting 200 ms in, staggered per LCD.
+    The last second sets LCD 0 to a scene, stages another on it and sets the first again before the commit
+    (LCD_SYNC_LEAD_MS later): the LCD must end on the scene set last, which the report checks against the
+    gateway's lcd_scenes.
+    """
+    order = scenes + [0]
+    end = seconds * 1000 - 1000 if seconds >= 2 else seconds * 1000
+    script = []
+    t = 200
+    step = 0
+    while t < end:
+        for i in range(lcds):
+            scene = order[(step + i) % len(order)]
+            script.append((t + 10 * i, f"{prefix}/lcd/{i}/scene", str(scene)))
+        step += 1
+        t += every_ms
+    if end < seconds * 1000:
+        first, staged = order[0], order[1 % len(order)]
+        script.append((end, f"{prefix}/lcd/0/scene", str(first)))
+        script.append((end + 200, f"{prefix}/lcd/scenes", str(staged)))
+        script.append((end + 250, f"{prefix}/lcd/0/scene", str(first)))
+    return script
+
+
+def parse_publish(spec):
+    when, _, rest = spec.partition(":")
+    topic, _, payload = rest.partition("=")
+    if not topic:
+        raise argparse.ArgumentTypeError(f"expected MS:TOPIC=PAYLOAD, got {spec!r}")
+    return (float(when), topic, payload)
+
+
+def parse_outage(spec):
+    start, _, end = spec.partition(":")
+    try:
+        return (float(start), float(end))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START_MS:END_MS, got {spec!r}") from None
+
+
+def _stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"avg": round(sum(values) / len(values), 2), "max": round(max(values), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Village firmware on the host with a virtual clock.")
+    parser.add_argument("--asset", default=None, help="bitmap_anim.bin to play (default: build a synthetic one)")
+    parser.add_argument("--width", "-W", type=int, default=240, help="Synthetic asset width (default: 240)")
+    parser.add_argument("--height", "-H", type=int, default=320, help="Synthetic asset height (default: 320)")
+    parser.add_argument("--seconds", type=float, default=10, help="Simulated seconds (default: 10)")
+    parser.add_argument("--lcds", type=int, default=1, help="LCD boards, at the first LCD_I2C_ADDRESSES (default: 1)")
+    parser.add_argument("--band-rows", type=int, default=None, help="Override config.BITMAP_BAND_ROWS")
+    parser.add_argument("--cache-kb", type=int, default=None, help="Override config.BITMAP_CACHE_BYTES (KB)")
+    parser.add_argument("--no-blit", action="store_true", help="Display driver without blit_buffer (fallback path)")
+    parser.add_argument("--flash-mbps", type=float, default=4.0, help="Flash read rate in MB/s, 0 = free (default: 4)")
+    parser.add_argument("--cpu-scale", type=float, default=0.0,
+                        help="Charge host CPU time x this factor to the board clocks (default: 0, deterministic)")
+    parser.add_argument("--switch-ms", type=int, default=2000, help="Default script: ms between scene changes")
+    parser.add_argument("--publish", type=parse_publish, action="append", default=[],
+                        help="Scripted MQTT publication MS:TOPIC=PAYLOAD (repeatable; replaces the default script)")
+    parser.add_argument("--broker-outage", type=parse_outage, action="append", default=[],
+                        help="START_MS:END_MS while the MQTT broker does not answer (repeatable)")
+    parser.add_argument("--stats-ms", type=int, default=None,
+                        help="Override the Pico W's LCD_STATS_INTERVAL_MS (status read-back period, 0 = off)")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip tracemalloc (faster, no peak heap figures)")
+    parser.add_argument("--json", default=None, help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    tmp = None
+    asset = args.asset
+    if asset is None:
+        tmp = tempfile.mkdtemp(prefix="village_sim_")
+        asset = build_synthetic_asset(tmp, args.width, args.height)
+    asset = os.path.abspath(asset)
+
+    try:
+        sim = Simulator(args.seconds, args.cpu_scale, args.flash_mbps, not args.no_blit)
+        sim.outages = args.broker_outage
+        pico_overrides = {} if args.stats_ms is None else {"LCD_STATS_INTERVAL_MS": args.stats_ms}
+        pico = sim.add(Board(sim, "pico_w", os.path.join(FIRMWARE_DIR, "pico_w"), pico_overrides))
+        cfg = pico.modules["config"]
+        addresses = cfg.LCD_I2C_ADDRESSES
+        if not 1 <= args.lcds <= len(addresses):
+            sys.exit(f"--lcds must be 1..{len(addresses)} (LCD_I2C_ADDRESSES in pico_w/config.py)")
+        cfg.LCD_I2C_ADDRESSES = addresses[:args.lcds]  # the Pico W only talks to the simulated LCDs
+        overrides = {}
+        if args.band_rows is not None:
+            overrides["BITMAP_BAND_ROWS"] = args.band_rows
+        if args.cache_kb is not None:
+            overrides["BITMAP_CACHE_BYTES"] = args.cache_kb * 1024
+        for i in range(args.lcds):
+            sim.add(LcdBoard(sim, i, addresses[i], asset, dict(overrides, I2C_SLAVE_ADDR=addresses[i])))
+        if args.publish:
+            sim.script = sorted(args.publish, key=lambda p: p[0])
+        else:
+            sim.script = default_script(cfg.MQTT_TOPIC_PREFIX, args.lcds, scenes_in(asset), args.seconds, args.switch_ms)
+
+        if not args.no_alloc:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        sim.run()
+        wall = time.perf_counter() - t0
+        tracemalloc.stop()
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    lcds = [lcd.report(args.seconds) for lcd in sim.lcds]
+    for r in lcds:  # last status the Pico W published for this LCD, and the scene the gateway believes it has
+        r["scene_set"] = getattr(pico.main, "lcd_scenes", {}).get(r["lcd"])
+        topic = f"{cfg.MQTT_TOPIC_PREFIX}/lcd/{r['lcd']}/stats"
+        stats = [json.loads(msg) for _, t, msg in sim.published if t == topic]
+        r["stats_published"] = len(stats)
+        r["stats_offline"] = sum(1 for s in stats if not s.get("online"))
+        r["stats_last"] = stats[-1] if stats else None
+    shown = [p for p in sim.probes if p.t_shown is not None]
+    starts = {}
+    for p in shown:
+        starts.setdefault(p.t_pub, []).append(p.t_start)
+    skews = [max(t) - min(t) for t in starts.values() if len(t) > 1]
+    queue = pico.modules.get("lcd_queue")  # gateway command queue (older firmware has none)
+    result = {
+        "asset": args.asset or "synthetic",
+        "seconds": args.seconds,
+        "host_seconds": round(wall, 2),
+        "lcds": lcds,
+        "i2c": {
+            "writes": sim.i2c_writes,
+            "bytes": sim.i2c_bytes,
+            "reads": sim.i2c_reads,
+            "read_wait_ms": _stats(sim.i2c_read_wait_ms),
+            "errors": sim.i2c_errors,
+        },
+        "gateway": {
+            "led_frames": pico.led_shows,
+            "led_gap_ms_max": round(max(pico.led_gap_max, args.seconds * 1000 - (pico.led_last_show or 1e12)), 2),
+            "mqtt_connects": sim.mqtt_connects,
+            "mqtt_connect_failures": sim.mqtt_connect_failures,
+            "lcd_commands": queue.commands if queue else None,
+            "lcd_coalesced": queue.coalesced if queue else None,
+            "lcd_unchanged": queue.unchanged if queue else None,
+            "lcd_transactions": queue.transactions if queue else None,
+            "lcd_writes_saved": queue.writes_saved() if queue else None,
+        },
+        "latency_ms": {
+            "scene_changes": len(sim.probes),
+            "shown": len(shown),
+            "mqtt_to_i2c": _stats(p.t_i2c - p.t_pub for p in sim.probes if p.t_i2c is not None),
+            "mqtt_to_lcd_rx": _stats(p.t_rx - p.t_pub for p in sim.probes if p.t_rx is not None),
+            "mqtt_to_display": _stats(p.t_shown - p.t_pub for p in shown),
+            "start_skew": _stats(skews),  # spread of timeline starts across LCDs changed at the same publish time
+        },
+    }
+
+    print(f"{args.seconds:g} s simulated in {wall:.1f} s host time, asset {result['asset']}:")
+    for r in lcds:
+        heap = "n/a" if r["heap_peak_bytes_per_frame_median"] is None else (
+            f"{r['heap_peak_bytes_per_frame_median']} B median / {r['heap_peak_bytes_per_frame_max']} B max")
+        print(
+            f"  lcd {r['lcd']} (0x{r['address']:02x}): {r['frames']} frames, {r['fps']:.2f} fps, {r['dropped']} dropped,"
+            f" draw {r['draw_ms_avg']} ms avg / {r['draw_ms_max']} ms max"
+        )
+        print(
+            f"    per frame: SPI {r['spi_bytes_per_frame']} B in {r['display_calls_per_frame']} calls,"
+            f" flash {r['flash_bytes_per_frame']} B in {r['flash_reads_per_frame']} reads, peak transient heap {heap}"
+        )
+        print(
+            f"    i2c rx: {r['i2c_rx_frames']} frames, {r['i2c_rx_overruns']} overruns,"
+            f" {r['i2c_rx_malformed']} malformed, FIFO peak {r['i2c_rx_fifo_max']} B"
+        )
+        if r["scene_set"] is not None and r["scene_set"] != r["scene"]:
+            print(f"    MISMATCH: scene {r['scene']} on the LCD, but the gateway set {r['scene_set']}")
+        if r["stats_published"]:
+            print(f"    stats: {r['stats_published']} published ({r['stats_offline']} offline),"
+                  f" last {json.dumps(r['stats_last'])}")
+    i2c = result["i2c"]
+    print(f"  i2c: {i2c['writes']} writes, {i2c['bytes']} bytes, {i2c['reads']} reads, {i2c['errors']} errors")
+    if i2c["read_wait_ms"]:
+        print(f"    read wait        {i2c['read_wait_ms']['avg']:8.2f} ms avg {i2c['read_wait_ms']['max']:8.2f} ms max")
+    gw = result["gateway"]
+    print(
+        f"  gateway: {gw['led_frames']} LED frames, longest gap {gw['led_gap_ms_max']} ms,"
+        f" {gw['mqtt_connects']} MQTT connects, {gw['mqtt_connect_failures']} failed"
+    )
+    if queue:
+        print(
+            f"    LCD commands: {gw['lcd_commands']} queued, {gw['lcd_coalesced']} coalesced,"
+            f" {gw['lcd_unchanged']} unchanged, {gw['lcd_transactions']} I2C transactions"
+            f" ({gw['lcd_writes_saved']} writes saved)"
+        )
+    lat = result["latency_ms"]
+    print(f"  scene changes: {lat['scene_changes']} published, {lat['shown']} shown")
+    for key in ("mqtt_to_i2c", "mqtt_to_lcd_rx", "mqtt_to_display", "start_skew"):
+        s = lat[key]
+        print(f"    {key:<16} " + ("n/a" if s is None else f"{s['avg']:8.2f} ms avg {s['max']:8.2f} ms max"))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,24 @@ Village – Convert numbered folders of images (0–254) to RGB565 bitmap data f
 
 Input: A root folder containing subfolders "0", "1", … "254". Folder N becomes scene N (up to 255 scenes).
        Each subfolder holds numbered images (e.g. 000.png, 001.png); 1–120 frames per scene. Missing folders = 0 frames.
-Output: C header + source and/or binary with multi-scene header. All scenes play at 24 fps on device.
+       An optional timing.txt in a scene folder sets its frame rate or per-frame hold times (see read_scene_timing).
+Output: C header + source and/or binary with multi-scene header. Scenes play at 24 fps (or --fps / timing.txt).
+        The binary is BANM v2 (per-frame row-RLE compression) by default; --format 1 writes the raw v1 layout.
+        --palette 16/256 stores scenes as 4/8-bit indices into a per-scene RGB565 palette (lossy quantization).
+        --scale / --scene-scale store scenes at 1/2 or 1/4 resolution; the device upscales them (nearest neighbour).
 
 Usage:
-  python image_sequence_to_bitmap.py <input_root> [--output-dir DIR] [--width W] [--height H] [--name NAME] [--c-only | --bin-only]
+  python image_sequence_to_bitmap.py <input_root> [--output-dir DIR] [--width W] [--height H] [--name NAME]
+                                     [--jobs N] [--cache-dir DIR [--cache-max-mb MB]] [--format {1,2}] [--no-dedup]
+                                     [--no-dirty-rects] [--palette {16,256} [--palette-scenes LIST]]
+                                     [--scale {1,2,4}] [--scene-scale SCENE=FACTOR,...] [--fps FPS]
+                                     [--c-only | --bin-only]
 
-Requires: Pillow (pip install Pillow)
+Requires: Pillow, NumPy (pip install -r requirements.txt)
 """
 
 import argparse
+import hashlib
 import os
 import re
 import struct
@@ -21,6 +30,27 @@ import sys
 NUM_SCENES = 255  # scenes 0..254
 MIN_FRAMES = 1
 MAX_FRAMES = 120
+RESAMPLE = "LANCZOS"  # PIL.Image.Resampling member used for resizing
+CACHE_VERSION = 1  # bump when the conversion of a given source image changes, to invalidate cached frames
+TMP_SUFFIX = ".tmp"  # sinks write here and replace the real output only when every frame converted
+
+BANM_V1_MAGIC = b"BANM"
+BANM_V2_MAGIC = b"BAN2"
+BANM_V2_SLOT_SIZE = 8  # slot table entry: payload offset (u32) + payload length (u32)
+FLAG_FRAME_INDEX = 0x0001  # frames map to deduplicated storage slots through a (scene, frame) -> slot table
+FLAG_DIRTY_RECTS = 0x0002  # per (scene, frame): bounding box (x, y, w, h) of pixels changed since the previous frame
+FLAG_PALETTES = 0x0004  # per scene: offset (u32) of its RGB565 palette, 0 = scene not palette-indexed
+FLAG_SCALES = 0x0008  # per scene: storage scale (u8) 1, 2 or 4 – frames stored at width/scale x height/scale
+SCALES = (1, 2, 4)
+FLAG_TIMING = 0x0010  # per scene: timeline rate (u16 ticks/s) + offset (u32) of per-frame hold times, 0 = 1 tick each
+DEFAULT_FPS = 24
+TIMING_FILENAME = "timing.txt"
+CODEC_RAW = 0  # payload = width * height RGB565 words (LE)
+CODEC_RLE = 1  # payload = rows of PackBits-style runs over RGB565 words (see rle_encode_frame)
+CODEC_PAL4 = 2  # payload = rows of 4-bit palette indices, high nibble first, each row padded to a whole byte
+CODEC_PAL8 = 3  # payload = rows of 8-bit palette indices
+RLE_MAX_LITERAL = 128  # control 0..127: (control + 1) literal words follow
+RLE_MAX_REPEAT = 129  # control 128..255: next word repeated (control - 126) times, i.e. 2..129
 
 
 def rgb_to_rgb565(r, g, b):
@@ -28,8 +58,20 @@ def rgb_to_rgb565(r, g, b):
     return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
 
 
+def image_to_rgb565(img):
+    """Convert an RGB PIL image to a (height, width) uint16 RGB565 array in one vectorized pass."""
+    try:
+        import numpy as np
+    except ImportError:
+        sys.exit("This script requires NumPy. Install with: pip install numpy")
+
+    rgb = np.asarray(img, dtype=np.uint16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+
+
 def load_and_convert_frame(path, width, height):
-    """Load image, resize to width x height, return list of RGB565 uint16 (row-major)."""
+    """Load image, resize to width x height, return (height, width) uint16 RGB565 array (row-major)."""
     try:
         from PIL import Image
     except ImportError:
@@ -37,9 +79,24 @@ def load_and_convert_frame(path, width, height):
 
     img = Image.open(path)
     img = img.convert("RGB")
-    img = img.resize((width, height), Image.Resampling.LANCZOS)
-    pixels = list(img.getdata())
-    return [rgb_to_rgb565(r, g, b) for r, g, b in pixels]
+    img = img.resize((width, height), getattr(Image.Resampling, RESAMPLE))
+    return image_to_rgb565(img)
+
+
+def frame_to_bytes(frame):
+    """Serialize one RGB565 frame as little-endian words (the on-device layout)."""
+    return frame.astype("<u2", copy=False).tobytes()
+
+
+_C_HEX_WORDS = None
+
+
+def _c_hex_words():
+    """Lookup table of "0xNNNN" literals for every 16-bit value (built once, on first C export)."""
+    global _C_HEX_WORDS
+    if _C_HEX_WORDS is None:
+        _C_HEX_WORDS = [f"0x{v:04X}" for v in range(0x10000)]
+    return _C_HEX_WORDS
 
 
 def discover_frames(folder):
@@ -59,88 +116,611 @@ def discover_frames(folder):
     return [p[1] for p in paths]
 
 
-def load_scenes(root_folder, width, height):
+def discover_scenes(root_folder):
     """
-    Load up to NUM_SCENES scenes from root_folder/0 .. root_folder/254.
+    Find the frame images of scenes 0..254 under root_folder and validate per-scene frame counts.
     Missing or empty folders yield 0 frames (black on device). Present folders must have 1–120 frames.
-    Returns list of NUM_SCENES lists of frames (each list may be empty).
+    Returns list of NUM_SCENES lists of image paths (each list may be empty).
     """
-    scenes_frames = []
+    scenes_paths = []
     for s in range(NUM_SCENES):
         sub = os.path.join(root_folder, str(s))
         paths = discover_frames(sub)
-        if not paths:
-            scenes_frames.append([])
-            continue
-        if len(paths) > MAX_FRAMES:
+        if paths and len(paths) > MAX_FRAMES:
             sys.exit(f"Scene {s}: {len(paths)} frames (max {MAX_FRAMES}).")
-        if len(paths) < MIN_FRAMES:
+        if paths and len(paths) < MIN_FRAMES:
             sys.exit(f"Scene {s}: {len(paths)} frames (min {MIN_FRAMES}).")
-        frames_data = [load_and_convert_frame(p, width, height) for p in paths]
-        scenes_frames.append(frames_data)
-    if sum(len(f) for f in scenes_frames) == 0:
+        scenes_paths.append(paths)
+    if sum(len(p) for p in scenes_paths) == 0:
         sys.exit("No scenes with images found. Add at least one folder 0..254 with 1–120 images.")
-    return scenes_frames
+    return scenes_paths
 
 
-def write_bin_output(scenes_frames, width, height, name, out_dir):
+def read_scene_timing(folder, frame_count, default_fps=DEFAULT_FPS):
     """
-    Binary format: BANM (4) + width (2) + height (2) + frame_count[255] (510) = 518 bytes,
-    then for each scene 0..254: frame_count[s] frames of RGB565 (LE).
+    Return (rate, holds) for a scene: its timeline runs at `rate` ticks per second and frame i is shown
+    for holds[i] ticks (holds is None when every frame lasts one tick, i.e. plain fps playback).
+    Read from timing.txt in the scene folder when present ('#' starts a comment):
+        fps 8                  every frame for 1/8 s
+        fps 12 / hold 1 1 4 1  per-frame hold in ticks at that fps (one value per frame)
+        ms 80 80 400 120       per-frame hold in milliseconds (one value per frame)
+    Hold and ms lists may continue on the following lines.
+    """
+    path = os.path.join(folder, TIMING_FILENAME)
+    if not os.path.isfile(path):
+        return default_fps, None
+    rate, holds = default_fps, None
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            words = line.split("#", 1)[0].replace(",", " ").split()
+            if not words:
+                continue
+            key, values = words[0].lower(), words[1:]
+            if key.isdigit() and holds is not None:
+                key, values = "", words  # hold/ms list continued on the next line
+            try:
+                values = [int(v) for v in values]
+            except ValueError:
+                sys.exit(f"{path}:{n}: expected whole numbers after {key!r}.")
+            if not key:
+                holds += values
+            elif key == "fps" and len(values) == 1:
+                rate = values[0]
+            elif key in ("hold", "ms"):
+                holds = values
+                if key == "ms":
+                    rate = 1000
+            else:
+                sys.exit(f"{path}:{n}: expected 'fps N', 'hold T…' or 'ms T…'.")
+    if not 1 <= rate <= 1000:
+        sys.exit(f"{path}: fps must be 1–1000 (got {rate}).")
+    if holds is not None:
+        if len(holds) != frame_count:
+            sys.exit(f"{path}: {len(holds)} hold times for {frame_count} frames.")
+        if any(not 1 <= h <= 0xFFFF for h in holds):
+            sys.exit(f"{path}: hold times must be 1–65535.")
+        if all(h == 1 for h in holds):
+            holds = None
+    return rate, holds
+
+
+class FrameCache:
+    """
+    On-disk cache of converted frames, stored as ready RGB565 (LE) blobs.
+    Key = SHA-256 of the source file bytes + target width/height + resample filter + CACHE_VERSION, so an
+    edited image, a new size or a different filter is a miss. Hits refresh the blob's mtime; evict() then
+    removes least recently used blobs until the cache fits in max_bytes.
     """
-    magic = b"BANM"
-    frame_counts = [len(frames) for frames in scenes_frames]
-    header = struct.pack("<4sHH", magic, width, height)
-    header += struct.pack("<" + "H" * NUM_SCENES, *frame_counts)
-    bin_path = os.path.join(out_dir, f"{name}.bin")
-
-    with open(bin_path, "wb") as f:
-        f.write(header)
-        for frames in scenes_frames:
-            for frame in frames:
-                for word in frame:
-                    f.write(struct.pack("<H", word))
-
-    return bin_path
-
-
-def write_c_output(scenes_frames, width, height, name, out_dir):
-    """One .h and .c: frame_count[8], total words, and one big const array (scene 0, then 1, … 7)."""
-    guard = f"BOOKNOOK_VILLAGE_{name.upper()}_H"
-    h_path = os.path.join(out_dir, f"{name}.h")
-    c_path = os.path.join(out_dir, f"{name}.c")
-
-    frame_counts = [len(frames) for frames in scenes_frames]
-    total_words = sum(fc * width * height for fc in frame_counts)
-
-    with open(h_path, "w") as f:
-        f.write(f"#ifndef {guard}\n#define {guard}\n\n")
-        f.write(f"#define {name.upper()}_WIDTH   {width}\n")
-        f.write(f"#define {name.upper()}_HEIGHT  {height}\n")
-        f.write(f"#define {name.upper()}_SCENES  {NUM_SCENES}\n\n")
-        f.write(f"extern const unsigned short {name}_frame_count[{NUM_SCENES}];\n")
-        f.write(f"extern const unsigned short {name}_data[{total_words}];\n\n")
-        f.write("#endif\n")
 
-    with open(c_path, "w") as f:
-        f.write(f'#include "{name}.h"\n\n')
-        f.write(f"const unsigned short {name}_frame_count[{NUM_SCENES}] = {{\n")
-        f.write("  " + ", ".join(str(c) for c in frame_counts) + "\n};\n\n")
-        f.write(f"const unsigned short {name}_data[{total_words}] = {{\n")
-        for scene_frames in scenes_frames:
-            for frame in scene_frames:
-                for j in range(0, len(frame), 12):
-                    chunk = frame[j : j + 12]
-                    line = ", ".join(f"0x{v:04X}" for v in chunk)
-                    f.write(f"  {line},\n")
-        f.write("};\n")
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def key(self, path, width, height):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        h.update(f"|{width}x{height}|{RESAMPLE}|v{CACHE_VERSION}".encode())
+        return h.hexdigest()
+
+    def _blob_path(self, key):
+        return os.path.join(self.root, key[:2], key + ".rgb565")
+
+    def get(self, key, width, height):
+        """Return the cached (height, width) uint16 frame for key, or None on a miss."""
+        import numpy as np
+
+        blob = self._blob_path(key)
+        try:
+            with open(blob, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != width * height * 2:
+            return None
+        try:
+            os.utime(blob)
+        except OSError:
+            pass
+        return np.frombuffer(data, dtype="<u2").astype(np.uint16).reshape(height, width)
+
+    def put(self, key, frame):
+        """Store frame under key; written to a temp file and renamed so concurrent workers never see a partial blob."""
+        blob = self._blob_path(key)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(frame_to_bytes(frame))
+        os.replace(tmp, blob)
+
+    def evict(self):
+        """Delete least recently used blobs until the cache is at most max_bytes; returns bytes removed."""
+        entries = []
+        total = 0
+        for dirpath, _, names in os.walk(self.root):
+            for n in names:
+                if not n.endswith(".rgb565"):
+                    continue
+                path = os.path.join(dirpath, n)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - removed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += size
+            except OSError:
+                pass
+        return removed
+
+
+def convert_frame(path, width, height, cache=None):
+    """Return (frame, cache_hit): the RGB565 frame for path, reusing a cached blob when the source is unchanged."""
+    if cache is None:
+        return load_and_convert_frame(path, width, height), False
+    key = cache.key(path, width, height)
+    frame = cache.get(key, width, height)
+    if frame is not None:
+        return frame, True
+    frame = load_and_convert_frame(path, width, height)
+    cache.put(key, frame)
+    return frame, False
+
+
+def _convert_frame_job(job):
+    """Process-pool entry point: (path, width, height, cache) -> (RGB565 array, cache_hit)."""
+    return convert_frame(*job)
+
+
+def iter_frames(paths, width, height, jobs=1, cache=None, stats=None, sizes=None):
+    """
+    Yield RGB565 frames for paths, one at a time and in input order.
+    jobs > 1 spreads the work over a process pool; results are identical to a serial run. At most
+    2 * jobs frames are in flight, so memory stays bounded however many paths there are.
+    With a FrameCache, unchanged sources are read back as blobs; stats (a dict) counts "hits"/"misses".
+    sizes, if given, holds a (width, height) per path that replaces width/height (scaled scenes).
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("hits", 0)
+    stats.setdefault("misses", 0)
+
+    def tally(result):
+        frame, hit = result
+        stats["hits" if hit else "misses"] += 1
+        return frame
+
+    if sizes is None:
+        sizes = [(width, height)] * len(paths)
+    if jobs <= 1 or len(paths) <= 1:
+        for p, (w, h) in zip(paths, sizes):
+            yield tally(convert_frame(p, w, h, cache))
+        return
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(jobs, len(paths))
+    todo = ((p, w, h, cache) for p, (w, h) in zip(paths, sizes))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for _, job in zip(range(2 * workers), todo):
+            pending.append(pool.submit(_convert_frame_job, job))
+        while pending:
+            frame = tally(pending.popleft().result())
+            job = next(todo, None)
+            if job is not None:
+                pending.append(pool.submit(_convert_frame_job, job))
+            yield frame
+
+
+def rle_encode_frame(frame):
+    """
+    Row-RLE encode one (height, width) RGB565 frame. Each row is coded on its own (runs never cross a row
+    boundary) as a sequence of: control byte c < 128 followed by c + 1 literal words, or control byte
+    c >= 128 followed by one word repeated c - 126 times. Words are little-endian, as in the raw layout.
+    """
+    out = bytearray()
+    for row in frame:
+        row_bytes = row.astype("<u2", copy=False).tobytes()
+        n = len(row)
+        change = (row[1:] != row[:-1]).nonzero()[0] + 1
+        starts = [0] + change.tolist()
+        ends = change.tolist() + [n]
+        lit = 0  # start of the pending literal span (words)
+        for start, end in zip(starts, ends):
+            if end - start < 2:
+                continue
+            _rle_emit_literals(out, row_bytes, lit, start)
+            run = end - start
+            word = row_bytes[start * 2 : start * 2 + 2]
+            while run >= 2:
+                k = min(run, RLE_MAX_REPEAT)
+                out.append(k + 126)
+                out += word
+                run -= k
+            lit = end - run  # a leftover single word joins the next literal span
+        _rle_emit_literals(out, row_bytes, lit, n)
+    return bytes(out)
+
+
+def _rle_emit_literals(out, row_bytes, start, end):
+    while start < end:
+        k = min(end - start, RLE_MAX_LITERAL)
+        out.append(k - 1)
+        out += row_bytes[start * 2 : (start + k) * 2]
+        start += k
+
+
+def rgb565_to_rgb(frame):
+    """Expand a (height, width) RGB565 array to (height, width, 3) uint8 RGB (low bits replicated)."""
+    import numpy as np
+
+    r = (frame >> 11) & 0x1F
+    g = (frame >> 5) & 0x3F
+    b = frame & 0x1F
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1).astype(np.uint8)
+
+
+def quantize_scene(frames, colors):
+    """
+    Build one RGB565 palette of at most `colors` entries for a scene's frames and map every frame onto it.
+    Scenes that already use no more than `colors` distinct RGB565 values are indexed exactly; otherwise the
+    palette comes from Pillow's median cut over all frames stacked together (no dithering, so flat areas
+    stay flat and RLE/dirty rects keep working). Returns (palette uint16 array, list of uint8 index arrays).
+    """
+    import numpy as np
+    from PIL import Image
+
+    stack = np.concatenate(frames, axis=0)
+    unique = np.unique(stack)
+    if len(unique) <= colors:
+        palette = unique.astype(np.uint16)
+        indices = np.searchsorted(palette, stack).astype(np.uint8)
+    else:
+        img = Image.fromarray(rgb565_to_rgb(stack), "RGB")
+        quant = img.quantize(colors=colors, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+        indices = np.asarray(quant, dtype=np.uint8)
+        rgb = np.array(quant.getpalette()[: 3 * colors], dtype=np.uint16).reshape(-1, 3)
+        palette = ((rgb[:, 0] >> 3) << 11) | ((rgb[:, 1] >> 2) << 5) | (rgb[:, 2] >> 3)
+        palette = palette[: int(indices.max()) + 1].astype(np.uint16)
+    height = frames[0].shape[0]
+    return palette, [indices[i * height : (i + 1) * height] for i in range(len(frames))]
+
+
+def pack_indices(indices, bits):
+    """Serialize a (height, width) uint8 index array as CODEC_PAL8 (bits=8) or CODEC_PAL4 (bits=4) rows."""
+    import numpy as np
+
+    if bits == 8:
+        return indices.astype(np.uint8, copy=False).tobytes()
+    if indices.shape[1] % 2:
+        indices = np.pad(indices, ((0, 0), (0, 1)))
+    return ((indices[:, 0::2] << 4) | indices[:, 1::2]).astype(np.uint8).tobytes()
+
+
+def encode_frame_v2(frame, indices=None, bits=8):
+    """
+    Return a BANM v2 frame payload: codec byte + data, the smallest of raw (or, with palette indices,
+    CODEC_PAL4/PAL8) and row-RLE. frame is what the device shows; indices/bits describe it in the scene palette.
+    """
+    if indices is None:
+        best = bytes([CODEC_RAW]) + frame_to_bytes(frame)
+    else:
+        best = bytes([CODEC_PAL4 if bits == 4 else CODEC_PAL8]) + pack_indices(indices, bits)
+    # RLE can only win when there are noticeably fewer runs than pixels
+    if frame.size > 1 and (frame[:, 1:] != frame[:, :-1]).sum() < frame.size * 0.9:
+        rle = rle_encode_frame(frame)
+        if len(rle) + 1 < len(best):
+            return bytes([CODEC_RLE]) + rle
+    return best
+
+
+def dirty_rect(prev, frame):
+    """Bounding box (x, y, w, h) of the pixels that differ between two frames; (0, 0, 0, 0) if identical."""
+    diff = prev != frame
+    rows = diff.any(axis=1).nonzero()[0]
+    if not len(rows):
+        return (0, 0, 0, 0)
+    cols = diff.any(axis=0).nonzero()[0]
+    x, y = int(cols[0]), int(rows[0])
+    return (x, y, int(cols[-1]) + 1 - x, int(rows[-1]) + 1 - y)
+
+
+class BinSink:
+    """
+    Streams frames into {name}.bin. The header is written up front from the sized frame counts; frames are
+    appended as they arrive.
+
+    v1: BANM (4) + width (2) + height (2) + frame_count[255] (510) = 518 bytes,
+        then for each scene 0..254: frame_count[s] frames of RGB565 (LE).
+    v2: BAN2 (4) + width (2) + height (2) + flags (2) + slot_count (2) + frame_count[255] (510) = 522 bytes,
+        then the tables enabled by flags, in this order:
+        FLAG_FRAME_INDEX (dedup): slot table offset (u32) + one u16 slot per frame (scene-major).
+        FLAG_DIRTY_RECTS: one (x, y, w, h) u16 rect per frame (scene-major): the pixels that changed since
+            the previous frame of the scene; frame 0's rect is against the last frame (loop wrap).
+        FLAG_PALETTES: one palette offset (u32) per scene, 0 for scenes stored as RGB565. A palette is
+            count (u16) + count RGB565 words, written just before the scene's first payload.
+        FLAG_SCALES: one storage scale (u8: 1, 2 or 4) per scene. A scaled scene's payloads and dirty rects
+            are width/scale x height/scale; the device upscales by pixel repetition.
+        FLAG_TIMING: one timeline rate (u16, ticks per second) per scene, then one hold table offset (u32) per
+            scene: 0 = each frame lasts one tick, else frame_count[s] u16 hold times (ticks), written right
+            after the tables.
+        Then, without FLAG_FRAME_INDEX, the slot table: slot_count × (offset u32, length u32), slots numbered
+        scene-major. Then the frame payloads (with FLAG_FRAME_INDEX only unique frames, followed by the slot table).
+        Each payload is one codec byte + data (CODEC_RAW/RLE/PAL4/PAL8). Tables are back-filled on close(), which then
+        replaces {name}.bin with the finished file.
+
+    palette (16 or 256) quantizes palette_scenes (default: all) to that many colours. Such a scene is held in
+    memory until its last frame arrives (at most MAX_FRAMES frames), since its palette depends on all of them.
+    scales (one per scene, default all 1) gives each scene's storage scale; frames arrive at the stored size.
+    timing (one (rate, holds) per scene, see read_scene_timing) defaults to DEFAULT_FPS for every scene.
+    """
 
-    return h_path, c_path
+    def __init__(
+        self, name, out_dir, width, height, frame_counts, version=2, dedup=True, dirty_rects=True,
+        palette=0, palette_scenes=None, scales=None, timing=None,
+    ):
+        self.path = os.path.join(out_dir, f"{name}.bin")
+        self.version = version
+        self.frame_bytes = width * height * 2
+        self.scales = list(scales) if scales is not None and version != 1 else [1] * NUM_SCENES
+        self.timing = list(timing) if timing is not None and version != 1 else [(DEFAULT_FPS, None)] * NUM_SCENES
+        self.dedup = dedup and version != 1
+        self.dirty_rects = dirty_rects and version != 1
+        self.palette = palette if version != 1 else 0
+        if not self.palette:
+            palette_scenes = ()
+        elif palette_scenes is None:
+            palette_scenes = range(NUM_SCENES)
+        self.palette_scenes = {s for s in palette_scenes if frame_counts[s]}
+        self._palettes = [0] * NUM_SCENES
+        self._pending = []
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.frames = 0
+        self.changed_pixels = 0
+        self._frame_counts = frame_counts
+        self._slots = []
+        self._frame_slots = []
+        self._slot_by_hash = {}
+        self._rects = []
+        self._scene = 0
+        self._scene_pos = 0
+        self._first = None
+        self._prev = None
+        self._f = open(self.path + TMP_SUFFIX, "wb")  # renamed to self.path by close() once complete
+        if version == 1:
+            header = struct.pack("<4sHH", BANM_V1_MAGIC, width, height)
+            header += struct.pack("<" + "H" * NUM_SCENES, *frame_counts)
+            self._f.write(header)
+            return
+        total_frames = sum(frame_counts)
+        flags = (FLAG_FRAME_INDEX if self.dedup else 0) | (FLAG_DIRTY_RECTS if self.dirty_rects else 0)
+        flags |= FLAG_PALETTES if self.palette else 0
+        flags |= FLAG_SCALES if any(s != 1 for s in self.scales) else 0
+        flags |= FLAG_TIMING if any(t != (DEFAULT_FPS, None) for t in self.timing) else 0
+        header = struct.pack("<4sHHHH", BANM_V2_MAGIC, width, height, flags, total_frames)
+        header += struct.pack("<" + "H" * NUM_SCENES, *frame_counts)
+        self._f.write(header)
+        self._index_offset = self._f.tell()
+        if self.dedup:
+            self._f.write(bytes(4 + total_frames * 2))
+        self._rects_offset = self._f.tell()
+        if self.dirty_rects:
+            self._f.write(bytes(total_frames * 8))
+        self._palettes_offset = self._f.tell()
+        if self.palette:
+            self._f.write(bytes(NUM_SCENES * 4))
+        if flags & FLAG_SCALES:
+            self._f.write(bytes(self.scales))
+        timing_offset = self._f.tell()
+        if flags & FLAG_TIMING:
+            self._f.write(bytes(NUM_SCENES * 6))
+        self._table_offset = self._f.tell()
+        if not self.dedup:
+            self._f.write(bytes(total_frames * BANM_V2_SLOT_SIZE))
+        if flags & FLAG_TIMING:
+            self._write_timing(timing_offset)
+
+    def _write_timing(self, table_offset):
+        """Write each scene's hold times (when not one tick per frame), then fill in the rate/offset tables."""
+        offsets = [0] * NUM_SCENES
+        for s, (rate, holds) in enumerate(self.timing):
+            if holds is not None and self._frame_counts[s]:
+                offsets[s] = self._f.tell()
+                self._f.write(struct.pack("<" + "H" * len(holds), *holds))
+        end = self._f.tell()
+        self._f.seek(table_offset)
+        self._f.write(struct.pack("<" + "H" * NUM_SCENES, *(rate for rate, _ in self.timing)))
+        self._f.write(struct.pack("<" + "I" * NUM_SCENES, *offsets))
+        self._f.seek(end)
+
+    def write_frame(self, frame):
+        self.raw_bytes += self.frame_bytes
+        self.frames += 1
+        if self.version == 1:
+            self._f.write(frame_to_bytes(frame))
+            self.stored_bytes += frame.size * 2
+            return
+        while self._frame_counts[self._scene] == self._scene_pos:
+            self._scene += 1
+            self._scene_pos = 0
+        scene, pos = self._scene, self._scene_pos
+        count = self._frame_counts[scene]
+        self._scene_pos += 1
+        if scene not in self.palette_scenes:
+            self._store(frame, pos, count)
+            return
+        self._pending.append(frame)
+        if pos == count - 1:
+            self._store_palette_scene(scene)
+
+    def _store_palette_scene(self, scene):
+        """Quantize the buffered frames of scene, write its palette, then store its frames as indices."""
+        palette, indices = quantize_scene(self._pending, self.palette)
+        self._pending = []
+        pal_bytes = palette.astype("<u2").tobytes()
+        self._palettes[scene] = self._f.tell()
+        self._f.write(struct.pack("<H", len(palette)) + pal_bytes)
+        self.stored_bytes += 2 + len(pal_bytes)
+        bits = 4 if len(palette) <= 16 else 8
+        for pos, idx in enumerate(indices):
+            self._store(palette[idx], pos, len(indices), idx, bits, pal_bytes)
+
+    def _store(self, frame, pos, count, indices=None, bits=8, pal_bytes=b""):
+        """Record frame (position pos of a count-frame scene) and write its payload unless an identical one is stored."""
+        if self.dirty_rects:
+            self._track_rect(frame, pos, count)
+        if self.dedup:
+            # Indexed payloads are only interchangeable under the same palette, so it is part of the key
+            digest = hashlib.blake2b(pal_bytes + frame_to_bytes(frame), digest_size=16).digest()
+            slot = self._slot_by_hash.get(digest)
+            if slot is not None:
+                self._frame_slots.append(slot)
+                return
+            slot = self._slot_by_hash[digest] = len(self._slots)
+            self._frame_slots.append(slot)
+        payload = encode_frame_v2(frame, indices, bits)
+        self._slots.append((self._f.tell(), len(payload)))
+        self._f.write(payload)
+        self.stored_bytes += len(payload)
+
+    def _track_rect(self, frame, pos, count):
+        """Record frame's dirty rect; keeps only the scene's first and the previous frame in memory."""
+        if pos == 0:
+            self._first = frame
+            self._rects.append(None)  # needs the scene's last frame; filled in below
+        else:
+            self._rects.append(dirty_rect(self._prev, frame))
+        if pos == count - 1:
+            self._rects[len(self._rects) - count] = dirty_rect(frame, self._first)
+            s = self.scales[self._scene]
+            for x, y, w, h in self._rects[len(self._rects) - count :]:
+                self.changed_pixels += w * h * s * s
+            self._first = None
+        self._prev = frame
+
+    @property
+    def unique_frames(self):
+        return len(self._slots) if self.version != 1 else self.frames
+
+    def close(self, ok=True):
+        """Write the tables that are only known at the end; ok=False (conversion failed part way) just closes the file."""
+        if ok and self.version != 1:
+            table = b"".join(struct.pack("<II", off, length) for off, length in self._slots)
+            if self.dedup:
+                slot_table = self._f.tell()
+                self._f.write(table)
+                self._f.seek(struct.calcsize("<4sHHH"))  # slot_count: unique frames, known only now
+                self._f.write(struct.pack("<H", len(self._slots)))
+                self._f.seek(self._index_offset)
+                self._f.write(struct.pack("<I", slot_table))
+                self._f.write(struct.pack("<" + "H" * len(self._frame_slots), *self._frame_slots))
+            else:
+                self._f.seek(self._table_offset)
+                self._f.write(table)
+            if self.dirty_rects:
+                self._f.seek(self._rects_offset)
+                self._f.write(b"".join(struct.pack("<HHHH", *r) for r in self._rects))
+            if self.palette:
+                self._f.seek(self._palettes_offset)
+                self._f.write(struct.pack("<" + "I" * NUM_SCENES, *self._palettes))
+        self._f.close()
+        _finish(self.path, ok)
+
+
+class CSink:
+    """Streams frames into {name}.h / {name}.c: frame_count[255], total words, and one big const array (scene 0, 1, … 254)."""
+
+    def __init__(self, name, out_dir, width, height, frame_counts):
+        guard = f"BOOKNOOK_VILLAGE_{name.upper()}_H"
+        self.h_path = os.path.join(out_dir, f"{name}.h")
+        self.c_path = os.path.join(out_dir, f"{name}.c")
+        self.width = width
+        self.height = height
+        total_words = sum(fc * width * height for fc in frame_counts)
+
+        with open(self.h_path + TMP_SUFFIX, "w") as f:
+            f.write(f"#ifndef {guard}\n#define {guard}\n\n")
+            f.write(f"#define {name.upper()}_WIDTH   {width}\n")
+            f.write(f"#define {name.upper()}_HEIGHT  {height}\n")
+            f.write(f"#define {name.upper()}_SCENES  {NUM_SCENES}\n\n")
+            f.write(f"extern const unsigned short {name}_frame_count[{NUM_SCENES}];\n")
+            f.write(f"extern const unsigned short {name}_data[{total_words}];\n\n")
+            f.write("#endif\n")
+
+        self._f = open(self.c_path + TMP_SUFFIX, "w")
+        self._f.write(f'#include "{name}.h"\n\n')
+        self._f.write(f"const unsigned short {name}_frame_count[{NUM_SCENES}] = {{\n")
+        self._f.write("  " + ", ".join(str(c) for c in frame_counts) + "\n};\n\n")
+        self._f.write(f"const unsigned short {name}_data[{total_words}] = {{\n")
+        self._hex_words = _c_hex_words()
+
+    def write_frame(self, frame):
+        if frame.shape != (self.height, self.width):
+            # Scaled scene: the C output always holds full-size frames
+            s = self.height // frame.shape[0]
+            frame = frame.repeat(s, axis=0).repeat(s, axis=1)
+        hex_words = self._hex_words
+        words = frame.ravel().tolist()
+        lines = []
+        for j in range(0, len(words), 12):
+            lines.append("  " + ", ".join([hex_words[v] for v in words[j : j + 12]]) + ",\n")
+        self._f.write("".join(lines))
+
+    def close(self, ok=True):
+        if ok:
+            self._f.write("};\n")
+        self._f.close()
+        _finish(self.h_path, ok)
+        _finish(self.c_path, ok)
+
+
+def _finish(path, ok):
+    """Move a sink's finished temp file over path, or delete it if the conversion failed (path stays as it was)."""
+    if ok:
+        os.replace(path + TMP_SUFFIX, path)
+    else:
+        try:
+            os.remove(path + TMP_SUFFIX)
+        except OSError:
+            pass
+
+
+def stream_scenes(scenes_paths, width, height, sinks, jobs=1, cache=None, stats=None, scales=None):
+    """
+    Convert every frame of scenes 0..254 in order and hand each one to all sinks; returns the frame count.
+    scales (one per scene) converts scaled scenes straight to width/scale x height/scale.
+    """
+    paths = [p for scene in scenes_paths for p in scene]
+    sizes = None
+    if scales is not None:
+        sizes = [(width // scales[s], height // scales[s]) for s, scene in enumerate(scenes_paths) for _ in scene]
+    written = 0
+    ok = False
+    try:
+        for frame in iter_frames(paths, width, height, jobs, cache, stats, sizes):
+            for sink in sinks:
+                sink.write_frame(frame)
+            written += 1
+        ok = True
+    finally:
+        for sink in sinks:
+            sink.close(ok)
+    return written
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Convert numbered folders 0–254 of images to RGB565 for RP2350 (up to 255 scenes, 24 fps)."
+        description="Convert numbered folders 0–254 of images to RGB565 for RP2350 (up to 255 scenes, 24 fps by default)."
     )
     parser.add_argument(
         "input_root",
@@ -158,6 +738,70 @@ def main():
         default="bitmap_anim",
         help="Base name for output files (default: bitmap_anim)",
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes for decode/resize/convert (default: 1; 0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse converted frames from this folder when the source image is unchanged (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=1024,
+        help="Evict least recently used cached frames above this size (default: 1024)",
+    )
+    parser.add_argument(
+        "--format",
+        type=int,
+        choices=(1, 2),
+        default=2,
+        help="Binary layout: 2 = BANM v2 with per-frame RLE (default), 1 = raw v1 for older firmware",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="BANM v2: store every frame even if an identical one was already stored",
+    )
+    parser.add_argument(
+        "--no-dirty-rects",
+        action="store_true",
+        help="BANM v2: do not store per-frame changed-region rectangles (device always redraws the full screen)",
+    )
+    parser.add_argument(
+        "--palette",
+        type=int,
+        choices=(16, 256),
+        default=0,
+        help="BANM v2: quantize scenes to a 16- or 256-colour palette, stored as 4/8-bit indices (lossy; default: off)",
+    )
+    parser.add_argument(
+        "--palette-scenes",
+        default=None,
+        help="With --palette: comma-separated scene numbers to quantize (default: all scenes)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        choices=SCALES,
+        default=1,
+        help="BANM v2: store scenes at 1/2 or 1/4 of width and height; the device upscales (default: 1)",
+    )
+    parser.add_argument(
+        "--scene-scale",
+        default=None,
+        help="Per-scene storage scale overriding --scale, e.g. 3=2,4=4",
+    )
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=DEFAULT_FPS,
+        help=f"BANM v2: frame rate of scenes without a {TIMING_FILENAME} (default: {DEFAULT_FPS})",
+    )
     out_type = parser.add_mutually_exclusive_group()
     out_type.add_argument("--c-only", action="store_true", help="Only emit C .h/.c files")
     out_type.add_argument("--bin-only", action="store_true", help="Only emit .bin file")
@@ -171,28 +815,105 @@ def main():
     os.makedirs(out_dir, exist_ok=True)
 
     width, height = args.width, args.height
+    if args.jobs < 0:
+        sys.exit(f"--jobs must be >= 0 (got {args.jobs}).")
+    jobs = args.jobs or os.cpu_count() or 1
+    cache = None
+    if args.cache_dir:
+        cache_root = os.path.abspath(args.cache_dir)
+        os.makedirs(cache_root, exist_ok=True)
+        cache = FrameCache(cache_root, max(0, args.cache_max_mb) * 1024 * 1024)
     name = re.sub(r"[^a-zA-Z0-9_]", "_", args.name).strip("_") or "bitmap_anim"
+    if args.palette and args.format == 1:
+        sys.exit("--palette needs --format 2.")
+    palette_scenes = None
+    if args.palette_scenes:
+        try:
+            palette_scenes = [int(s) for s in args.palette_scenes.split(",") if s.strip()]
+        except ValueError:
+            sys.exit(f"--palette-scenes: expected comma-separated scene numbers (got {args.palette_scenes!r}).")
+        if any(s < 0 or s >= NUM_SCENES for s in palette_scenes):
+            sys.exit(f"--palette-scenes: scene numbers must be 0–{NUM_SCENES - 1}.")
+    scales = [args.scale] * NUM_SCENES
+    if args.scene_scale:
+        for item in args.scene_scale.split(","):
+            try:
+                scene, factor = (int(v) for v in item.split("="))
+            except ValueError:
+                sys.exit(f"--scene-scale: expected SCENE=FACTOR pairs (got {item!r}).")
+            if scene < 0 or scene >= NUM_SCENES or factor not in SCALES:
+                sys.exit(f"--scene-scale: scene must be 0–{NUM_SCENES - 1} and factor one of {SCALES} (got {item!r}).")
+            scales[scene] = factor
+    if any(s != 1 for s in scales):
+        if args.format == 1:
+            sys.exit("--scale/--scene-scale need --format 2.")
+        for factor in set(scales):
+            if width % factor or height % factor:
+                sys.exit(f"Scale {factor}: {width}x{height} is not divisible by {factor}.")
+    else:
+        scales = None
 
     print(f"Loading up to {NUM_SCENES} scenes from {root} (folders 0–{NUM_SCENES-1}), {width}x{height} RGB565...")
-    scenes_frames = load_scenes(root, width, height)
+    scenes_paths = discover_scenes(root)
+    frame_counts = [len(paths) for paths in scenes_paths]
+    if not 1 <= args.fps <= 1000:
+        sys.exit(f"--fps must be 1–1000 (got {args.fps}).")
+    timing = [read_scene_timing(os.path.join(root, str(s)), frame_counts[s], args.fps) for s in range(NUM_SCENES)]
     for s in range(NUM_SCENES):
-        n = len(scenes_frames[s])
+        n = frame_counts[s]
         if n:
-            print(f"  Scene {s}: {n} frames")
+            rate, holds = timing[s]
+            if holds is None:
+                print(f"  Scene {s}: {n} frames at {rate} fps")
+            else:
+                print(f"  Scene {s}: {n} frames, {sum(holds) * 1000 // rate} ms loop ({TIMING_FILENAME})")
+    if any(t != (DEFAULT_FPS, None) for s, t in enumerate(timing) if frame_counts[s]):
+        if args.format == 1:
+            sys.exit(f"--fps / {TIMING_FILENAME} need --format 2 (v1 always plays at {DEFAULT_FPS} fps).")
+    else:
+        timing = None
 
     emit_c = not args.bin_only
     emit_bin = not args.c_only
 
+    sinks = []
     if emit_c:
-        h_path, c_path = write_c_output(scenes_frames, width, height, name, out_dir)
-        print(f"C: {h_path}, {c_path}")
+        sinks.append(CSink(name, out_dir, width, height, frame_counts))
     if emit_bin:
-        bin_path = write_bin_output(scenes_frames, width, height, name, out_dir)
-        print(f"Binary: {bin_path}")
-
-    total_frames = sum(len(f) for f in scenes_frames)
+        sinks.append(BinSink(
+            name, out_dir, width, height, frame_counts,
+            version=args.format,
+            dedup=not args.no_dedup,
+            dirty_rects=not args.no_dirty_rects,
+            palette=args.palette,
+            palette_scenes=palette_scenes,
+            scales=scales,
+            timing=timing,
+        ))
+    stats = {}
+    total_frames = stream_scenes(scenes_paths, width, height, sinks, jobs, cache, stats, scales)
+    for sink in sinks:
+        if isinstance(sink, CSink):
+            print(f"C: {sink.h_path}, {sink.c_path}")
+        else:
+            print(f"Binary: {sink.path} (BANM v{sink.version})")
+            scaled = [s for s in range(NUM_SCENES) if frame_counts[s] and sink.scales[s] != 1]
+            if scaled:
+                print(f"  Scaled storage: scenes {', '.join(f'{s} (1/{sink.scales[s]})' for s in scaled)}")
+            if sink.palette:
+                print(f"  Palette: {len(sink.palette_scenes)} scenes quantized to at most {sink.palette} colours")
+            if sink.dedup:
+                print(f"  Dedup: {sink.unique_frames} unique of {sink.frames} frames")
+            if sink.dirty_rects and sink.raw_bytes:
+                print(f"  Dirty rects: {sink.changed_pixels * 2 * 100 / sink.raw_bytes:.1f}% of full-frame pixels sent when frames play in sequence")
+            if sink.stored_bytes:
+                print(f"  Frame data: {sink.stored_bytes} bytes stored, ratio {sink.raw_bytes / sink.stored_bytes:.2f}:1")
+
+    if cache is not None:
+        removed = cache.evict()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {removed} bytes evicted ({cache.root})")
     total_bytes = total_frames * width * height * 2
-    print(f"Done. {total_frames} frames total, {total_bytes} bytes. Play at 24 fps on device.")
+    print(f"Done. {total_frames} frames total, {total_bytes} bytes.")
 
 
 if __name__ == "__main__":